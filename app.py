@@ -3,6 +3,7 @@ import pandas as pd
 from datetime import date
 from pathlib import Path
 from io import BytesIO
+import zipfile
 
 # ======================================================
 # 1. CONFIG STREAMLIT (DEBE SER LO PRIMERO)
@@ -24,6 +25,14 @@ init_db()
 from auth.bootstrap import ensure_bootstrap_admin
 ensure_bootstrap_admin()
 
+# ✅ Refresco automático de tickets AFIP (un thread por proceso)
+from core.generar_ta import iniciar_refresco_automatico
+iniciar_refresco_automatico()
+
+# ✅ Log de tiempos del extractor bancario (una línea JSON por extracción)
+from external.extractor_bancario.service import configure_logging
+configure_logging(st.secrets.get("EXTRACTOR_LOG_LEVEL"))
+
 # ======================================================
 # LOGIN SIMPLE POR EMAIL AUTORIZADO
 # ======================================================
@@ -227,6 +236,23 @@ if seccion == "📅 Gestión Fiscal":
                     .str.strip()
                 )
 
+        # CUIT de la cartera → precalentado nocturno del padrón
+        if "CUIT" in df_cartera.columns:
+            try:
+                from core.padron_cache import registrar_cuits_usuario
+
+                cuits_cartera = (
+                    df_cartera["CUIT"]
+                    .dropna()
+                    .astype(str)
+                    .str.replace(r"\.0$", "", regex=True)
+                    .str.replace(r"\D", "", regex=True)
+                    .tolist()
+                )
+                registrar_cuits_usuario(db_user["id"], cuits_cartera, "cartera")
+            except Exception:
+                pass
+
         registros = []
 
         for _, row in df_cartera.iterrows():
@@ -314,12 +340,18 @@ if seccion == "📅 Gestión Fiscal":
 elif seccion == "🔎 Consultor de CUITs":
 
     from core.consultor_cuit import consultar_cuit
+    from core.cuits import cuit_valido, normalizar_cuits
+    from core.gobernador_afip import gobernador
+    from core import padron_cache, trabajos_cuit
     from auth.service import consume_quota_db
     from auth.limits import get_current_period
     
     st.markdown("## 🔎 Consultor de CUITs")
     st.markdown("<div class='subtitulo'>Consulta fiscal individual y masiva</div>", unsafe_allow_html=True)
-    st.info("🔐 La consulta se realiza en tiempo real. No se almacena información.")
+    st.info(
+        "🔐 La consulta se realiza contra ARCA. Solo se guardan los datos públicos del padrón "
+        f"(hasta {padron_cache.PADRON_CACHE_TTL_DIAS} días) para no repetir consultas."
+    )
     st.markdown("---")
 
     tipo = st.radio(
@@ -337,9 +369,17 @@ elif seccion == "🔎 Consultor de CUITs":
         if st.button("🔍 Consultar"):
             if not cuit.isdigit() or len(cuit) != 11:
                 st.error("El CUIT debe tener 11 dígitos numéricos.")
+            elif not cuit_valido(cuit):
+                st.error("El CUIT ingresado no es válido (dígito verificador incorrecto).")
             else:
                 with st.spinner("Consultando ARCA..."):
                     res = consultar_cuit(cuit)
+
+                try:
+                    padron_cache.registrar_cuits_usuario(db_user["id"], [cuit], "consulta_individual")
+                except Exception:
+                    pass
+
                 df_res = pd.DataFrame(res.items(), columns=["Campo", "Valor"])
                 st.table(df_res)
 
@@ -347,6 +387,86 @@ elif seccion == "🔎 Consultor de CUITs":
     # CONSULTA MASIVA (CON LÍMITE)
     # ======================================================
     else:
+        user_id = db_user["id"]
+
+        def mostrar_resultados_cuits(job_id: int) -> None:
+            df_out = pd.DataFrame(trabajos_cuit.resultados(job_id, user_id))
+
+            st.dataframe(df_out, use_container_width=True)
+
+            st.download_button(
+                "📥 Descargar resultados (Excel)",
+                data=excel_bytes(df_out),
+                file_name=f"resultado_consulta_cuits_{job_id}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key=f"descarga_job_{job_id}",
+            )
+
+        # ---------------------------------------------------
+        # Consultas anteriores (se reabren sin volver a AFIP)
+        # ---------------------------------------------------
+        try:
+            trabajos = trabajos_cuit.listar_trabajos(user_id)
+        except Exception:
+            trabajos = []
+
+        if trabajos:
+            with st.expander("📋 Mis consultas masivas"):
+                st.dataframe(
+                    pd.DataFrame(trabajos),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+
+                job_sel = st.selectbox(
+                    "Consulta",
+                    [t["id"] for t in trabajos],
+                    format_func=lambda i: next(
+                        f"#{t['id']} · {t['archivo'] or 'sin nombre'} · "
+                        f"{t['procesados']}/{t['total']} · {t['estado']}"
+                        for t in trabajos if t["id"] == i
+                    ),
+                )
+                trabajo_sel = next(t for t in trabajos if t["id"] == job_sel)
+
+                col_ver, col_reanudar = st.columns(2)
+                ver = col_ver.button("📂 Ver resultados")
+
+                # Con un lease vigente otra pestaña o sesión lo está corriendo
+                en_ejecucion = trabajo_sel.get("en_ejecucion")
+                reanudar = (
+                    trabajo_sel["estado"] != trabajos_cuit.COMPLETADO
+                    and col_reanudar.button("▶️ Reanudar", disabled=bool(en_ejecucion))
+                )
+                if en_ejecucion:
+                    col_reanudar.caption(
+                        "⏳ Se está ejecutando en otra sesión. Si se cortó, se puede "
+                        f"reanudar cuando pasen {trabajos_cuit.TRABAJO_LEASE_SEG // 60} "
+                        "minutos sin avances."
+                    )
+
+                if reanudar:
+                    if not gobernador().disponible():
+                        st.error("🚫 AFIP sigue sin responder. Probá de nuevo en unos minutos.")
+                    else:
+                        prog_job = st.progress(0)
+                        corrida = trabajos_cuit.ejecutar_trabajo(
+                            job_sel,
+                            progreso=lambda hechos, total: prog_job.progress(
+                                int(hechos * 100 / total) if total else 100
+                            ),
+                        )
+                        prog_job.progress(100)
+                        if corrida["ocupado"]:
+                            st.warning("⏳ La consulta se está ejecutando en otra sesión.")
+                        if corrida["estado"] == trabajos_cuit.PAUSADO:
+                            st.warning("AFIP dejó de responder: la consulta quedó pausada.")
+                        if corrida["devueltos"]:
+                            st.info(f"Se devolvieron {corrida['devueltos']} consultas que AFIP no pudo responder.")
+
+                if ver or reanudar:
+                    mostrar_resultados_cuits(job_sel)
+
         df_tpl = pd.DataFrame({"CUIT": [""], "OBSERVACIONES": [""]})
 
         st.download_button(
@@ -378,86 +498,139 @@ elif seccion == "🔎 Consultor de CUITs":
                         st.error("Sesión inválida. Volvé a iniciar sesión.")
                         st.stop()
 
-                    user_id = st.session_state["db_user"]["id"]
-
                     # ---------------------------------------------------
                     # 1️⃣ Detectar CUIT válidos
                     # ---------------------------------------------------
-                    cuits_validos = []
-
-                    for row in df_in.to_dict(orient="records"):
-                        raw = (row.get(col_cuit) or "").strip()
-                        cuit_norm = "".join(ch for ch in raw if ch.isdigit())
+                    # Normaliza, valida dígito verificador y elimina duplicados
+                    # (solo se cobran CUIT que pueden dar resultado)
+                    reporte = normalizar_cuits(df_in[col_cuit])
 
-                        if cuit_norm.isdigit() and len(cuit_norm) == 11:
-                            cuits_validos.append(cuit_norm)
+                    cuits_unicos = reporte["validos"]
+                    total_validos = reporte["total_validos"]
 
-                    # 🔹 Eliminar duplicados
-                    cuits_unicos = list(dict.fromkeys(cuits_validos))
-                    total_validos = len(cuits_unicos)
+                    if reporte["total_invalidos"] or reporte["total_duplicados"]:
+                        st.warning(
+                            f"{reporte['total_invalidos']} filas con CUIT inválido y "
+                            f"{reporte['total_duplicados']} duplicadas no se consultarán."
+                        )
+                        with st.expander("Ver filas descartadas"):
+                            st.dataframe(
+                                reporte["detalle"][reporte["detalle"]["estado"] != "VALIDO"],
+                                use_container_width=True,
+                                hide_index=True,
+                            )
 
                     if total_validos == 0:
                         st.warning("No se encontraron CUIT válidos en el archivo.")
                         st.stop()
 
                     # ---------------------------------------------------
-                    # 2️⃣ Validar y descontar cupo (ATÓMICO EN DB)
+                    # 2️⃣ Buscar en cache del padrón (no vuelve a AFIP)
                     # ---------------------------------------------------
+                    try:
+                        cacheados = padron_cache.buscar(cuits_unicos)
+                    except Exception:
+                        cacheados = {}
+
+                    pendientes = [c for c in cuits_unicos if c not in cacheados]
+
+                    a_cobrar = len(pendientes)
+                    if padron_cache.PADRON_CACHE_COBRAR_HITS:
+                        a_cobrar += len(cacheados)
+
+                    # ---------------------------------------------------
+                    # 3️⃣ Reservar cupo (ATÓMICO EN DB)
+                    # ---------------------------------------------------
+                    # Se reserva todo de una vez y se liquida en cada
+                    # checkpoint: lo que AFIP no pudo responder se devuelve
                     period = get_current_period()
-                    quota = consume_quota_db(user_id, "cuit", total_validos, period)
 
-                    if not quota["allowed"]:
+                    # AFIP caído: no se cobra una corrida que va a fallar
+                    if pendientes and not gobernador().disponible():
+                        estado_afip = gobernador().estado()
                         st.error(
-                            f"No alcanzan los cupos.\n"
-                            f"Te quedan {quota['remaining']} disponibles "
-                            f"y el archivo contiene {total_validos} CUIT válidos."
+                            "🚫 AFIP no está respondiendo. Se pausaron las consultas para no consumir cupo.\n"
+                            f"Reintentá en {estado_afip['reintento_en_seg']} segundos.\n"
+                            f"Último error: {estado_afip['ultimo_error']}"
                         )
                         st.stop()
 
-                    st.info(
-                        f"Se descontarán {total_validos} consultas.\n"
-                        f"Uso actual: {quota['used']}/{quota['limit_total']} "
-                        f"(Restan {quota['remaining']})."
-                    )
+                    if a_cobrar > 0:
+                        quota = consume_quota_db(user_id, "cuit", a_cobrar, period)
+
+                        if not quota["allowed"]:
+                            st.error(
+                                f"No alcanzan los cupos.\n"
+                                f"Te quedan {quota['remaining']} disponibles "
+                                f"y el archivo requiere {a_cobrar} consultas."
+                            )
+                            st.stop()
+
+                        st.info(
+                            f"Se reservaron {a_cobrar} consultas "
+                            f"({len(cacheados)} CUIT ya estaban en cache). "
+                            f"Las que AFIP no pueda responder se devuelven.\n"
+                            f"Uso actual: {quota['used']}/{quota['limit_total']} "
+                            f"(Restan {quota['remaining']})."
+                        )
+                    else:
+                        st.info("Todos los CUIT estaban en cache: no se descuentan consultas.")
 
                     # ---------------------------------------------------
-                    # 3️⃣ Procesar consultas (cobrar solo éxitos)
+                    # 4️⃣ Procesar consultas (solo los que no estaban en cache)
                     # ---------------------------------------------------
-                    resultados = []
+                    # La corrida queda registrada como trabajo: cada tramo se
+                    # guarda en la base y, si se corta, se reanuda desde ahí
+                    job_id = trabajos_cuit.crear_trabajo(
+                        user_id, cuits_unicos, cacheados, archivo.name, period,
+                        cobrados=a_cobrar,
+                    )
+                    st.caption(f"Consulta #{job_id} (se puede reabrir desde 'Mis consultas masivas').")
+
                     prog = st.progress(0)
-                    consultas_exitosas = 0
 
-                    for i, cuit in enumerate(cuits_unicos, start=1):
-                        try:
-                            res = consultar_cuit(cuit)
-                            resultados.append(res)
-                            consultas_exitosas += 1
-                        except Exception as e:
-                            resultados.append({"CUIT": cuit, "Error": str(e)})
+                    corrida = trabajos_cuit.ejecutar_trabajo(
+                        job_id,
+                        progreso=lambda hechos, total: prog.progress(
+                            int(hechos * 100 / total) if total else 100
+                        ),
+                    )
+                    prog.progress(100)
 
-                        prog.progress(int(i * 100 / total_validos))
+                    if corrida["ocupado"]:
+                        st.warning(
+                            "⏳ La consulta se está ejecutando en otra sesión: "
+                            "seguila desde 'Mis consultas masivas'."
+                        )
+
+                    if corrida["estado"] == trabajos_cuit.PAUSADO:
+                        estado_afip = gobernador().estado()
+                        st.error(
+                            "⚠️ AFIP empezó a fallar durante la corrida: la consulta quedó pausada "
+                            "sin esperar timeouts. Reanudala desde 'Mis consultas masivas'; "
+                            "no se vuelve a cobrar.\n"
+                            f"Último error: {estado_afip['ultimo_error']}"
+                        )
 
-                    df_out = pd.DataFrame(resultados)
+                    try:
+                        padron_cache.registrar_uso(len(cacheados), len(pendientes), period)
+                        padron_cache.registrar_cuits_usuario(user_id, cuits_unicos, "consulta_masiva")
+                    except Exception:
+                        pass
 
                     # ---------------------------------------------------
-                    # 4️⃣ Confirmación de procesamiento
+                    # 5️⃣ Confirmación de procesamiento
                     # ---------------------------------------------------
                     st.success(
                         f"Consultas procesadas: {total_validos}. "
-                        f"Uso actualizado correctamente."
+                        f"Se cobraron {a_cobrar - corrida['devueltos']} "
+                        f"(devueltas por error de AFIP: {corrida['devueltos']})."
                     )
 
                     # ---------------------------------------------------
-                    # 5️⃣ Mostrar resultados
+                    # 6️⃣ Mostrar resultados
                     # ---------------------------------------------------
-                    st.dataframe(df_out, use_container_width=True)
-
-                    st.download_button(
-                        "📥 Descargar resultados (Excel)",
-                        data=excel_bytes(df_out),
-                        file_name="resultado_consulta_cuits.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    )
+                    mostrar_resultados_cuits(job_id)
 
 # ======================================================
 # SECCIÓN 3 · EXTRACTOS BANCARIOS
@@ -472,76 +645,266 @@ elif seccion == "🏦 Extractos Bancarios":
     st.markdown("---")
 
     st.info(
-        "📄 Subí un **extracto bancario en PDF**.\n\n"
+        "📄 Subí uno o varios **extractos bancarios en PDF** (o un ZIP con todos).\n\n"
         "🔍 El sistema detecta automáticamente el banco.\n"
-        "📊 Se genera un Excel con los movimientos normalizados."
+        "📊 Se genera un Excel con los movimientos normalizados "
+        "(uno solo, con la columna `fuente`, si subís varios)."
     )
 
-    pdf_file = st.file_uploader(
-        "📎 Subí el extracto bancario (PDF)",
-        type=["pdf"]
+    archivos_pdf = st.file_uploader(
+        "📎 Subí uno o varios extractos (PDF) o un ZIP con los PDF",
+        type=["pdf", "zip"],
+        accept_multiple_files=True,
     )
 
-    if pdf_file is not None:
+    # Límites de los ZIP, controlados con el tamaño declarado de cada entrada
+    # antes de descomprimir: un ZIP chico puede expandirse a GB (zip bomb)
+    ZIP_MAX_PDFS = int(st.secrets.get("BANK_ZIP_MAX_PDFS", 50))
+    ZIP_MAX_MB_PDF = int(st.secrets.get("BANK_ZIP_MAX_MB_PDF", 50))
+    ZIP_MAX_MB_TOTAL = int(st.secrets.get("BANK_ZIP_MAX_MB_TOTAL", 300))
+
+    def pdfs_subidos(archivos) -> list:
+        """(nombre, bytes) de cada PDF subido, abriendo los ZIP."""
+        pdfs = []
+        for archivo in archivos:
+            if not archivo.name.lower().endswith(".zip"):
+                pdfs.append((archivo.name, archivo.getvalue()))
+                continue
 
+            try:
+                zf = zipfile.ZipFile(BytesIO(archivo.getvalue()))
+            except zipfile.BadZipFile:
+                st.warning(f"⚠️ {archivo.name}: no es un ZIP válido.")
+                continue
+
+            with zf:
+                entradas = [
+                    info for info in zf.infolist()
+                    if not info.is_dir()
+                    and Path(info.filename).name.lower().endswith(".pdf")
+                    and not info.filename.startswith("__MACOSX/")
+                ]
+
+                if len(entradas) > ZIP_MAX_PDFS:
+                    st.warning(
+                        f"⚠️ {archivo.name} trae {len(entradas)} PDF: el máximo por ZIP "
+                        f"es {ZIP_MAX_PDFS}. Dividilo en varios ZIP."
+                    )
+                    continue
+
+                total_mb = 0.0
+                for info in entradas:
+                    nombre = Path(info.filename).name
+                    mb = info.file_size / (1024 * 1024)
+
+                    if mb > ZIP_MAX_MB_PDF:
+                        st.warning(f"⚠️ {nombre} se omitió: pesa más de {ZIP_MAX_MB_PDF} MB.")
+                        continue
+                    if total_mb + mb > ZIP_MAX_MB_TOTAL:
+                        st.warning(
+                            f"⚠️ {archivo.name}: se superaron los {ZIP_MAX_MB_TOTAL} MB "
+                            "descomprimidos; el resto de los PDF se omitió."
+                        )
+                        break
+
+                    total_mb += mb
+                    try:
+                        # zipfile no descomprime más allá del tamaño declarado:
+                        # si el tamaño miente, falla el CRC
+                        pdfs.append((nombre, zf.read(info)))
+                    except (zipfile.BadZipFile, EOFError, NotImplementedError):
+                        st.warning(f"⚠️ {nombre} se omitió: la entrada del ZIP está dañada.")
+        return pdfs
+
+    def procesar_lote(pdfs: list) -> None:
+        """
+        Varios extractos de una vez (cierre de mes): se reparten entre
+        procesos y salen en un único Excel con la columna `fuente`.
+        """
+        prog_lote = st.progress(0, text="Procesando extractos...")
+        resultados = []
         try:
-            # ✅ IMPORT CORRECTO DEL SERVICIO
-            from external.extractor_bancario.service import extract_bank_statement
+            lote = extract_bank_statements(
+                [(datos, nombre) for nombre, datos in pdfs],
+                cache_scope=db_user["id"],
+            )
+            for n, result in enumerate(lote, start=1):
+                resultados.append(result)
+                prog_lote.progress(
+                    int(n * 100 / len(pdfs)),
+                    text=f"Extracto {n}/{len(pdfs)} · {result.profile.file_name}",
+                )
+        finally:
+            prog_lote.empty()
 
-            with st.spinner("Procesando extracto bancario..."):
+        # -----------------------------
+        # RESUMEN DEL LOTE
+        # -----------------------------
+        st.markdown("### 📋 Extractos procesados")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Archivo": r.profile.file_name,
+                    "Banco": (getattr(r.profile, "detected_bank", None) or "-").upper(),
+                    "Movimientos": len(r.transactions),
+                    "Advertencias": len(r.warnings),
+                    "Confianza": r.confidence_score,
+                    "Estado": (
+                        "❌ Error" if EXTRACTION_FAILED in r.parser_trace
+                        else "⚡ Ya procesado" if r.cached
+                        else "✅ OK"
+                    ),
+                }
+                for r in resultados
+            ]),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+        if any(r.transactions for r in resultados):
+            st.download_button(
+                "⬇️ Descargar Excel consolidado",
+                data=ExtractitoExcelExporter.export_consolidated(resultados),
+                file_name=f"extractos_{get_current_period()}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
+        else:
+            st.warning("⚠️ No se detectaron movimientos en ninguno de los documentos.")
 
-                # Leer bytes del PDF
-                pdf_bytes = pdf_file.read()
+        con_warnings = [r for r in resultados if r.warnings]
+        if con_warnings:
+            with st.expander(f"⚠️ Advertencias ({len(con_warnings)} extractos)"):
+                for r in con_warnings:
+                    st.markdown(f"**{r.profile.file_name}**")
+                    for w in r.warnings:
+                        st.warning(f"{w.code} · {w.message}")
 
-                # ✅ Llamada correcta al servicio
-                result = extract_bank_statement(
-                    pdf_bytes=pdf_bytes,
-                    filename=pdf_file.name,
-                )
+    if archivos_pdf:
 
-            # -----------------------------
-            # RESULTADOS
-            # -----------------------------
-            st.success(
-                f"🏦 Banco detectado: **{result.profile.detected_bank.upper()}**"
+        try:
+            # ✅ IMPORT CORRECTO DEL SERVICIO
+            from external.extractor_bancario.service import (
+                EXTRACTION_FAILED,
+                cached_bank_statement,
+                extract_bank_statement,
+                extract_bank_statements,
+            )
+            from external.extractor_bancario.exporters.excel_extractito import (
+                ExtractitoExcelExporter,
             )
-            st.info(f"📄 Tipo de documento: {result.profile.document_type}")
+            from external.extractor_bancario.core.timings import record_stage
+            from auth.limits import get_current_period
 
-            if result.transactions:
-                df_tx = pd.DataFrame(result.transactions)
+            # PDF sueltos y los que vengan dentro de un ZIP
+            pdfs = pdfs_subidos(archivos_pdf)
 
-                st.markdown("### 📋 Movimientos detectados")
-                st.dataframe(
-                    df_tx,
-                    use_container_width=True,
-                    hide_index=True
-                )
+            if not pdfs:
+                st.warning("⚠️ No se encontraron PDF en lo que subiste.")
+
+            elif len(pdfs) > 1:
+                procesar_lote(pdfs)
 
-                st.download_button(
-                    "⬇️ Descargar extracto en Excel",
-                    data=excel_bytes(df_tx),
-                    file_name="extracto_bancario.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                )
             else:
-                st.warning("⚠️ No se detectaron movimientos en el documento.")
+                pdf_name, pdf_bytes = pdfs[0]
 
-            # -----------------------------
-            # WARNINGS
-            # -----------------------------
-            if result.warnings:
-                st.markdown("### ⚠️ Advertencias")
-                for w in result.warnings:
-                    st.warning(f"{w.code} · {w.message}")
 
-            # -----------------------------
-            # TRAZA DEL PARSER
-            # -----------------------------
-            with st.expander("🧠 Detalle técnico del procesamiento"):
-                for t in result.parser_trace:
-                    st.code(t)
+                # Mismo PDF ya procesado por este usuario (re-subida o rerun
+                # de Streamlit): se devuelve al instante
+                result = cached_bank_statement(pdf_bytes, pdf_name, db_user["id"])
 
-                st.write("Confidence score:", result.confidence_score)
+                if result is None:
+                    prog_pdf = st.progress(0, text="Procesando extracto bancario...")
+                    preview = st.empty()
+
+                    def _avance(pagina: int, paginas: int, movimientos: list) -> None:
+                        prog_pdf.progress(
+                            min(100, int(pagina * 100 / max(paginas, 1))),
+                            text=f"Página {pagina}/{paginas} · {len(movimientos)} movimientos",
+                        )
+                        # Primeras filas apenas aparecen (sin redibujar todo el extracto)
+                        if movimientos and len(movimientos) <= 50:
+                            preview.dataframe(pd.DataFrame(movimientos), hide_index=True)
+
+                    try:
+                        # ✅ Llamada correcta al servicio
+                        result = extract_bank_statement(
+                            pdf_bytes=pdf_bytes,
+                            filename=pdf_name,
+                            progress=_avance,
+                            cache_scope=db_user["id"],
+                        )
+                    finally:
+                        prog_pdf.empty()
+                        preview.empty()
+                else:
+                    st.caption("⚡ Este extracto ya estaba procesado.")
+
+                # -----------------------------
+                # RESULTADOS
+                # -----------------------------
+                st.success(
+                    f"🏦 Banco detectado: **{result.profile.detected_bank.upper()}**"
+                )
+                st.info(f"📄 Tipo de documento: {result.profile.document_type}")
+
+                if result.transactions:
+                    df_tx = pd.DataFrame(result.transactions)
+
+                    st.markdown("### 📋 Movimientos detectados")
+                    st.dataframe(
+                        df_tx,
+                        use_container_width=True,
+                        hide_index=True
+                    )
+
+                    with record_stage(result.debug, "export"):
+                        excel_extracto = excel_bytes(df_tx)
+
+                    st.download_button(
+                        "⬇️ Descargar extracto en Excel",
+                        data=excel_extracto,
+                        file_name="extracto_bancario.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    )
+                else:
+                    st.warning("⚠️ No se detectaron movimientos en el documento.")
+
+                # -----------------------------
+                # WARNINGS
+                # -----------------------------
+                if result.warnings:
+                    st.markdown("### ⚠️ Advertencias")
+                    for w in result.warnings:
+                        st.warning(f"{w.code} · {w.message}")
+
+                # -----------------------------
+                # TRAZA DEL PARSER
+                # -----------------------------
+                with st.expander("🧠 Detalle técnico del procesamiento"):
+                    for t in result.parser_trace:
+                        st.code(t)
+
+                    st.write("Confidence score:", result.confidence_score)
+
+                    # Tiempos por etapa: qué hace lento a un extracto lento
+                    if result.debug and result.debug.timings:
+                        etapas = {}
+                        for clave, ms in result.debug.timings.items():
+                            etapa, medida = clave.split(".", 1)
+                            etapas.setdefault(etapa, {"Etapa": etapa})[medida] = ms
+
+                        st.markdown("**⏱️ Tiempos por etapa (ms)**")
+                        st.dataframe(
+                            pd.DataFrame(list(etapas.values())).rename(columns={
+                                "wall_ms": "Pared",
+                                "cpu_ms": "CPU",
+                                "page_max_ms": "Página más lenta",
+                                "page_avg_ms": "Promedio por página",
+                            }),
+                            use_container_width=True,
+                            hide_index=True,
+                        )
+                        st.json(result.debug.artifacts)
 
         except Exception as e:
             st.error("❌ Error procesando el extracto bancario.")
@@ -918,6 +1281,38 @@ elif seccion == "🛠 Administración":
 
         st.divider()
 
+    # ======================================================
+    # CACHE DEL PADRÓN
+    # ======================================================
+    from core.padron_cache import get_cache_stats
+
+    st.markdown("### 📦 Cache del padrón (período actual)")
+
+    cache_stats = get_cache_stats(period)
+
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Hits", cache_stats["hits"])
+    k2.metric("Misses", cache_stats["misses"])
+    k3.metric("Hit rate", f"{cache_stats['hit_rate_pct']}%")
+    k4.metric("CUIT en cache", cache_stats["entradas"])
+
+    st.divider()
+
+    # ======================================================
+    # TICKETS AFIP (WSAA)
+    # ======================================================
+    from core.generar_ta import estado_tickets
+
+    from core.gobernador_afip import gobernador
+
+    with st.expander("🔑 Tickets AFIP (WSAA) y estado de conexión"):
+        st.dataframe(
+            pd.DataFrame(estado_tickets()),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.json(gobernador().estado())
+
     # ======================================================
     # ALTA MANUAL DE CLIENTE
     # ======================================================
@@ -4,15 +4,23 @@ from psycopg2.extras import RealDictCursor
 import streamlit as st
 
 
+def connect():
+    """
+    Conexión sin UI: los errores salen como excepción.
+    Para código que corre fuera del script de Streamlit (threads de fondo).
+    """
+    return psycopg2.connect(
+        st.secrets["postgres"]["url"],
+        cursor_factory=RealDictCursor
+    )
+
+
 def get_connection():
     """
     Conecta a Supabase y configura el cursor para devolver diccionarios.
     """
     try:
-        conn = psycopg2.connect(
-            st.secrets["postgres"]["url"],
-            cursor_factory=RealDictCursor
-        )
+        conn = connect()
         return conn
     except Exception as e:
         # Mantengo tu comportamiento (UI-friendly)
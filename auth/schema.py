@@ -44,6 +44,83 @@ def init_db() -> None:
     )
     """)
 
+    # Tickets de acceso WSAA (compartidos entre réplicas)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS afip_tickets (
+        service TEXT NOT NULL,
+        cuit TEXT NOT NULL,
+        token TEXT NOT NULL,
+        sign TEXT NOT NULL,
+        expiration TIMESTAMPTZ NOT NULL,
+        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (service, cuit)
+    )
+    """)
+
+    # Cache de resultados del padrón A5 (por CUIT normalizado)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS padron_cache (
+        cuit TEXT PRIMARY KEY,
+        fila JSONB NOT NULL,
+        consultado_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # Hits / misses de la cache del padrón por período (YYYY-MM)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS padron_cache_stats (
+        period TEXT PRIMARY KEY,
+        hits INTEGER NOT NULL DEFAULT 0,
+        misses INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # CUIT consultados o cargados en carteras (fuente del precalentado nocturno)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS cuits_cartera (
+        user_id INTEGER NOT NULL,
+        cuit TEXT NOT NULL,
+        origen TEXT NOT NULL DEFAULT 'consulta',
+        last_seen_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (user_id, cuit)
+    )
+    """)
+
+    # Consultas masivas de CUIT como trabajos reanudables
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS cuit_jobs (
+        id SERIAL PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES usuarios(id),
+        archivo TEXT DEFAULT '',
+        period TEXT,
+        estado TEXT NOT NULL DEFAULT 'EN_CURSO',
+        total INTEGER NOT NULL DEFAULT 0,
+        procesados INTEGER NOT NULL DEFAULT 0,
+        cobrados INTEGER NOT NULL DEFAULT 0,
+        devueltos INTEGER NOT NULL DEFAULT 0,
+        lease_token TEXT,
+        lease_hasta TIMESTAMPTZ,
+        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # Lease de ejecución (bases creadas antes de que existiera)
+    cur.execute("ALTER TABLE cuit_jobs ADD COLUMN IF NOT EXISTS lease_token TEXT")
+    cur.execute("ALTER TABLE cuit_jobs ADD COLUMN IF NOT EXISTS lease_hasta TIMESTAMPTZ")
+
+    # Resultado por CUIT de cada trabajo (fila NULL = pendiente)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS cuit_job_items (
+        job_id INTEGER NOT NULL REFERENCES cuit_jobs(id) ON DELETE CASCADE,
+        orden INTEGER NOT NULL,
+        cuit TEXT NOT NULL,
+        fila JSONB,
+        PRIMARY KEY (job_id, cuit)
+    )
+    """)
+
     conn.commit()
     seed_plans()
     conn.commit()
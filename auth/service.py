@@ -72,6 +72,56 @@ def consume_quota_db(
     finally:
         conn.close()
 
+# =====================================================
+# DEVOLUCIÓN DE CUPO (Nota de crédito)
+# =====================================================
+_RESOURCE_COLUMNS = {
+    "cuit": "cuit_queries",
+    "bank": "bank_extracts",
+    "fiscal": "fiscal_checks",
+}
+
+def release_quota_db(
+    user_id: int,
+    resource: str,  # 'cuit' | 'bank' | 'fiscal'
+    amount: int,
+    period: Optional[str] = None,
+    cur=None,
+) -> None:
+    """
+    Devuelve `amount` unidades ya descontadas (nunca deja el uso en negativo).
+
+    Con `cur` la devolución corre dentro de esa transacción (el que llama
+    hace el commit): así queda atada a lo que la justifica.
+    """
+    column = _RESOURCE_COLUMNS.get(resource)
+    if not column:
+        raise ValueError(f"Recurso desconocido: {resource}")
+
+    amount = int(amount or 0)
+    if not user_id or amount <= 0:
+        return
+
+    period = period or get_current_period()
+    sql = f"""
+        UPDATE usage
+        SET {column} = GREATEST(0, COALESCE({column}, 0) - %s),
+            last_activity = CURRENT_TIMESTAMP
+        WHERE user_id = %s AND period = %s
+    """
+
+    if cur is not None:
+        cur.execute(sql, (amount, user_id, period))
+        return
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as own_cur:
+                own_cur.execute(sql, (amount, user_id, period))
+    finally:
+        conn.close()
+
 # =====================================================
 # ESTADO DE USO (Dashboard Overview)
 # =====================================================
@@ -0,0 +1,414 @@
+"""
+Servidor SOAP local que imita WSAA (loginCms) y el padrón A5 (getPersonaList_v2).
+
+Sirve para medir consultor_cuit / generar_ta sin salir a AFIP producción.
+Los WSDL son una versión mínima de los oficiales: mismas operaciones,
+namespaces y nombres de campos, pero solo con los elementos que usa el sistema.
+
+Uso:
+    python -m bench.afip_mock --puerto 8089 --latencia-ms 300 --jitter-ms 150 \\
+        --tasa-error 0.02 --actividades 3
+
+    WSAA:   http://127.0.0.1:8089/wsaa?wsdl
+    Padrón: http://127.0.0.1:8089/padron?wsdl
+"""
+
+import argparse
+import datetime
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+# ======================================================
+# WSDL
+# ======================================================
+NS_WSAA = "http://wsaa.view.sua.dvadac.desein.afip.gov"
+NS_A5 = "http://a5.soap.ws.server.puc.sr/"
+
+WSDL_WSAA = """<?xml version="1.0" encoding="UTF-8"?>
+<wsdl:definitions xmlns:wsdl="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xsd="http://www.w3.org/2001/XMLSchema"
+    xmlns:impl="{ns}" targetNamespace="{ns}">
+  <wsdl:types>
+    <schema xmlns="http://www.w3.org/2001/XMLSchema" elementFormDefault="qualified" targetNamespace="{ns}">
+      <element name="loginCms">
+        <complexType><sequence><element name="in0" type="xsd:string"/></sequence></complexType>
+      </element>
+      <element name="loginCmsResponse">
+        <complexType><sequence><element name="loginCmsReturn" type="xsd:string"/></sequence></complexType>
+      </element>
+    </schema>
+  </wsdl:types>
+  <wsdl:message name="loginCmsRequest"><wsdl:part element="impl:loginCms" name="parameters"/></wsdl:message>
+  <wsdl:message name="loginCmsResponse"><wsdl:part element="impl:loginCmsResponse" name="parameters"/></wsdl:message>
+  <wsdl:portType name="LoginCMS">
+    <wsdl:operation name="loginCms">
+      <wsdl:input message="impl:loginCmsRequest" name="loginCmsRequest"/>
+      <wsdl:output message="impl:loginCmsResponse" name="loginCmsResponse"/>
+    </wsdl:operation>
+  </wsdl:portType>
+  <wsdl:binding name="LoginCmsSoapBinding" type="impl:LoginCMS">
+    <soap:binding style="document" transport="http://schemas.xmlsoap.org/soap/http"/>
+    <wsdl:operation name="loginCms">
+      <soap:operation soapAction=""/>
+      <wsdl:input name="loginCmsRequest"><soap:body use="literal"/></wsdl:input>
+      <wsdl:output name="loginCmsResponse"><soap:body use="literal"/></wsdl:output>
+    </wsdl:operation>
+  </wsdl:binding>
+  <wsdl:service name="LoginCMSService">
+    <wsdl:port binding="impl:LoginCmsSoapBinding" name="LoginCms">
+      <soap:address location="{url}"/>
+    </wsdl:port>
+  </wsdl:service>
+</wsdl:definitions>
+"""
+
+WSDL_PADRON = """<?xml version="1.0" encoding="UTF-8"?>
+<definitions xmlns="http://schemas.xmlsoap.org/wsdl/"
+    xmlns:soap="http://schemas.xmlsoap.org/wsdl/soap/"
+    xmlns:xs="http://www.w3.org/2001/XMLSchema"
+    xmlns:tns="{ns}" targetNamespace="{ns}" name="PersonaServiceA5">
+  <types>
+    <xs:schema version="1.0" targetNamespace="{ns}">
+      <xs:element name="getPersonaList_v2" type="tns:getPersonaList_v2"/>
+      <xs:element name="getPersonaList_v2Response" type="tns:getPersonaList_v2Response"/>
+      <xs:complexType name="getPersonaList_v2">
+        <xs:sequence>
+          <xs:element name="token" type="xs:string"/>
+          <xs:element name="sign" type="xs:string"/>
+          <xs:element name="cuitRepresentada" type="xs:long"/>
+          <xs:element name="idPersona" type="xs:long" maxOccurs="unbounded"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="getPersonaList_v2Response">
+        <xs:sequence>
+          <xs:element name="personaListReturn" type="tns:personaListReturn" minOccurs="0"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="metadata">
+        <xs:sequence>
+          <xs:element name="fechaHora" type="xs:dateTime" minOccurs="0"/>
+          <xs:element name="servidor" type="xs:string" minOccurs="0"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="personaListReturn">
+        <xs:sequence>
+          <xs:element name="metadata" type="tns:metadata" minOccurs="0"/>
+          <xs:element name="persona" type="tns:personaReturn" minOccurs="0" maxOccurs="unbounded"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="personaReturn">
+        <xs:sequence>
+          <xs:element name="datosGenerales" type="tns:datosGenerales" minOccurs="0"/>
+          <xs:element name="datosMonotributo" type="tns:datosMonotributo" minOccurs="0"/>
+          <xs:element name="datosRegimenGeneral" type="tns:datosRegimenGeneral" minOccurs="0"/>
+          <xs:element name="errorConstancia" type="tns:errorConstancia" minOccurs="0"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="datosGenerales">
+        <xs:sequence>
+          <xs:element name="apellido" type="xs:string" minOccurs="0"/>
+          <xs:element name="domicilioFiscal" type="tns:domicilio" minOccurs="0"/>
+          <xs:element name="estadoClave" type="xs:string" minOccurs="0"/>
+          <xs:element name="idPersona" type="xs:long"/>
+          <xs:element name="nombre" type="xs:string" minOccurs="0"/>
+          <xs:element name="razonSocial" type="xs:string" minOccurs="0"/>
+          <xs:element name="tipoPersona" type="xs:string" minOccurs="0"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="domicilio">
+        <xs:sequence>
+          <xs:element name="codPostal" type="xs:string" minOccurs="0"/>
+          <xs:element name="descripcionProvincia" type="xs:string" minOccurs="0"/>
+          <xs:element name="direccion" type="xs:string" minOccurs="0"/>
+          <xs:element name="idProvincia" type="xs:int" minOccurs="0"/>
+          <xs:element name="localidad" type="xs:string" minOccurs="0"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="actividad">
+        <xs:sequence>
+          <xs:element name="descripcionActividad" type="xs:string" minOccurs="0"/>
+          <xs:element name="idActividad" type="xs:long"/>
+          <xs:element name="nomenclador" type="xs:int"/>
+          <xs:element name="orden" type="xs:int"/>
+          <xs:element name="periodo" type="xs:int"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="datosRegimenGeneral">
+        <xs:sequence>
+          <xs:element name="actividad" type="tns:actividad" minOccurs="0" maxOccurs="unbounded"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="datosMonotributo">
+        <xs:sequence>
+          <xs:element name="actividad" type="tns:actividad" minOccurs="0" maxOccurs="unbounded"/>
+          <xs:element name="actividadMonotributista" type="tns:actividad" minOccurs="0"/>
+        </xs:sequence>
+      </xs:complexType>
+      <xs:complexType name="errorConstancia">
+        <xs:sequence>
+          <xs:element name="apellido" type="xs:string" minOccurs="0"/>
+          <xs:element name="error" type="xs:string" minOccurs="0" maxOccurs="unbounded"/>
+          <xs:element name="idPersona" type="xs:long" minOccurs="0"/>
+          <xs:element name="nombre" type="xs:string" minOccurs="0"/>
+        </xs:sequence>
+      </xs:complexType>
+    </xs:schema>
+  </types>
+  <message name="getPersonaList_v2"><part name="parameters" element="tns:getPersonaList_v2"/></message>
+  <message name="getPersonaList_v2Response"><part name="parameters" element="tns:getPersonaList_v2Response"/></message>
+  <portType name="PersonaServiceA5">
+    <operation name="getPersonaList_v2">
+      <input message="tns:getPersonaList_v2"/>
+      <output message="tns:getPersonaList_v2Response"/>
+    </operation>
+  </portType>
+  <binding name="PersonaServiceA5PortBinding" type="tns:PersonaServiceA5">
+    <soap:binding transport="http://schemas.xmlsoap.org/soap/http" style="document"/>
+    <operation name="getPersonaList_v2">
+      <soap:operation soapAction=""/>
+      <input><soap:body use="literal"/></input>
+      <output><soap:body use="literal"/></output>
+    </operation>
+  </binding>
+  <service name="PersonaServiceA5">
+    <port name="PersonaServiceA5Port" binding="tns:PersonaServiceA5PortBinding">
+      <soap:address location="{url}"/>
+    </port>
+  </service>
+</definitions>
+"""
+
+# ======================================================
+# RESPUESTAS
+# ======================================================
+_SOBRE = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">'
+    "<soap:Body>{}</soap:Body></soap:Envelope>"
+)
+
+_PROVINCIAS = ["CORRIENTES", "CHACO", "MISIONES", "FORMOSA", "CIUDAD AUTONOMA BUENOS AIRES"]
+
+
+def _fault(codigo: str, mensaje: str) -> bytes:
+    return _SOBRE.format(
+        f"<soap:Fault><faultcode>{codigo}</faultcode>"
+        f"<faultstring>{escape(mensaje)}</faultstring></soap:Fault>"
+    ).encode("utf-8")
+
+
+def _actividad(tag: str, rnd: random.Random, orden: int) -> str:
+    id_act = rnd.randint(11111, 990000)
+    return (
+        f"<{tag}><descripcionActividad>ACTIVIDAD {id_act} DE PRUEBA</descripcionActividad>"
+        f"<idActividad>{id_act}</idActividad><nomenclador>883</nomenclador>"
+        f"<orden>{orden}</orden><periodo>201801</periodo></{tag}>"
+    )
+
+
+def _persona(cuit: str, actividades: int, tasa_sin_datos: float) -> str:
+    # Determinista por CUIT: la misma consulta devuelve siempre lo mismo
+    rnd = random.Random(int(cuit))
+
+    if rnd.random() < tasa_sin_datos:
+        return (
+            "<persona><errorConstancia>"
+            "<error>La clave se encuentra inactiva</error>"
+            f"<idPersona>{cuit}</idPersona>"
+            "</errorConstancia></persona>"
+        )
+
+    fisica = cuit[:2] in ("20", "23", "24", "27")
+    nombres = (
+        f"<apellido>APELLIDO{cuit[-4:]}</apellido>"
+        if fisica else ""
+    )
+    domicilio = (
+        "<domicilioFiscal><codPostal>3400</codPostal>"
+        f"<descripcionProvincia>{rnd.choice(_PROVINCIAS)}</descripcionProvincia>"
+        f"<direccion>CALLE {rnd.randint(1, 3000)}</direccion><idProvincia>7</idProvincia>"
+        "<localidad>LOCALIDAD DE PRUEBA</localidad></domicilioFiscal>"
+    )
+    generales = (
+        f"<datosGenerales>{nombres}{domicilio}<estadoClave>ACTIVO</estadoClave>"
+        f"<idPersona>{cuit}</idPersona>"
+        + (f"<nombre>NOMBRE{cuit[2:5]}</nombre>" if fisica else "")
+        + ("" if fisica else f"<razonSocial>EMPRESA {cuit} S.A.</razonSocial>")
+        + f"<tipoPersona>{'FISICA' if fisica else 'JURIDICA'}</tipoPersona></datosGenerales>"
+    )
+
+    acts = "".join(_actividad("actividad", rnd, i + 1) for i in range(actividades))
+    if fisica and rnd.random() < 0.5:
+        regimen = (
+            f"<datosMonotributo>{acts}"
+            f"{_actividad('actividadMonotributista', rnd, 1)}</datosMonotributo>"
+        )
+    else:
+        regimen = f"<datosRegimenGeneral>{acts}</datosRegimenGeneral>"
+
+    return f"<persona>{generales}{regimen}</persona>"
+
+
+def _respuesta_padron(cuits: list, actividades: int, tasa_sin_datos: float) -> bytes:
+    personas = "".join(_persona(c, actividades, tasa_sin_datos) for c in cuits)
+    return _SOBRE.format(
+        f'<ns2:getPersonaList_v2Response xmlns:ns2="{NS_A5}">'
+        "<personaListReturn><metadata>"
+        f"<fechaHora>{datetime.datetime.now().isoformat(timespec='seconds')}</fechaHora>"
+        "<servidor>mock</servidor></metadata>"
+        f"{personas}</personaListReturn>"
+        "</ns2:getPersonaList_v2Response>"
+    ).encode("utf-8")
+
+
+def _respuesta_wsaa() -> bytes:
+    ahora = datetime.datetime.now(datetime.timezone.utc)
+    ta = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<loginTicketResponse version="1.0"><header>'
+        f"<uniqueId>{int(time.time())}</uniqueId>"
+        f"<generationTime>{ahora.isoformat()}</generationTime>"
+        f"<expirationTime>{(ahora + datetime.timedelta(hours=12)).isoformat()}</expirationTime>"
+        "</header><credentials>"
+        f"<token>TOKEN-MOCK-{random.getrandbits(64):016x}</token>"
+        f"<sign>SIGN-MOCK-{random.getrandbits(64):016x}</sign>"
+        "</credentials></loginTicketResponse>"
+    )
+    return _SOBRE.format(
+        f'<loginCmsResponse xmlns="{NS_WSAA}">'
+        f"<loginCmsReturn>{escape(ta)}</loginCmsReturn></loginCmsResponse>"
+    ).encode("utf-8")
+
+# ======================================================
+# SERVIDOR
+# ======================================================
+_ID_PERSONA = etree.XPath("//*[local-name()='idPersona']/text()", smart_strings=False)
+_LOGIN_CMS = etree.XPath("//*[local-name()='loginCms']")
+
+
+class ConfigMock:
+    def __init__(
+        self,
+        latencia_ms: float = 200,
+        jitter_ms: float = 100,
+        tasa_error: float = 0.0,
+        actividades: int = 2,
+        tasa_sin_datos: float = 0.05,
+        seed: Optional[int] = None,
+    ):
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.tasa_error = tasa_error
+        self.actividades = actividades
+        self.tasa_sin_datos = tasa_sin_datos
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def demora(self) -> float:
+        """Latencia base + cola exponencial (como la de AFIP en horas pico)."""
+        with self._lock:
+            self.requests += 1
+            extra = self._rnd.expovariate(1 / self.jitter_ms) if self.jitter_ms > 0 else 0
+        return (self.latencia_ms + extra) / 1000
+
+    def falla(self) -> bool:
+        with self._lock:
+            return self._rnd.random() < self.tasa_error
+
+
+def _handler(config: ConfigMock):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _enviar(self, codigo: int, cuerpo: bytes) -> None:
+            self.send_response(codigo)
+            self.send_header("Content-Type", "text/xml; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def _url(self, ruta: str) -> str:
+            return f"http://{self.headers.get('Host')}{ruta}"
+
+        def do_GET(self):
+            if self.path.startswith("/wsaa"):
+                self._enviar(200, WSDL_WSAA.format(ns=NS_WSAA, url=self._url("/wsaa")).encode())
+            elif self.path.startswith("/padron"):
+                self._enviar(200, WSDL_PADRON.format(ns=NS_A5, url=self._url("/padron")).encode())
+            else:
+                self._enviar(404, b"")
+
+        def do_POST(self):
+            cuerpo = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(config.demora())
+
+            if config.falla():
+                self._enviar(500, _fault("soap:Server", "Error interno simulado"))
+                return
+
+            try:
+                root = etree.fromstring(cuerpo)
+            except etree.XMLSyntaxError:
+                self._enviar(400, _fault("soap:Client", "XML inválido"))
+                return
+
+            if self.path.startswith("/wsaa") and _LOGIN_CMS(root):
+                self._enviar(200, _respuesta_wsaa())
+            elif self.path.startswith("/padron"):
+                self._enviar(
+                    200,
+                    _respuesta_padron(_ID_PERSONA(root), config.actividades, config.tasa_sin_datos),
+                )
+            else:
+                self._enviar(500, _fault("soap:Client", "Operación desconocida"))
+
+    return Handler
+
+
+def iniciar(host: str = "127.0.0.1", puerto: int = 8089, config: Optional[ConfigMock] = None):
+    """
+    Levanta el mock en un thread daemon y devuelve el servidor
+    (server.server_address tiene el puerto real si se pidió 0).
+    """
+    server = ThreadingHTTPServer((host, puerto), _handler(config or ConfigMock()))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock local de WSAA y padrón A5")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8089)
+    parser.add_argument("--latencia-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--tasa-error", type=float, default=0.0)
+    parser.add_argument("--actividades", type=int, default=2, help="actividades por persona (tamaño de payload)")
+    parser.add_argument("--tasa-sin-datos", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        (args.host, args.puerto),
+        _handler(ConfigMock(
+            latencia_ms=args.latencia_ms,
+            jitter_ms=args.jitter_ms,
+            tasa_error=args.tasa_error,
+            actividades=args.actividades,
+            tasa_sin_datos=args.tasa_sin_datos,
+        )),
+    )
+    server.daemon_threads = True
+    print(f"Mock AFIP en http://{args.host}:{args.puerto}/wsaa?wsdl y /padron?wsdl", flush=True)
+    server.serve_forever()
@@ -0,0 +1,176 @@
+"""
+Benchmark del scanner de líneas del extractor bancario (Banco de Corrientes).
+
+Compara líneas/seg de la implementación anterior (una regex por línea,
+findall y str.replace por monto, copiada abajo tal cual como referencia)
+contra el LayoutSpec compilado (una sola pasada de finditer por página).
+No abre PDFs salvo que se pase --pdf: por defecto genera texto sintético
+con la misma forma que devuelve pdfplumber.
+
+Uso:
+    python -m bench.benchmark_layout --paginas 200 --lineas 60 --repeticiones 5
+    python -m bench.benchmark_layout --pdf resumen.pdf
+"""
+
+import argparse
+import random
+import re
+import time
+from datetime import date, datetime, timedelta
+
+from external.extractor_bancario.core.models import Transaction
+from external.extractor_bancario.parsers.banks.bcorrientes.resumen import (
+    ResumenBancoCorrientesParser,
+)
+
+
+def _monto(valor: float) -> str:
+    entero, dec = f"{valor:,.2f}".split(".")
+    return f"{entero.replace(',', '.')},{dec}"
+
+
+def generar_paginas(paginas: int, lineas: int, seed: int = 1) -> list:
+    """Páginas de resumen: encabezado, movimientos y tablas informativas al final."""
+    rnd = random.Random(seed)
+    saldo = 100000.0
+    dia = date(2024, 1, 1)
+
+    textos = []
+    for p in range(paginas):
+        filas = []
+        if p == 0:
+            filas += [
+                "BANCO DE CORRIENTES S.A.",
+                "RESUMEN DE CUENTA - CAJA DE AHORRO",
+                "Periodo: 01/01/24 al 31/12/24",
+                f"SALDO INICIAL {_monto(saldo)}",
+            ]
+        filas.append("FECHA CONCEPTO IMPORTE SALDO")
+
+        for _ in range(lineas):
+            dia += timedelta(days=rnd.random() < 0.2)
+            importe = round(rnd.uniform(100, 5000), 2)
+            if rnd.random() < 0.5:
+                saldo -= importe
+                concepto = f"DEBITO COMPRA {rnd.randint(1000, 99999)}"
+            else:
+                saldo += importe
+                concepto = f"TRANSFERENCIA RECIBIDA {rnd.randint(1000, 99999)}"
+            filas.append(f"{dia:%d/%m/%y} {concepto} {_monto(importe)} {_monto(saldo)}")
+
+        if p == paginas - 1:
+            filas += [
+                f"SALDO FINAL {_monto(saldo)}",
+                "TRANSFERENCIAS MEP",
+                f"{dia:%d/%m/%y} INFORMATIVO {_monto(1)} {_monto(2)}",
+            ]
+        filas.append(f"Página {p + 1} de {paginas}")
+        textos.append("\n".join(filas))
+    return textos
+
+
+# ======================================================
+# REFERENCIA: IMPLEMENTACIÓN ANTERIOR (LÍNEA POR LÍNEA)
+# ======================================================
+def legacy_iter_page(parser, page_text, p_idx, state):
+    money_pattern = re.compile(r"(\d{1,3}(?:[.,]\d{3})*[.,]\d{2})")
+    useful_text = re.split(r"TRANSFERENCIAS MEP|DEBITOS AUTOMATICOS", page_text, flags=re.I)[0]
+
+    for line in useful_text.split("\n"):
+        line = line.strip()
+        if not re.match(r"^\d{2}/\d{2}/\d{2}", line):
+            continue
+        if "saldo final" in line.lower() or "saldo inicial" in line.lower():
+            continue
+
+        date_str = line[:8]
+        content = line[8:].strip()
+        money_found = money_pattern.findall(content)
+
+        if len(money_found) >= 1:
+            try:
+                tx_date = datetime.strptime(date_str, "%d/%m/%y").date()
+                row_balance = parser._parse_amount(money_found[-1])
+                running_balance = state["running_balance"]
+                if running_balance is not None:
+                    amount = round(row_balance - running_balance, 2)
+                else:
+                    amount = parser._parse_amount(money_found[-2]) if len(money_found) > 1 else 0.0
+                if amount == 0 and len(money_found) < 2:
+                    continue
+                desc = content
+                for m in money_found:
+                    desc = desc.replace(m, "")
+                desc = re.sub(r"\s+", " ", desc).strip()
+                tx = Transaction(
+                    date=tx_date,
+                    description=desc,
+                    amount=amount,
+                    balance=row_balance,
+                    currency="ARS",
+                    type_hint="CREDIT" if amount > 0 else "DEBIT",
+                    source_page=p_idx,
+                    source_raw=line,
+                )
+                state["running_balance"] = row_balance
+                state["started"] = True
+            except Exception:
+                continue
+            yield tx
+
+
+def _correr(iter_page, parser, paginas: list) -> list:
+    state = {"running_balance": None, "started": False}
+    transacciones = []
+    for p_idx, texto in enumerate(paginas, 1):
+        transacciones.extend(iter_page(parser, texto, p_idx, state))
+    return transacciones
+
+
+def medir(iter_page, parser, paginas: list, repeticiones: int) -> float:
+    """Mejor tiempo (seg) de `repeticiones` corridas sobre todas las páginas."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        _correr(iter_page, parser, paginas)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+if __name__ == "__main__":
+    argp = argparse.ArgumentParser(description="Líneas/seg del scanner de resúmenes")
+    argp.add_argument("--pdf", help="tomar las páginas de un PDF real (pdfplumber)")
+    argp.add_argument("--paginas", type=int, default=200)
+    argp.add_argument("--lineas", type=int, default=60)
+    argp.add_argument("--repeticiones", type=int, default=5)
+    args = argp.parse_args()
+
+    if args.pdf:
+        import pdfplumber
+
+        with pdfplumber.open(args.pdf) as pdf:
+            paginas = [p.extract_text() or "" for p in pdf.pages]
+    else:
+        paginas = generar_paginas(args.paginas, args.lineas)
+
+    parser = ResumenBancoCorrientesParser()
+    lineas = sum(texto.count("\n") + 1 for texto in paginas)
+
+    antes = _correr(legacy_iter_page, parser, paginas)
+    despues = _correr(lambda p, *a: p._iter_page(*a), parser, paginas)
+
+    def _sin_desc(tx):
+        return (tx.date, tx.amount, tx.balance, tx.source_page, tx.source_raw)
+
+    iguales = [_sin_desc(t) for t in antes] == [_sin_desc(t) for t in despues]
+    descripciones = sum(a.description != d.description for a, d in zip(antes, despues))
+    print(f"{len(paginas)} páginas, {lineas} líneas, {len(despues)} movimientos")
+    print(f"Mismos movimientos (fecha/importe/saldo/página/línea): {'sí' if iguales else 'NO'}")
+    print(f"Descripciones distintas (str.replace anterior pisaba montos contenidos en otros): {descripciones}")
+
+    t_antes = medir(legacy_iter_page, parser, paginas, args.repeticiones)
+    t_despues = medir(lambda p, *a: p._iter_page(*a), parser, paginas, args.repeticiones)
+    print(f"{'':<10} {'seg':>8} {'líneas/s':>12}")
+    print(f"{'anterior':<10} {t_antes:>8.3f} {lineas / t_antes:>12,.0f}")
+    print(f"{'layout':<10} {t_despues:>8.3f} {lineas / t_despues:>12,.0f}")
+    print(f"x{t_antes / t_despues:.2f}")
@@ -0,0 +1,162 @@
+"""
+Benchmark del camino masivo del padrón (consultor_cuit) contra el mock local.
+
+Mide throughput (CUIT/s) y latencia p50/p95/p99 de cada getPersonaList_v2
+para distintos niveles de concurrencia, con el mismo ejecutor, rate limiter
+y gobernador que usa producción. No toca Postgres ni AFIP.
+
+Uso:
+    python -m bench.benchmark_padron --cuits 5000 --concurrencia 1 2 4 8 \\
+        --latencia-ms 300 --jitter-ms 200 --tasa-error 0.01 --modo xml zeep
+
+    # contra un mock ya levantado (bench.afip_mock) en otra terminal:
+    python -m bench.benchmark_padron --url http://127.0.0.1:8089
+"""
+
+import argparse
+import base64
+import random
+import time
+
+import numpy as np
+
+from bench import afip_mock
+from core import consultor_cuit
+from core.afip_clients import get_client
+from core.cuits import PESOS_CUIT
+from core.ejecutor_afip import TokenBucket, ejecutar_concurrente
+from core.gobernador_afip import GobernadorAFIP
+
+
+def generar_cuits(n: int, seed: int = 1) -> list:
+    """CUIT válidos (dígito verificador correcto) y distintos."""
+    rnd = random.Random(seed)
+    cuits = set()
+    while len(cuits) < n:
+        base = rnd.choice(["20", "23", "27", "30", "33"]) + f"{rnd.randint(0, 99999999):08d}"
+        dv = 11 - sum(int(d) * int(p) for d, p in zip(base, PESOS_CUIT)) % 11
+        if dv == 10:
+            continue
+        cuits.add(base + str(0 if dv == 11 else dv))
+    return sorted(cuits)
+
+
+def _percentiles(latencias: list) -> dict:
+    if not latencias:
+        return {"p50": None, "p95": None, "p99": None}
+    p50, p95, p99 = np.percentile(np.array(latencias) * 1000, [50, 95, 99])
+    return {"p50": round(p50), "p95": round(p95), "p99": round(p99)}
+
+
+def correr(client, cuits: list, workers: int, rate: float, modo: str) -> dict:
+    """Una corrida completa del pipeline por lotes con `workers` en paralelo."""
+    consultor_cuit.PADRON_XML_CRUDO = modo == "xml"
+
+    gob = GobernadorAFIP(limite_max=workers, umbral_fallos=10 ** 6)
+    limitador = TokenBucket(rate=rate, capacity=max(1, workers))
+    latencias = []
+
+    def _lote(lote):
+        inicio = time.perf_counter()
+        try:
+            return gob.llamar(consultor_cuit._consultar_lote, client, "TOKEN", "SIGN", lote)
+        finally:
+            latencias.append(time.perf_counter() - inicio)
+
+    tam = consultor_cuit.LOTE_PADRON
+    lotes = [cuits[i:i + tam] for i in range(0, len(cuits), tam)]
+
+    inicio = time.perf_counter()
+    resultados = ejecutar_concurrente(
+        lotes,
+        _lote,
+        max_workers=workers,
+        limitador=limitador,
+        reintentos=consultor_cuit.AFIP_REINTENTOS,
+        on_error=lambda lote, e: consultor_cuit._filas_error(lote, str(e)),
+    )
+    total_seg = time.perf_counter() - inicio
+
+    filas = [f for r in resultados for f in r.values()]
+    errores = sum(1 for f in filas if f.get("Error") and "Sin resultados" not in f["Error"])
+
+    return {
+        "modo": modo,
+        "workers": workers,
+        "cuits": len(filas),
+        "seg": round(total_seg, 2),
+        "cuits_por_seg": round(len(filas) / total_seg, 1),
+        "requests": len(latencias),
+        "errores": errores,
+        "limite_final": gob.estado()["limite_concurrencia"],
+        **_percentiles(latencias),
+    }
+
+
+def medir_wsaa(url: str, veces: int) -> dict:
+    """Latencia de loginCms (sin firma real: el mock no valida el CMS)."""
+    client = get_client(f"{url}/wsaa?wsdl")
+    cms = base64.b64encode(b"CMS-DE-PRUEBA").decode()
+    latencias = []
+    for _ in range(veces):
+        inicio = time.perf_counter()
+        client.service.loginCms(cms)
+        latencias.append(time.perf_counter() - inicio)
+    return {"wsaa_llamadas": veces, **_percentiles(latencias)}
+
+
+def verificar_fidelidad(url: str, cuits: list) -> list:
+    """Compara el mapeo zeep vs lxml sobre una respuesta real del mock."""
+    client = get_client(f"{url}/padron?wsdl")
+    with client.settings(raw_response=True):
+        respuesta = client.service.getPersonaList_v2("TOKEN", "SIGN", consultor_cuit.CUIT_EMISOR, cuits)
+    return consultor_cuit.verificar_fidelidad_xml(respuesta.content, cuits, wsdl=f"{url}/padron?wsdl")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del padrón A5 contra el mock local")
+    parser.add_argument("--url", help="mock ya levantado (si no, se levanta uno en un puerto libre)")
+    parser.add_argument("--cuits", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--modo", nargs="+", choices=["xml", "zeep"], default=["xml"])
+    parser.add_argument("--rate", type=float, default=1000, help="requests/seg del token bucket")
+    parser.add_argument("--latencia-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--tasa-error", type=float, default=0.0)
+    parser.add_argument("--actividades", type=int, default=2)
+    parser.add_argument("--wsaa", type=int, default=0, help="llamadas loginCms a medir")
+    args = parser.parse_args()
+
+    url = args.url
+    if not url:
+        server = afip_mock.iniciar(
+            puerto=0,
+            config=afip_mock.ConfigMock(
+                latencia_ms=args.latencia_ms,
+                jitter_ms=args.jitter_ms,
+                tasa_error=args.tasa_error,
+                actividades=args.actividades,
+                seed=1,
+            ),
+        )
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    cuits = generar_cuits(args.cuits)
+    client = get_client(f"{url}/padron?wsdl")
+
+    diferencias = verificar_fidelidad(url, cuits[:consultor_cuit.LOTE_PADRON])
+    print(f"Fidelidad xml vs zeep: {'OK' if not diferencias else f'{len(diferencias)} diferencias'}")
+    for d in diferencias[:10]:
+        print(f"  {d}")
+
+    if args.wsaa:
+        print(medir_wsaa(url, args.wsaa))
+
+    print(f"{'modo':<5} {'workers':>7} {'cuits':>6} {'seg':>7} {'cuit/s':>8} "
+          f"{'req':>5} {'err':>5} {'lim':>4} {'p50ms':>6} {'p95ms':>6} {'p99ms':>6}")
+    for modo in args.modo:
+        for workers in args.concurrencia:
+            r = correr(client, cuits, workers, args.rate, modo)
+            print(f"{r['modo']:<5} {r['workers']:>7} {r['cuits']:>6} {r['seg']:>7} "
+                  f"{r['cuits_por_seg']:>8} {r['requests']:>5} {r['errores']:>5} "
+                  f"{r['limite_final']:>4} {r['p50']:>6} {r['p95']:>6} {r['p99']:>6}")
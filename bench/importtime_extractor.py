@@ -0,0 +1,98 @@
+"""
+Presupuesto de tiempo de import del extractor bancario.
+
+Importa `external.extractor_bancario.service` en un intérprete limpio con
+`python -X importtime` (varias veces, se queda con la mediana) y falla si:
+- el import acumulado supera el presupuesto, o
+- se cargó algún módulo pesado que tiene que ser lazy (pdfplumber, los
+  parsers de cada banco, el pool de procesos, pandas).
+
+Uso:
+    python -m bench.importtime_extractor --budget-ms 120 --runs 5
+
+Sale con código 1 si se pasa del presupuesto. En CI lo corre
+tests/test_importtime_extractor.py (presupuesto: EXTRACTOR_IMPORT_BUDGET_MS);
+este script queda para ver el detalle de los módulos más lentos.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+MODULE = "external.extractor_bancario.service"
+
+# Módulos que NO se pueden cargar solo por importar el servicio
+LAZY_PREFIXES = [
+    "pdfplumber",
+    "pdfminer",
+    "pandas",
+    "concurrent.futures.process",
+    "external.extractor_bancario.parsers.banks.",
+]
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def medir() -> dict:
+    """Una corrida: {"total_ms", "modulos": {nombre: acumulado_ms}}."""
+    salida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+        cwd=RAIZ,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    modulos = {}
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea.split("|")
+        if not acumulado.strip().isdigit():
+            continue  # encabezado
+        if nombre.strip() == "site":
+            modulos = {}  # lo que cargó el arranque del intérprete no cuenta
+            continue
+        modulos[nombre.strip()] = int(acumulado) / 1000
+
+    return {"total_ms": modulos.get(MODULE, 0.0), "modulos": modulos}
+
+
+def revisar(budget_ms: float, runs: int) -> list:
+    corridas = [medir() for _ in range(runs)]
+    total = statistics.median(c["total_ms"] for c in corridas)
+
+    pesados = {
+        prefijo: sorted({
+            nombre for c in corridas for nombre in c["modulos"] if nombre.startswith(prefijo)
+        })
+        for prefijo in LAZY_PREFIXES
+    }
+
+    top = sorted(corridas[-1]["modulos"].items(), key=lambda kv: kv[1], reverse=True)
+    print(f"{MODULE}: {total:.1f} ms (mediana de {runs}, presupuesto {budget_ms:.0f} ms)")
+    for nombre, ms in top[1:11]:
+        print(f"  {ms:8.1f} ms  {nombre}")
+
+    problemas = []
+    if total > budget_ms:
+        problemas.append(f"import de {total:.1f} ms > presupuesto de {budget_ms:.0f} ms")
+    for prefijo, nombres in pesados.items():
+        if nombres:
+            problemas.append(f"se importó {nombres[0]} y {len(nombres) - 1} más (tiene que cargarse lazy)")
+    return problemas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Presupuesto de import del extractor bancario")
+    parser.add_argument("--budget-ms", type=float, default=120)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    problemas = revisar(args.budget_ms, args.runs)
+    for p in problemas:
+        print(f"FALLA: {p}")
+    print("OK" if not problemas else "")
+    sys.exit(1 if problemas else 0)
@@ -0,0 +1,46 @@
+import os
+import tempfile
+
+import streamlit as st
+from zeep import Client, Transport
+from zeep.cache import SqliteCache
+
+# ======================================================
+# CONFIG
+# ======================================================
+# Cache persistente de WSDL/XSD (sobrevive a reinicios del proceso)
+WSDL_CACHE_PATH = st.secrets.get(
+    "AFIP_WSDL_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "afip_zeep", "wsdl_cache.db"),
+)
+
+# Los WSDL de AFIP cambian muy poco: 7 días de vigencia
+WSDL_CACHE_TTL = int(st.secrets.get("AFIP_WSDL_CACHE_TTL", 7 * 24 * 3600))
+
+# ======================================================
+# CACHE EN DISCO
+# ======================================================
+@st.cache_resource
+def _wsdl_cache() -> SqliteCache:
+    os.makedirs(os.path.dirname(WSDL_CACHE_PATH), exist_ok=True)
+    return SqliteCache(path=WSDL_CACHE_PATH, timeout=WSDL_CACHE_TTL)
+
+# ======================================================
+# REGISTRO DE CLIENTES (UNO POR WSDL Y POR PROCESO)
+# ======================================================
+@st.cache_resource
+def get_client(wsdl: str, timeout: int = 20, operation_timeout: int = 20) -> Client:
+    """
+    Devuelve el cliente zeep del WSDL indicado.
+    Se construye una sola vez por proceso: el WSDL se descarga y parsea
+    en el primer uso y se reutiliza en todas las sesiones.
+
+    :param timeout: timeout de carga de WSDL/XSD (segundos)
+    :param operation_timeout: timeout de cada llamada SOAP (segundos)
+    """
+    transport = Transport(
+        cache=_wsdl_cache(),
+        timeout=timeout,
+        operation_timeout=operation_timeout,
+    )
+    return Client(wsdl, transport=transport)
@@ -1,7 +1,13 @@
-import streamlit as st
-from zeep import Client, Transport
+from typing import Callable, Optional
 
-from core.generar_ta import obtener_o_generar_ta
+import streamlit as st
+from core.afip_clients import get_client
+from core import padron_cache, padron_xml
+from core.cuits import cuit_valido
+from core.ejecutor_afip import TokenBucket, ejecutar_concurrente
+from core.gobernador_afip import CircuitoAbiertoError, gobernador
+from core.generar_ta import obtener_o_generar_ta, registrar_servicio
+from core.secretos import secreto_bool
 
 # ======================================================
 # CONFIGURACIÓN AFIP
@@ -12,7 +18,24 @@ WSDL_PADRON = st.secrets.get(
 )
 
 CUIT_EMISOR = st.secrets["AFIP_CUIT"]
-ZEEP_TRANSPORT = Transport(timeout=20)
+
+# Servicio WSAA del padrón A5
+SERVICE_PADRON = "ws_sr_constancia_inscripcion"
+registrar_servicio(SERVICE_PADRON)
+PADRON_TIMEOUT = 20
+
+# getPersonaList_v2 acepta hasta 250 CUIT por request
+LOTE_PADRON = 250
+LOTE_MIN = 25
+
+# Concurrencia y tasa máxima hacia AFIP (compartida por todo el proceso)
+AFIP_MAX_WORKERS = int(st.secrets.get("AFIP_MAX_WORKERS", 4))
+AFIP_RATE_POR_SEG = float(st.secrets.get("AFIP_RATE_POR_SEG", 2))
+AFIP_RAFAGA = int(st.secrets.get("AFIP_RAFAGA", 4))
+AFIP_REINTENTOS = int(st.secrets.get("AFIP_REINTENTOS", 2))
+
+# Parseo del padrón con lxml sobre el XML crudo (False = objetos zeep)
+PADRON_XML_CRUDO = secreto_bool("AFIP_PADRON_XML_CRUDO", True)
 
 # ======================================================
 # HELPERS
@@ -20,58 +43,27 @@ ZEEP_TRANSPORT = Transport(timeout=20)
 def _norm_cuit(x: str) -> str:
     return "".join(ch for ch in str(x) if ch.isdigit())
 
+@st.cache_resource
+def _limitador_afip() -> TokenBucket:
+    return TokenBucket(rate=AFIP_RATE_POR_SEG, capacity=AFIP_RAFAGA)
+
 # ======================================================
-# CONSULTA CUIT
+# MAPEO PERSONA → FILA
 # ======================================================
-def consultar_cuit(cuit: str) -> dict:
-    cuit_norm = _norm_cuit(cuit)
-
-    if not cuit_norm.isdigit() or len(cuit_norm) != 11:
-        return {
-            "CUIT": cuit_norm,
-            "Error": "CUIT inválido (debe tener 11 dígitos)"
-        }
-
-    # -------------------------
-    # AUTENTICACIÓN WSAA
-    # -------------------------
-    try:
-        token, sign = obtener_o_generar_ta()
-    except Exception as e:
-        return {
-            "CUIT": cuit_norm,
-            "Error": f"No se pudo autenticar con AFIP (WSAA): {e}"
-        }
-
-    # -------------------------
-    # CONSULTA PADRÓN A5
-    # -------------------------
-    try:
-        client = Client(WSDL_PADRON, transport=ZEEP_TRANSPORT)
-        respuesta = client.service.getPersonaList_v2(
-            token,
-            sign,
-            CUIT_EMISOR,
-            [cuit_norm]
-        )
-    except Exception as e:
-        return {
-            "CUIT": cuit_norm,
-            "Error": f"Error consultando AFIP: {e}"
-        }
-
-    personas = getattr(respuesta, "persona", None)
-
-    if not personas:
-        return {
-            "CUIT": cuit_norm,
-            "Error": "Sin resultados en AFIP"
-        }
+def _id_persona(persona) -> str:
+    """
+    CUIT de la persona devuelta por AFIP.
+    Viene en datosGenerales o, si hubo error de constancia, en errorConstancia.
+    """
+    for bloque in ("datosGenerales", "errorConstancia"):
+        datos = getattr(persona, bloque, None)
+        id_persona = getattr(datos, "idPersona", None) if datos else None
+        if id_persona:
+            return _norm_cuit(id_persona)
+    return ""
 
-    if not isinstance(personas, list):
-        personas = [personas]
 
-    persona = personas[0]
+def _persona_a_fila(cuit_norm: str, persona) -> dict:
     datos = getattr(persona, "datosGenerales", None)
 
     if not datos:
@@ -140,3 +132,299 @@ def consultar_cuit(cuit: str) -> dict:
         "Actividad Secundaria 3": actividades_secundarias[2] if len(actividades_secundarias) > 2 else "",
         "Actividad Secundaria 4": actividades_secundarias[3] if len(actividades_secundarias) > 3 else "",
     }
+
+# ======================================================
+# ERRORES DE TRANSPORTE
+# ======================================================
+ERROR_AFIP = "Error consultando AFIP"
+ERROR_WSAA = "No se pudo autenticar con AFIP (WSAA)"
+
+# Prefijos de las filas que fallaron sin respuesta de AFIP
+# (el último es el de CircuitoAbiertoError, ver gobernador_afip)
+_ERRORES_TRANSITORIOS = (ERROR_AFIP, ERROR_WSAA, "AFIP no disponible")
+
+# ======================================================
+# CONSULTA CUIT
+# ======================================================
+def consultar_cuit(cuit: str) -> dict:
+    return consultar_cuits([cuit])[0]
+
+# ======================================================
+# CONSULTA MASIVA (LOTES)
+# ======================================================
+def consultar_cuits(
+    cuits: list[str],
+    progreso: Optional[Callable[[int, int], None]] = None,
+    guardar_en_cache: bool = True,
+) -> list[dict]:
+    """
+    Consulta varios CUIT enviando getPersonaList_v2 por lotes de hasta LOTE_PADRON.
+    Los lotes se envían en paralelo (AFIP_MAX_WORKERS) respetando el rate limit,
+    el gobernador de concurrencia/circuit breaker y reintentando con backoff. Devuelve una fila por CUIT pedido, en el mismo
+    orden de entrada.
+
+    :param progreso: callback opcional (procesados, total) tras cada lote
+    :param guardar_en_cache: guarda las filas exitosas en la cache del padrón
+    """
+    cuits_norm = [_norm_cuit(c) for c in cuits]
+    total = len(cuits_norm)
+    filas: dict[str, dict] = {}
+
+    for cuit_norm in cuits_norm:
+        if not cuit_norm.isdigit() or len(cuit_norm) != 11:
+            filas[cuit_norm] = {
+                "CUIT": cuit_norm,
+                "Error": "CUIT inválido (debe tener 11 dígitos)"
+            }
+        elif not cuit_valido(cuit_norm):
+            filas[cuit_norm] = {
+                "CUIT": cuit_norm,
+                "Error": "CUIT inválido (dígito verificador incorrecto)"
+            }
+
+    pendientes = list(dict.fromkeys(c for c in cuits_norm if c not in filas))
+
+    if not pendientes:
+        if progreso:
+            progreso(total, total)
+        return [filas[c] for c in cuits_norm]
+
+    # -------------------------
+    # AUTENTICACIÓN WSAA (UNA VEZ POR CORRIDA)
+    # -------------------------
+    try:
+        token, sign = obtener_o_generar_ta(SERVICE_PADRON)
+    except Exception as e:
+        filas.update(_filas_error(pendientes, f"{ERROR_WSAA}: {e}"))
+        if progreso:
+            progreso(total, total)
+        return [filas[c] for c in cuits_norm]
+
+    # -------------------------
+    # CONSULTA PADRÓN A5
+    # -------------------------
+    try:
+        client = get_client(WSDL_PADRON, timeout=PADRON_TIMEOUT, operation_timeout=PADRON_TIMEOUT)
+    except Exception as e:
+        filas.update(_filas_error(pendientes, f"{ERROR_AFIP}: {e}"))
+        if progreso:
+            progreso(total, total)
+        return [filas[c] for c in cuits_norm]
+
+    # Lotes más chicos cuando hay pocos CUIT, para repartirlos entre workers
+    tam_lote = max(LOTE_MIN, min(LOTE_PADRON, -(-len(pendientes) // AFIP_MAX_WORKERS)))
+    lotes = [pendientes[i:i + tam_lote] for i in range(0, len(pendientes), tam_lote)]
+    ya_procesados = total - len(pendientes)
+
+    def _progreso_lotes(hechos: int, _total_lotes: int) -> None:
+        if progreso:
+            progreso(ya_procesados + min(len(pendientes), hechos * tam_lote), total)
+
+    gob = gobernador()
+
+    def _error_lote(lote: list[str], e: Exception) -> dict[str, dict]:
+        if isinstance(e, CircuitoAbiertoError):
+            return _filas_error(lote, str(e))
+        return _filas_error(lote, f"{ERROR_AFIP}: {e}")
+
+    resultados_lotes = ejecutar_concurrente(
+        lotes,
+        lambda lote: gob.llamar(_consultar_lote, client, token, sign, lote),
+        max_workers=AFIP_MAX_WORKERS,
+        limitador=_limitador_afip(),
+        reintentos=AFIP_REINTENTOS,
+        on_error=_error_lote,
+        progreso=_progreso_lotes,
+        reintentar_si=lambda e: not isinstance(e, CircuitoAbiertoError),
+    )
+
+    for filas_lote in resultados_lotes:
+        filas.update(filas_lote)
+
+    if guardar_en_cache:
+        try:
+            padron_cache.guardar([filas[c] for c in pendientes])
+        except Exception:
+            # La cache es una optimización: no frena la consulta
+            pass
+
+    return [filas[c] for c in cuits_norm]
+
+
+def _filas_error(lote: list[str], mensaje: str) -> dict[str, dict]:
+    return {
+        cuit_norm: {"CUIT": cuit_norm, "Error": mensaje}
+        for cuit_norm in lote
+    }
+
+
+def error_transitorio(fila: dict) -> bool:
+    """
+    True si la fila falló por transporte (red, SOAP, timeout, WSAA o circuito
+    abierto): volver a consultarla puede dar otra respuesta. "Sin resultados
+    en AFIP" o "CUIT inválido" son respuestas definitivas.
+    """
+    return (fila.get("Error") or "").startswith(_ERRORES_TRANSITORIOS)
+
+
+def _consultar_lote(client, token: str, sign: str, lote: list[str]) -> dict[str, dict]:
+    """
+    Un request getPersonaList_v2. Las fallas de red/SOAP se propagan
+    para que el ejecutor pueda reintentar.
+    """
+    if PADRON_XML_CRUDO:
+        # Modo liviano: body SOAP crudo + XPath (sin grafo de objetos zeep)
+        with client.settings(raw_response=True):
+            respuesta = client.service.getPersonaList_v2(
+                token,
+                sign,
+                CUIT_EMISOR,
+                lote
+            )
+        if respuesta.status_code != 200 and not respuesta.content:
+            raise RuntimeError(f"AFIP respondió HTTP {respuesta.status_code}")
+        personas = padron_xml.parsear_personas(respuesta.content)
+    else:
+        respuesta = client.service.getPersonaList_v2(
+            token,
+            sign,
+            CUIT_EMISOR,
+            lote
+        )
+        personas = _personas_zeep(respuesta)
+
+    return _mapear_personas(lote, personas)
+
+
+def _personas_zeep(respuesta) -> list:
+    personas = getattr(respuesta, "persona", None) or []
+
+    if not isinstance(personas, list):
+        personas = [personas]
+
+    return personas
+
+
+def _mapear_personas(lote: list[str], personas: list) -> dict[str, dict]:
+    pedidos = set(lote)
+    filas: dict[str, dict] = {}
+
+    for persona in personas:
+        cuit_norm = _id_persona(persona)
+
+        # Lote de un solo CUIT: AFIP responde por ese CUIT aunque no informe idPersona
+        if not cuit_norm and len(lote) == 1:
+            cuit_norm = lote[0]
+
+        if cuit_norm in pedidos and cuit_norm not in filas:
+            filas[cuit_norm] = _persona_a_fila(cuit_norm, persona)
+
+    for cuit_norm in lote:
+        filas.setdefault(cuit_norm, {
+            "CUIT": cuit_norm,
+            "Error": "Sin resultados en AFIP"
+        })
+
+    return filas
+
+
+# ======================================================
+# FIDELIDAD MODO XML CRUDO vs ZEEP
+# ======================================================
+class _RespuestaCruda:
+    """Lo mínimo de requests.Response que necesita zeep para procesar una respuesta."""
+
+    def __init__(self, contenido: bytes):
+        self.status_code = 200
+        self.content = contenido
+        self.headers = {"Content-Type": "text/xml; charset=utf-8"}
+        self.encoding = "utf-8"
+
+
+def verificar_fidelidad_xml(contenido: bytes, lote: list[str], wsdl: str = WSDL_PADRON) -> list[str]:
+    """
+    Mapea el mismo sobre SOAP de getPersonaList_v2 por los dos caminos
+    (zeep y lxml) y devuelve las diferencias encontradas (vacío = idénticos).
+
+    :param wsdl: WSDL con el que zeep interpreta la respuesta (ej. el del mock local)
+    """
+    client = get_client(wsdl, timeout=PADRON_TIMEOUT, operation_timeout=PADRON_TIMEOUT)
+    binding = client.service._binding
+    operacion = binding.get("getPersonaList_v2")
+
+    respuesta = binding.process_reply(client, operacion, _RespuestaCruda(contenido))
+
+    por_zeep = _mapear_personas(lote, _personas_zeep(respuesta))
+    por_xml = _mapear_personas(lote, padron_xml.parsear_personas(contenido))
+
+    diferencias = []
+    for cuit_norm in lote:
+        a, b = por_zeep.get(cuit_norm, {}), por_xml.get(cuit_norm, {})
+        for campo in sorted(set(a) | set(b)):
+            if a.get(campo) != b.get(campo):
+                diferencias.append(
+                    f"{cuit_norm} · {campo}: zeep={a.get(campo)!r} xml={b.get(campo)!r}"
+                )
+
+    return diferencias
+
+# ======================================================
+# PRECALENTADO NOCTURNO
+# ======================================================
+def precalentar_cache(
+    margen_dias: int = 1,
+    limite: Optional[int] = None,
+    progreso: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Refresca en la cache del padrón todos los CUIT de carteras que no están
+    cacheados o vencen pronto, usando el camino por lotes y con rate limit.
+    Pensado para correr fuera de horario (cron).
+    """
+    cuits = padron_cache.cuits_para_precalentar(margen_dias, limite)
+    filas = consultar_cuits(cuits, progreso=progreso)
+
+    errores = sum(1 for f in filas if f.get("Error"))
+    return {"total": len(cuits), "ok": len(cuits) - errores, "errores": errores}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Consultor de CUITs (padrón A5)",
+    )
+    parser.add_argument(
+        "--prewarm",
+        action="store_true",
+        help="Refresca la cache del padrón con los CUIT de todas las carteras",
+    )
+    parser.add_argument(
+        "--margen-dias",
+        type=int,
+        default=1,
+        help="Refresca también las entradas que vencen dentro de N días (default 1)",
+    )
+    parser.add_argument(
+        "--max",
+        type=int,
+        default=None,
+        help="Máximo de CUIT a refrescar en esta corrida",
+    )
+    args = parser.parse_args()
+
+    if not args.prewarm:
+        parser.print_help()
+        raise SystemExit(0)
+
+    inicio = time.monotonic()
+    resumen = precalentar_cache(
+        margen_dias=args.margen_dias,
+        limite=args.max,
+        progreso=lambda hechos, total: print(f"  {hechos}/{total}", flush=True),
+    )
+    print(
+        f"Precalentado: {resumen['total']} CUIT · {resumen['ok']} ok · "
+        f"{resumen['errores']} con error · {time.monotonic() - inicio:.1f}s"
+    )
@@ -0,0 +1,113 @@
+# core/cuits.py
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Pesos del dígito verificador (módulo 11) para los 10 primeros dígitos
+PESOS_CUIT = np.array([5, 4, 3, 2, 7, 6, 5, 4, 3, 2])
+
+
+def cuit_valido(cuit: str) -> bool:
+    """
+    Valida un CUIT ya normalizado (11 dígitos) con su dígito verificador.
+    """
+    if len(cuit) != 11 or not cuit.isascii() or not cuit.isdigit():
+        return False
+
+    suma = sum(int(d) * int(p) for d, p in zip(cuit[:10], PESOS_CUIT))
+    dv = 11 - suma % 11
+    if dv == 11:
+        dv = 0
+
+    return dv != 10 and dv == int(cuit[10])
+
+
+def _digito_verificador_ok(cuits: pd.Series) -> np.ndarray:
+    """
+    Dígito verificador vectorizado sobre CUIT de 11 dígitos ASCII.
+    """
+    if cuits.empty:
+        return np.zeros(0, dtype=bool)
+
+    digitos = (
+        np.frombuffer("".join(cuits.tolist()).encode("ascii"), dtype=np.uint8)
+        .reshape(-1, 11)
+        .astype(np.int64)
+        - ord("0")
+    )
+
+    dv = 11 - (digitos[:, :10] @ PESOS_CUIT) % 11
+    dv[dv == 11] = 0
+
+    return (dv != 10) & (dv == digitos[:, 10])
+
+
+def normalizar_cuits(serie: pd.Series) -> Dict:
+    """
+    Normaliza una columna de CUIT de un Excel, sin loops de Python.
+
+    - Quita todo lo que no sea dígito.
+    - Valida largo (11) y dígito verificador (módulo 11).
+    - Marca duplicados (se conserva la primera aparición).
+
+    Devuelve:
+    - "validos": lista de CUIT únicos y válidos, en orden de aparición
+    - "detalle": DataFrame por fila (fila, valor, CUIT, estado, motivo)
+      con estado VALIDO | INVALIDO | DUPLICADO
+    - "total_validos", "total_invalidos", "total_duplicados"
+    """
+    original = serie.fillna("").astype(str)
+    cuits = original.str.replace(r"[^0-9]", "", regex=True)
+
+    largo_ok = cuits.str.len() == 11
+
+    dv_ok = pd.Series(False, index=cuits.index)
+    dv_ok[largo_ok] = _digito_verificador_ok(cuits[largo_ok])
+
+    valido = largo_ok & dv_ok
+    duplicado = valido & cuits.where(valido).duplicated(keep="first")
+
+    estado = np.select(
+        [duplicado, valido],
+        ["DUPLICADO", "VALIDO"],
+        default="INVALIDO",
+    )
+
+    # "Vacío" solo si la celda está vacía: "abc" o dígitos no ASCII
+    # (quedan sin dígitos tras normalizar) son "No tiene 11 dígitos"
+    motivo = np.select(
+        [
+            original.str.strip() == "",
+            ~largo_ok,
+            ~dv_ok,
+            duplicado,
+        ],
+        [
+            "Vacío",
+            "No tiene 11 dígitos",
+            "Dígito verificador incorrecto",
+            "Repetido en el archivo",
+        ],
+        default="",
+    )
+
+    detalle = pd.DataFrame({
+        # +2: fila 1 es el encabezado del Excel
+        "fila": np.arange(len(serie)) + 2,
+        "valor": original.to_numpy(),
+        "CUIT": cuits.to_numpy(),
+        "estado": estado,
+        "motivo": motivo,
+    })
+
+    validos = cuits[valido & ~duplicado].tolist()
+
+    return {
+        "validos": validos,
+        "detalle": detalle,
+        "total_validos": len(validos),
+        "total_invalidos": int((estado == "INVALIDO").sum()),
+        "total_duplicados": int(duplicado.sum()),
+    }
@@ -0,0 +1,118 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional, Sequence
+
+
+# ======================================================
+# RATE LIMITER (TOKEN BUCKET)
+# ======================================================
+class TokenBucket:
+    """
+    Limita la tasa de requests a AFIP.
+    Repone `rate` tokens por segundo hasta `capacity` (ráfaga máxima).
+    Es thread-safe: se comparte entre todos los workers del proceso.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate y capacity deben ser positivos")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Bloquea hasta obtener un token."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.rate
+            time.sleep(espera)
+
+
+# ======================================================
+# BACKOFF
+# ======================================================
+def _backoff_con_jitter(intento: int, base: float, maximo: float) -> float:
+    """Full jitter: espera aleatoria entre 0 y base * 2^intento (acotada)."""
+    return random.uniform(0, min(maximo, base * (2 ** intento)))
+
+
+# ======================================================
+# EJECUCIÓN CONCURRENTE
+# ======================================================
+def ejecutar_concurrente(
+    items: Sequence[Any],
+    fn: Callable[[Any], Any],
+    max_workers: int = 4,
+    limitador: Optional[TokenBucket] = None,
+    reintentos: int = 2,
+    backoff_base: float = 0.5,
+    backoff_max: float = 8.0,
+    on_error: Optional[Callable[[Any, Exception], Any]] = None,
+    progreso: Optional[Callable[[int, int], None]] = None,
+    reintentar_si: Optional[Callable[[Exception], bool]] = None,
+) -> list:
+    """
+    Ejecuta `fn(item)` para cada item con un pool acotado de threads.
+    Devuelve los resultados en el MISMO orden que `items`.
+
+    - Cada llamada pasa por el `limitador` (si hay) antes de salir a AFIP.
+    - Si `fn` lanza excepción se reintenta hasta `reintentos` veces con backoff
+      (solo si `reintentar_si(exc)` es True, cuando se indica).
+    - Agotados los reintentos, el resultado es `on_error(item, exc)`
+      (o la excepción se propaga si no hay `on_error`).
+    - `progreso(hechos, total)` se invoca desde el thread que llama,
+      así puede actualizar widgets de Streamlit.
+    """
+    total = len(items)
+    resultados: list = [None] * total
+
+    if total == 0:
+        return resultados
+
+    def _tarea(item):
+        intento = 0
+        while True:
+            if limitador:
+                limitador.acquire()
+            try:
+                return fn(item)
+            except Exception as e:
+                if intento >= reintentos or (reintentar_si and not reintentar_si(e)):
+                    raise
+                time.sleep(_backoff_con_jitter(intento, backoff_base, backoff_max))
+                intento += 1
+
+    workers = max(1, min(int(max_workers), total))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(_tarea, item): idx for idx, item in enumerate(items)}
+
+        hechos = 0
+        for futuro in as_completed(futuros):
+            idx = futuros[futuro]
+            try:
+                resultados[idx] = futuro.result()
+            except Exception as e:
+                if on_error is None:
+                    raise
+                resultados[idx] = on_error(items[idx], e)
+
+            hechos += 1
+            if progreso:
+                progreso(hechos, total)
+
+    return resultados
@@ -1,59 +1,71 @@
-import os
 import time
 import base64
 import datetime
-import subprocess
-import pickle
-import tempfile
+import threading
 import xml.etree.ElementTree as ET
 
 import pytz
 import streamlit as st
-import zeep
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.serialization import pkcs7
+
+from core.afip_clients import get_client
+from core.gobernador_afip import gobernador
+from core import ta_store
 
 # ======================================================
 # CONFIG
 # ======================================================
+# Servicio por defecto (padrón A5 = constancia de inscripción)
 SERVICE = "ws_sr_constancia_inscripcion"
+CUIT_REPRESENTADA = st.secrets["AFIP_CUIT"]
 WSDL_AUTH = st.secrets.get(
     "AFIP_WSAA_URL",
     "https://wsaa.afip.gov.ar/ws/services/LoginCms?WSDL"
 )
 
+WSAA_TIMEOUT = 30
+
 TZ = pytz.timezone("America/Argentina/Buenos_Aires")
 
-TA_DIR = os.path.join(tempfile.gettempdir(), "afip_ta")
-os.makedirs(TA_DIR, exist_ok=True)
+# Se renueva el TA este margen antes de su expiración
+RENOVAR_ANTES = datetime.timedelta(minutes=10)
+
+# Refresco automático: servicios mantenidos, anticipación y reintento tras un error
+SERVICIOS = list(st.secrets.get("AFIP_WSAA_SERVICIOS", [SERVICE]))
+REFRESCO_ANTES = datetime.timedelta(minutes=int(st.secrets.get("AFIP_TA_REFRESCO_MIN", 30)))
+REFRESCO_INTERVALO_SEG = 60
+
+# Despierta al thread de refresco antes de tiempo (servicio nuevo)
+_DESPERTAR = threading.Event()
 
-TRA_XML = os.path.join(TA_DIR, "TRA.xml")
-TRA_SIGNED = os.path.join(TA_DIR, "TRA.cms")
-TA_FILE = os.path.join(TA_DIR, f"{SERVICE}.pkl")
+# Cache de TA por proceso (servicio → {token, sign, expiration})
+_TA_CACHE = {}
+_TA_LOCKS = {}
+_LOCKS_LOCK = threading.Lock()
+
+# WSAA rechazó renovar (alreadyAuthenticated): servicio → expiración del TA
+# vigente. Hasta esa expiración no se vuelve a pedir (la respuesta sería la misma)
+_RENOVACION_RECHAZADA = {}
+
+# Métricas del refresco (servicio → {expiracion, ultimo_refresco, duracion_seg, ultimo_error})
+_METRICAS = {}
 
 # ======================================================
 # HELPERS
 # ======================================================
-def _write_secret_file(secret_key: str, filename: str) -> str:
+def _leer_secret(secret_key: str) -> bytes:
     content = st.secrets.get(secret_key)
     if not content:
         raise RuntimeError(f"Falta secret {secret_key}")
-    path = os.path.join(TA_DIR, filename)
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(content)
-    return path
-
-
-def _openssl_ok():
-    subprocess.run(
-        ["openssl", "version"],
-        check=True,
-        capture_output=True
-    )
+    return content.encode("utf-8")
 
 
 # ======================================================
 # GENERAR TRA
 # ======================================================
-def _generar_tra():
+def _generar_tra(service: str) -> bytes:
     now = datetime.datetime.now(TZ)
 
     root = ET.Element("loginTicketRequest", version="1.0")
@@ -66,37 +78,44 @@ def _generar_tra():
         now + datetime.timedelta(hours=12)
     ).isoformat()
 
-    ET.SubElement(root, "service").text = SERVICE
-
-    with open(TRA_XML, "wb") as f:
-        f.write(ET.tostring(root, encoding="utf-8"))
-
-
-def _firmar_tra(cert_path: str, key_path: str):
-    _openssl_ok()
-    subprocess.run(
-        [
-            "openssl", "smime", "-sign",
-            "-signer", cert_path,
-            "-inkey", key_path,
-            "-in", TRA_XML,
-            "-out", TRA_SIGNED,
-            "-outform", "DER",
-            "-nodetach",
-        ],
-        check=True
+    ET.SubElement(root, "service").text = service
+
+    return ET.tostring(root, encoding="utf-8")
+
+
+def _firmar_tra(tra: bytes) -> bytes:
+    """
+    Firma el TRA como CMS/PKCS#7 con el contenido embebido
+    (equivalente a `openssl smime -sign -nodetach -outform DER`).
+    """
+    cert = x509.load_pem_x509_certificate(_leer_secret("AFIP_CERT_PEM"))
+    key = serialization.load_pem_private_key(_leer_secret("AFIP_KEY_PEM"), password=None)
+
+    return (
+        pkcs7.PKCS7SignatureBuilder()
+        .set_data(tra)
+        .add_signer(cert, key, hashes.SHA256())
+        .sign(serialization.Encoding.DER, [])
     )
 
 
+def _es_ta_ya_vigente(e: Exception) -> bool:
+    """WSAA rechaza el loginCms porque ya emitió un TA que sigue vigente."""
+    return "alreadyAuthenticated" in f"{getattr(e, 'code', '')} {e}"
+
+
 # ======================================================
 # OBTENER TA
 # ======================================================
-def _obtener_ta():
-    with open(TRA_SIGNED, "rb") as f:
-        cms = base64.b64encode(f.read()).decode()
-
-    client = zeep.Client(WSDL_AUTH)
-    response = client.service.loginCms(cms)
+def _obtener_ta(cms_der: bytes):
+    cms = base64.b64encode(cms_der).decode()
+
+    client = get_client(WSDL_AUTH, timeout=WSAA_TIMEOUT, operation_timeout=WSAA_TIMEOUT)
+    response = gobernador().llamar(
+        client.service.loginCms,
+        cms,
+        es_fallo=lambda e: not _es_ta_ya_vigente(e),
+    )
 
     root = ET.fromstring(response)
     token = root.findtext(".//token")
@@ -112,48 +131,172 @@ def _obtener_ta():
 
     expiration = expiration.astimezone(TZ)
 
-    with open(TA_FILE, "wb") as f:
-        pickle.dump(
-            {"token": token, "sign": sign, "expiration": expiration},
-            f
-        )
-
-    return token, sign
+    return {"token": token, "sign": sign, "expiration": expiration}
 
 
-def _ta_valido():
-    if not os.path.exists(TA_FILE):
-        return False
-    try:
-        with open(TA_FILE, "rb") as f:
-            ta = pickle.load(f)
-        return ta["expiration"] > datetime.datetime.now(TZ)
-    except Exception:
+def _ta_vigente(ta, margen=datetime.timedelta(0)) -> bool:
+    if not ta or not ta.get("expiration"):
         return False
+    return ta["expiration"] - margen > datetime.datetime.now(TZ)
+
+
+def _renovar_ta(service: str):
+    """
+    Pide un TA nuevo a WSAA. TRA, firma y claves quedan en memoria.
+    Registra cuándo se renovó y cuánto tardó.
+    """
+    inicio = time.monotonic()
+    ta = _obtener_ta(_firmar_tra(_generar_tra(service)))
+
+    _METRICAS[service] = {
+        **_METRICAS.get(service, {}),
+        "ultimo_refresco": datetime.datetime.now(TZ),
+        "duracion_seg": round(time.monotonic() - inicio, 3),
+        "ultimo_error": None,
+    }
+    return ta
+
+
+def _renovacion_rechazada(service: str, ta) -> bool:
+    """True si WSAA ya rechazó renovar este TA, que sigue vigente."""
+    return _ta_vigente(ta) and _RENOVACION_RECHAZADA.get(service) == ta["expiration"]
+
+
+def _lock_servicio(service: str) -> threading.Lock:
+    with _LOCKS_LOCK:
+        return _TA_LOCKS.setdefault(service, threading.Lock())
+
+
+def _asegurar_ta(service: str, margen: datetime.timedelta) -> dict:
+    """
+    Devuelve un TA que no vence dentro de `margen`.
+
+    - Camino rápido: TA en memoria del proceso, sin I/O.
+    - Si falta o está por vencer, se lee el TA compartido en Postgres.
+    - Si también está por vencer, un solo caller renueva (lock local +
+      advisory lock en Postgres) y el resto espera y reutiliza ese resultado.
+    - WSAA no emite un TA nuevo mientras el actual siga vigente
+      (alreadyAuthenticated): el rechazo se recuerda y, hasta que el TA
+      venza, se sigue usando sin volver a llamar a WSAA.
+    """
+    ta = _TA_CACHE.get(service)
+    if _ta_vigente(ta, margen) or _renovacion_rechazada(service, ta):
+        return ta
+
+    with _lock_servicio(service):
+        # Otro thread pudo haber renovado mientras esperábamos el lock
+        ta = _TA_CACHE.get(service)
+        if _renovacion_rechazada(service, ta):
+            return ta
+
+        if not _ta_vigente(ta, margen):
+            # TA compartido entre réplicas (Postgres)
+            ta = ta_store.leer_ta(service, CUIT_REPRESENTADA)
+
+        if not _ta_vigente(ta, margen):
+            rechazada = []
+
+            def renovar():
+                try:
+                    return _renovar_ta(service)
+                except Exception as e:
+                    if _es_ta_ya_vigente(e):
+                        rechazada.append(e)
+                    raise
+
+            ta = ta_store.renovar_ta_serializado(
+                service,
+                CUIT_REPRESENTADA,
+                vigente=lambda t: _ta_vigente(t, margen),
+                renovar=renovar,
+                utilizable=_ta_vigente,
+            )
+
+            # Se devolvió el TA actual porque WSAA rechazó renovarlo
+            if rechazada:
+                _RENOVACION_RECHAZADA[service] = ta["expiration"]
+
+        _TA_CACHE[service] = ta
+        _METRICAS.setdefault(service, {})["expiracion"] = ta["expiration"]
+        return ta
 
 
 # ======================================================
-# API PÚBLICA
+# REFRESCO EN SEGUNDO PLANO
 # ======================================================
-def obtener_o_generar_ta():
-    cert_path = _write_secret_file("AFIP_CERT_PEM", "cert.pem")
-    key_path  = _write_secret_file("AFIP_KEY_PEM", "key.pem")
-
-    try:
-        if not _ta_valido():
-            _generar_tra()
-            _firmar_tra(cert_path, key_path)
-            return _obtener_ta()
-
-        with open(TA_FILE, "rb") as f:
-            ta = pickle.load(f)
-        return ta["token"], ta["sign"]
-
-    finally:
-        for p in (cert_path, key_path):
+def registrar_servicio(service: str) -> None:
+    """Agrega un servicio WSAA a la lista que mantiene el refresco automático."""
+    with _LOCKS_LOCK:
+        if service not in SERVICIOS:
+            SERVICIOS.append(service)
+            _DESPERTAR.set()
+
+
+def _proxima_espera() -> float:
+    """
+    Segundos hasta el próximo intento útil de renovar algún servicio:
+    - TA vigente: cuando entra en la ventana de REFRESCO_ANTES; si WSAA ya
+      rechazó renovarlo (alreadyAuthenticated), recién cuando vence.
+    - Sin TA, o con un intento que ya tocaba y falló: REFRESCO_INTERVALO_SEG.
+    """
+    ahora = datetime.datetime.now(TZ)
+    esperas = []
+
+    for service in list(SERVICIOS):
+        ta = _TA_CACHE.get(service)
+        if not _ta_vigente(ta):
+            esperas.append(REFRESCO_INTERVALO_SEG)
+            continue
+
+        if _renovacion_rechazada(service, ta):
+            proximo = ta["expiration"] + datetime.timedelta(seconds=1)
+        else:
+            proximo = ta["expiration"] - REFRESCO_ANTES
+
+        segundos = (proximo - ahora).total_seconds()
+        esperas.append(segundos if segundos > 0 else REFRESCO_INTERVALO_SEG)
+
+    return max(1.0, min(esperas, default=REFRESCO_INTERVALO_SEG))
+
+
+def _loop_refresco() -> None:
+    while True:
+        for service in list(SERVICIOS):
             try:
-                os.remove(p)
-            except:
-                pass
+                _asegurar_ta(service, REFRESCO_ANTES)
+            except Exception as e:
+                _METRICAS.setdefault(service, {})["ultimo_error"] = str(e)
+
+        _DESPERTAR.wait(_proxima_espera())
+        _DESPERTAR.clear()
 
 
+@st.cache_resource
+def iniciar_refresco_automatico() -> threading.Thread:
+    """
+    Arranca (una vez por proceso) el thread que renueva los TA de SERVICIOS
+    REFRESCO_ANTES de su vencimiento, para que ninguna consulta espere a WSAA.
+    Duerme hasta el próximo intento útil: no consulta a WSAA cada minuto.
+    """
+    hilo = threading.Thread(target=_loop_refresco, name="afip-ta-refresco", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def estado_tickets() -> list[dict]:
+    """Métricas por servicio: vencimiento, último refresco, duración y error."""
+    return [
+        {"servicio": service, **_METRICAS.get(service, {})}
+        for service in list(SERVICIOS)
+    ]
+
+
+# ======================================================
+# API PÚBLICA
+# ======================================================
+def obtener_o_generar_ta(service: str = SERVICE):
+    """
+    Devuelve (token, sign) vigentes para el servicio WSAA indicado.
+    """
+    ta = _asegurar_ta(service, RENOVAR_ANTES)
+    return ta["token"], ta["sign"]
@@ -0,0 +1,188 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import streamlit as st
+
+# ======================================================
+# CONFIG
+# ======================================================
+AFIP_CONCURRENCIA_MAX = int(st.secrets.get("AFIP_MAX_WORKERS", 4))
+AFIP_LATENCIA_OBJETIVO_SEG = float(st.secrets.get("AFIP_LATENCIA_OBJETIVO_SEG", 8))
+AFIP_CIRCUITO_FALLOS = int(st.secrets.get("AFIP_CIRCUITO_FALLOS", 5))
+AFIP_CIRCUITO_ENFRIAMIENTO_SEG = int(st.secrets.get("AFIP_CIRCUITO_ENFRIAMIENTO_SEG", 60))
+
+
+class CircuitoAbiertoError(RuntimeError):
+    """AFIP viene fallando: la llamada se rechaza sin salir a la red."""
+
+
+# ======================================================
+# GOBERNADOR DE LLAMADAS A AFIP
+# ======================================================
+class GobernadorAFIP:
+    """
+    Controla todas las llamadas salientes a AFIP (padrón y WSAA).
+
+    Concurrencia adaptativa (AIMD):
+    - éxito con latencia <= objetivo → el límite sube de a poco (+1 por "ventana")
+    - éxito lento → el límite baja (x0.7)
+    - error → el límite baja a la mitad
+
+    Circuit breaker:
+    - CERRADO: normal
+    - ABIERTO: tras `umbral_fallos` errores seguidos; rechaza todo durante
+      `enfriamiento_seg`
+    - SEMIABIERTO: pasado el enfriamiento deja pasar una sola llamada de
+      prueba; si sale bien vuelve a CERRADO, si no, a ABIERTO
+    """
+
+    def __init__(
+        self,
+        limite_max: int = 4,
+        limite_min: int = 1,
+        latencia_objetivo: float = 8.0,
+        umbral_fallos: int = 5,
+        enfriamiento_seg: int = 60,
+    ):
+        self.limite_max = max(1, limite_max)
+        self.limite_min = max(1, min(limite_min, self.limite_max))
+        self.latencia_objetivo = latencia_objetivo
+        self.umbral_fallos = umbral_fallos
+        self.enfriamiento_seg = enfriamiento_seg
+
+        self._cond = threading.Condition()
+        self._limite = float(max(self.limite_min, self.limite_max // 2))
+        self._en_vuelo = 0
+        self._fallos_seguidos = 0
+        self._estado = "CERRADO"
+        self._abierto_hasta = 0.0
+        self._prueba_en_vuelo = False
+        self._ultimo_error = None
+        self._latencia_ewma = None
+
+    # -------------------------
+    # ESTADO DEL CIRCUITO
+    # -------------------------
+    def _verificar_circuito(self) -> bool:
+        """Devuelve True si esta llamada es la de prueba (SEMIABIERTO)."""
+        if self._estado == "ABIERTO":
+            if time.monotonic() < self._abierto_hasta:
+                raise CircuitoAbiertoError(
+                    f"AFIP no disponible (circuito abierto): {self._ultimo_error}"
+                )
+            self._estado = "SEMIABIERTO"
+
+        if self._estado == "SEMIABIERTO":
+            if self._prueba_en_vuelo:
+                raise CircuitoAbiertoError(
+                    f"AFIP no disponible (verificando recuperación): {self._ultimo_error}"
+                )
+            self._prueba_en_vuelo = True
+            return True
+
+        return False
+
+    def _abrir(self) -> None:
+        self._estado = "ABIERTO"
+        self._abierto_hasta = time.monotonic() + self.enfriamiento_seg
+
+    # -------------------------
+    # ENTRADA / SALIDA
+    # -------------------------
+    def _entrar(self) -> bool:
+        with self._cond:
+            while True:
+                es_prueba = self._verificar_circuito()
+                if es_prueba or self._en_vuelo < int(self._limite):
+                    self._en_vuelo += 1
+                    return es_prueba
+                self._cond.wait(timeout=1)
+
+    def _salir(self, ok: bool, latencia: float, es_prueba: bool, error: str = None) -> None:
+        with self._cond:
+            self._en_vuelo -= 1
+
+            if es_prueba:
+                self._prueba_en_vuelo = False
+
+            if ok:
+                self._fallos_seguidos = 0
+                self._estado = "CERRADO"
+                self._latencia_ewma = (
+                    latencia if self._latencia_ewma is None
+                    else 0.8 * self._latencia_ewma + 0.2 * latencia
+                )
+
+                if latencia <= self.latencia_objetivo:
+                    self._limite += 1 / max(self._limite, 1)
+                else:
+                    self._limite *= 0.7
+            else:
+                self._fallos_seguidos += 1
+                self._ultimo_error = error
+                self._limite *= 0.5
+
+                if es_prueba or self._fallos_seguidos >= self.umbral_fallos:
+                    self._abrir()
+
+            self._limite = min(float(self.limite_max), max(float(self.limite_min), self._limite))
+            self._cond.notify_all()
+
+    def llamar(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        es_fallo: Optional[Callable[[Exception], bool]] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Ejecuta `fn` respetando el límite de concurrencia y el circuito.
+        Lanza CircuitoAbiertoError sin llamar a `fn` si el circuito está abierto.
+
+        :param es_fallo: si se indica y devuelve False, la excepción es una
+            respuesta válida de AFIP (ej. un Fault de negocio) y no cuenta como falla
+        """
+        es_prueba = self._entrar()
+        inicio = time.monotonic()
+
+        try:
+            resultado = fn(*args, **kwargs)
+        except Exception as e:
+            fallo = es_fallo(e) if es_fallo else True
+            self._salir(not fallo, time.monotonic() - inicio, es_prueba, str(e))
+            raise
+
+        self._salir(True, time.monotonic() - inicio, es_prueba)
+        return resultado
+
+    # -------------------------
+    # MÉTRICAS
+    # -------------------------
+    def estado(self) -> dict:
+        with self._cond:
+            restante = max(0.0, self._abierto_hasta - time.monotonic())
+            return {
+                "circuito": self._estado,
+                "reintento_en_seg": int(restante) if self._estado == "ABIERTO" else 0,
+                "limite_concurrencia": int(self._limite),
+                "en_vuelo": self._en_vuelo,
+                "fallos_seguidos": self._fallos_seguidos,
+                "latencia_media_seg": round(self._latencia_ewma, 2) if self._latencia_ewma else None,
+                "ultimo_error": self._ultimo_error,
+            }
+
+    def disponible(self) -> bool:
+        with self._cond:
+            return not (self._estado == "ABIERTO" and time.monotonic() < self._abierto_hasta)
+
+
+@st.cache_resource
+def gobernador() -> GobernadorAFIP:
+    """Instancia única por proceso, compartida por consultor_cuit y generar_ta."""
+    return GobernadorAFIP(
+        limite_max=AFIP_CONCURRENCIA_MAX,
+        latencia_objetivo=AFIP_LATENCIA_OBJETIVO_SEG,
+        umbral_fallos=AFIP_CIRCUITO_FALLOS,
+        enfriamiento_seg=AFIP_CIRCUITO_ENFRIAMIENTO_SEG,
+    )
@@ -0,0 +1,200 @@
+from typing import Dict, List, Optional
+
+import streamlit as st
+from psycopg2.extras import Json, execute_values
+
+from auth.db import get_connection
+from auth.limits import get_current_period
+from core.secretos import secreto_bool
+
+# ======================================================
+# CONFIG
+# ======================================================
+# Días que un resultado del padrón se considera vigente
+PADRON_CACHE_TTL_DIAS = int(st.secrets.get("PADRON_CACHE_TTL_DIAS", 30))
+
+# Si es False, los CUIT servidos desde cache no consumen cupo
+PADRON_CACHE_COBRAR_HITS = secreto_bool("PADRON_CACHE_COBRAR_HITS", True)
+
+# ======================================================
+# LECTURA
+# ======================================================
+def buscar(cuits: List[str]) -> Dict[str, dict]:
+    """
+    Devuelve {cuit: fila} para los CUIT (normalizados) con resultado vigente.
+    Una sola consulta para todo el lote.
+    """
+    if not cuits:
+        return {}
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT cuit, fila
+                FROM padron_cache
+                WHERE cuit = ANY(%s)
+                  AND consultado_at > CURRENT_TIMESTAMP - make_interval(days => %s)
+                """,
+                (list(cuits), PADRON_CACHE_TTL_DIAS),
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    return {r["cuit"]: dict(r["fila"]) for r in rows}
+
+# ======================================================
+# ESCRITURA
+# ======================================================
+def guardar(filas: List[dict]) -> None:
+    """
+    Guarda (upsert) las filas exitosas. Las filas con "Error" no se cachean.
+    """
+    valores = [
+        (f["CUIT"], Json(f))
+        for f in filas
+        if f.get("CUIT") and not f.get("Error")
+    ]
+    if not valores:
+        return
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO padron_cache (cuit, fila, consultado_at)
+                    VALUES %s
+                    ON CONFLICT (cuit)
+                    DO UPDATE SET
+                        fila = EXCLUDED.fila,
+                        consultado_at = EXCLUDED.consultado_at
+                    """,
+                    valores,
+                    template="(%s, %s, CURRENT_TIMESTAMP)",
+                )
+    finally:
+        conn.close()
+
+# ======================================================
+# CUIT DE CARTERAS (PRECALENTADO)
+# ======================================================
+def registrar_cuits_usuario(user_id: int, cuits: List[str], origen: str) -> None:
+    """
+    Recuerda qué CUIT consultó o cargó cada usuario, para precalentarlos.
+    """
+    cuits = list(dict.fromkeys(c for c in cuits if c and len(c) == 11 and c.isdigit()))
+    if not user_id or not cuits:
+        return
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                execute_values(
+                    cur,
+                    """
+                    INSERT INTO cuits_cartera (user_id, cuit, origen, last_seen_at)
+                    VALUES %s
+                    ON CONFLICT (user_id, cuit)
+                    DO UPDATE SET
+                        origen = EXCLUDED.origen,
+                        last_seen_at = EXCLUDED.last_seen_at
+                    """,
+                    [(user_id, c, origen) for c in cuits],
+                    template="(%s, %s, %s, CURRENT_TIMESTAMP)",
+                )
+    finally:
+        conn.close()
+
+
+def cuits_para_precalentar(margen_dias: int = 1, limite: Optional[int] = None) -> List[str]:
+    """
+    CUIT de carteras sin entrada en cache o cuya entrada vence
+    dentro de `margen_dias`. Los más viejos primero.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT c.cuit
+                FROM (SELECT DISTINCT cuit FROM cuits_cartera) c
+                LEFT JOIN padron_cache p ON p.cuit = c.cuit
+                WHERE p.cuit IS NULL
+                   OR p.consultado_at <= CURRENT_TIMESTAMP - make_interval(days => %s)
+                ORDER BY p.consultado_at NULLS FIRST
+                LIMIT %s
+                """,
+                (max(0, PADRON_CACHE_TTL_DIAS - margen_dias), limite),
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    return [r["cuit"] for r in rows]
+
+# ======================================================
+# ESTADÍSTICAS (PANEL ADMIN)
+# ======================================================
+def registrar_uso(hits: int, misses: int, period: Optional[str] = None) -> None:
+    if hits <= 0 and misses <= 0:
+        return
+
+    period = period or get_current_period()
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO padron_cache_stats (period, hits, misses, updated_at)
+                    VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+                    ON CONFLICT (period)
+                    DO UPDATE SET
+                        hits = padron_cache_stats.hits + EXCLUDED.hits,
+                        misses = padron_cache_stats.misses + EXCLUDED.misses,
+                        updated_at = EXCLUDED.updated_at
+                    """,
+                    (period, int(hits), int(misses)),
+                )
+    finally:
+        conn.close()
+
+
+def get_cache_stats(period: Optional[str] = None) -> Dict[str, int]:
+    period = period or get_current_period()
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT
+                    COALESCE(s.hits, 0) AS hits,
+                    COALESCE(s.misses, 0) AS misses,
+                    (SELECT COUNT(*) FROM padron_cache) AS entradas
+                FROM (SELECT 1) x
+                LEFT JOIN padron_cache_stats s ON s.period = %s
+                """,
+                (period,),
+            )
+            row = cur.fetchone()
+    finally:
+        conn.close()
+
+    row = dict(row) if row else {}
+    hits = int(row.get("hits") or 0)
+    misses = int(row.get("misses") or 0)
+
+    return {
+        "hits": hits,
+        "misses": misses,
+        "entradas": int(row.get("entradas") or 0),
+        "hit_rate_pct": int(hits * 100 / (hits + misses)) if (hits + misses) > 0 else 0,
+    }
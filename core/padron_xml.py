@@ -0,0 +1,139 @@
+# core/padron_xml.py
+
+from types import SimpleNamespace
+from typing import List, Optional
+
+from lxml import etree
+
+# ======================================================
+# PARSER LIVIANO DE RESPUESTAS DEL PADRÓN A5
+# ======================================================
+# Lee el body SOAP de getPersonaList_v2 con XPath precompilados y arma
+# objetos mínimos con SOLO los campos que usa consultor_cuit._persona_a_fila.
+# Evita materializar el grafo completo de objetos de zeep.
+#
+# Los objetos replican la semántica de zeep: los elementos ausentes
+# quedan en None y las listas (actividad) siempre existen.
+
+def _xp(expr: str) -> etree.XPath:
+    return etree.XPath(expr, smart_strings=False)
+
+
+def _hijo(nombre: str) -> str:
+    return f"*[local-name()='{nombre}']"
+
+
+_FAULT = _xp(f"//{_hijo('Fault')}")
+_FAULT_STRING = _xp(f"string(//{_hijo('Fault')}/{_hijo('faultstring')})")
+
+_PERSONAS = _xp(f"//{_hijo('personaListReturn')}/{_hijo('persona')}")
+
+_DATOS_GENERALES = _xp(_hijo("datosGenerales"))
+_ERROR_CONSTANCIA = _xp(_hijo("errorConstancia"))
+_DOMICILIO_FISCAL = _xp(_hijo("domicilioFiscal"))
+_REGIMEN_GENERAL = _xp(_hijo("datosRegimenGeneral"))
+_MONOTRIBUTO = _xp(_hijo("datosMonotributo"))
+_ACTIVIDADES = _xp(_hijo("actividad"))
+_ACTIVIDAD_MONOTRIBUTISTA = _xp(_hijo("actividadMonotributista"))
+
+_CAMPOS = {
+    nombre: _xp(f"{_hijo(nombre)}/text()")
+    for nombre in (
+        "idPersona",
+        "razonSocial",
+        "nombre",
+        "apellido",
+        "direccion",
+        "localidad",
+        "descripcionProvincia",
+        "descripcionActividad",
+        "idActividad",
+        "orden",
+    )
+}
+
+
+def _texto(el, campo: str) -> Optional[str]:
+    valores = _CAMPOS[campo](el)
+    return valores[0] if valores else None
+
+
+def _entero(el, campo: str) -> Optional[int]:
+    valor = _texto(el, campo)
+    try:
+        return int(valor) if valor is not None else None
+    except ValueError:
+        return None
+
+
+def _primero(xpath: etree.XPath, el):
+    res = xpath(el)
+    return res[0] if res else None
+
+
+def _actividad(el) -> SimpleNamespace:
+    return SimpleNamespace(
+        descripcionActividad=_texto(el, "descripcionActividad"),
+        idActividad=_entero(el, "idActividad"),
+        orden=_entero(el, "orden"),
+    )
+
+
+def _persona(el) -> SimpleNamespace:
+    datos = None
+    datos_el = _primero(_DATOS_GENERALES, el)
+    if datos_el is not None:
+        dom_el = _primero(_DOMICILIO_FISCAL, datos_el)
+        datos = SimpleNamespace(
+            idPersona=_entero(datos_el, "idPersona"),
+            razonSocial=_texto(datos_el, "razonSocial"),
+            nombre=_texto(datos_el, "nombre"),
+            apellido=_texto(datos_el, "apellido"),
+            domicilioFiscal=SimpleNamespace(
+                direccion=_texto(dom_el, "direccion"),
+                localidad=_texto(dom_el, "localidad"),
+                descripcionProvincia=_texto(dom_el, "descripcionProvincia"),
+            ) if dom_el is not None else None,
+        )
+
+    error = None
+    error_el = _primero(_ERROR_CONSTANCIA, el)
+    if error_el is not None:
+        error = SimpleNamespace(idPersona=_entero(error_el, "idPersona"))
+
+    regimen = None
+    regimen_el = _primero(_REGIMEN_GENERAL, el)
+    if regimen_el is not None:
+        regimen = SimpleNamespace(
+            actividad=[_actividad(a) for a in _ACTIVIDADES(regimen_el)],
+        )
+
+    mono = None
+    mono_el = _primero(_MONOTRIBUTO, el)
+    if mono_el is not None:
+        act_mono = _primero(_ACTIVIDAD_MONOTRIBUTISTA, mono_el)
+        mono = SimpleNamespace(
+            actividad=[_actividad(a) for a in _ACTIVIDADES(mono_el)],
+            actividadMonotributista=_actividad(act_mono) if act_mono is not None else None,
+        )
+
+    return SimpleNamespace(
+        datosGenerales=datos,
+        errorConstancia=error,
+        datosRegimenGeneral=regimen,
+        datosMonotributo=mono,
+    )
+
+
+def parsear_personas(contenido: bytes) -> List[SimpleNamespace]:
+    """
+    Parsea el sobre SOAP crudo de getPersonaList_v2.
+    Lanza RuntimeError si la respuesta es un SOAP Fault.
+    """
+    parser = etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+    root = etree.fromstring(contenido, parser=parser)
+
+    if _FAULT(root):
+        raise RuntimeError(_FAULT_STRING(root) or "SOAP Fault")
+
+    return [_persona(el) for el in _PERSONAS(root)]
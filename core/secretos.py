@@ -0,0 +1,23 @@
+# core/secretos.py
+
+from typing import Any
+
+import streamlit as st
+
+# Valores de texto que cuentan como "sí" en un secret booleano
+_VERDADEROS = {"true", "1", "yes", "si", "sí", "on"}
+
+
+def como_bool(valor: Any) -> bool:
+    """
+    Interpreta un secret booleano. En secrets.toml puede venir como bool
+    (AFIP_X = false) o como texto (AFIP_X = "false", variables de entorno):
+    bool("false") sería True, así que el texto se compara explícitamente.
+    """
+    if isinstance(valor, bool):
+        return valor
+    return str(valor).strip().lower() in _VERDADEROS
+
+
+def secreto_bool(clave: str, defecto: bool) -> bool:
+    return como_bool(st.secrets.get(clave, defecto))
@@ -0,0 +1,110 @@
+from typing import Callable, Optional
+
+from auth.db import connect
+
+# ======================================================
+# STORE DE TICKETS WSAA (POSTGRES)
+# ======================================================
+# Un TA por (servicio, CUIT) compartido por todas las réplicas.
+# WSAA rechaza un loginCms nuevo mientras exista un TA vigente,
+# así que la renovación se serializa con un advisory lock.
+# También lo usa el thread de refresco: la conexión no toca la UI de
+# Streamlit (auth.db.connect levanta la excepción, no hace st.stop).
+
+def _lock_key(service: str, cuit: str) -> str:
+    return f"afip_ta:{service}:{cuit}"
+
+
+def _row_a_ta(row) -> Optional[dict]:
+    if not row:
+        return None
+    d = dict(row)
+    return {
+        "token": d["token"],
+        "sign": d["sign"],
+        "expiration": d["expiration"],
+    }
+
+
+def leer_ta(service: str, cuit: str) -> Optional[dict]:
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT token, sign, expiration
+                FROM afip_tickets
+                WHERE service = %s AND cuit = %s
+                LIMIT 1
+                """,
+                (service, cuit),
+            )
+            return _row_a_ta(cur.fetchone())
+    finally:
+        conn.close()
+
+
+def renovar_ta_serializado(
+    service: str,
+    cuit: str,
+    vigente: Callable[[Optional[dict]], bool],
+    renovar: Callable[[], dict],
+    utilizable: Callable[[Optional[dict]], bool],
+) -> dict:
+    """
+    Renueva el TA con exclusión mutua entre réplicas.
+
+    - Toma pg_advisory_xact_lock para (service, cuit).
+    - Relee el TA: si otra réplica ya lo renovó (`vigente`), lo devuelve.
+    - Si no, llama a `renovar()` y lo persiste.
+    - Si WSAA rechaza la renovación pero el TA actual sigue `utilizable`,
+      se devuelve ese.
+    El lock se libera al cerrar la transacción.
+    """
+    conn = connect()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT pg_advisory_xact_lock(hashtext(%s))",
+                    (_lock_key(service, cuit),),
+                )
+
+                cur.execute(
+                    """
+                    SELECT token, sign, expiration
+                    FROM afip_tickets
+                    WHERE service = %s AND cuit = %s
+                    LIMIT 1
+                    """,
+                    (service, cuit),
+                )
+                actual = _row_a_ta(cur.fetchone())
+
+                if vigente(actual):
+                    return actual
+
+                try:
+                    ta = renovar()
+                except Exception:
+                    if utilizable(actual):
+                        return actual
+                    raise
+
+                cur.execute(
+                    """
+                    INSERT INTO afip_tickets (service, cuit, token, sign, expiration, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+                    ON CONFLICT (service, cuit)
+                    DO UPDATE SET
+                        token = EXCLUDED.token,
+                        sign = EXCLUDED.sign,
+                        expiration = EXCLUDED.expiration,
+                        updated_at = EXCLUDED.updated_at
+                    """,
+                    (service, cuit, ta["token"], ta["sign"], ta["expiration"]),
+                )
+
+                return ta
+    finally:
+        conn.close()
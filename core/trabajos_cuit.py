@@ -0,0 +1,385 @@
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import streamlit as st
+from psycopg2.extras import Json, execute_values
+
+from auth.db import get_connection
+from auth.service import release_quota_db
+from core.consultor_cuit import consultar_cuits, error_transitorio
+from core.gobernador_afip import gobernador
+
+# ======================================================
+# CONFIG
+# ======================================================
+# CUIT por checkpoint: cada tramo se consulta y se persiste junto
+TRABAJO_CHECKPOINT = int(st.secrets.get("CUIT_TRABAJO_CHECKPOINT", 500))
+
+# Vigencia del lease de ejecución (se renueva en cada checkpoint): tiene que
+# alcanzar para consultar un tramo entero. Si el que corre se cae, pasado
+# este tiempo otra sesión puede reanudar el trabajo
+TRABAJO_LEASE_SEG = int(st.secrets.get("CUIT_TRABAJO_LEASE_SEG", 600))
+
+# Estados de un trabajo masivo
+EN_CURSO = "EN_CURSO"
+PAUSADO = "PAUSADO"
+COMPLETADO = "COMPLETADO"
+
+# ======================================================
+# ALTA
+# ======================================================
+def crear_trabajo(
+    user_id: int,
+    cuits: List[str],
+    cacheados: Optional[Dict[str, dict]] = None,
+    archivo: str = "",
+    period: Optional[str] = None,
+    cobrados: int = 0,
+) -> int:
+    """
+    Registra una consulta masiva como trabajo durable.
+    Los CUIT ya resueltos por la cache del padrón quedan guardados
+    desde el inicio; el resto queda pendiente (fila NULL).
+
+    :param cobrados: unidades de cupo reservadas para el trabajo
+    """
+    cacheados = cacheados or {}
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO cuit_jobs (user_id, archivo, period, estado, total, procesados, cobrados)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    RETURNING id
+                    """,
+                    (user_id, archivo, period, EN_CURSO, len(cuits), len(cacheados), cobrados),
+                )
+                job_id = cur.fetchone()["id"]
+
+                execute_values(
+                    cur,
+                    "INSERT INTO cuit_job_items (job_id, orden, cuit, fila) VALUES %s",
+                    [
+                        (job_id, orden, c, Json(cacheados[c]) if c in cacheados else None)
+                        for orden, c in enumerate(cuits)
+                    ],
+                    page_size=1000,
+                )
+    finally:
+        conn.close()
+
+    return job_id
+
+# ======================================================
+# LEASE DE EJECUCIÓN
+# ======================================================
+def reclamar_trabajo(job_id: int) -> Optional[str]:
+    """
+    Toma el trabajo para ejecutarlo, en un solo UPDATE atómico: solo si no
+    está completado y nadie tiene un lease vigente (otra pestaña o sesión
+    corriéndolo). Devuelve el token del lease, o None si está tomado.
+    """
+    token = uuid.uuid4().hex
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE cuit_jobs
+                    SET estado = %s,
+                        lease_token = %s,
+                        lease_hasta = CURRENT_TIMESTAMP + %s * INTERVAL '1 second',
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                      AND estado <> %s
+                      AND (lease_hasta IS NULL OR lease_hasta < CURRENT_TIMESTAMP)
+                    RETURNING id
+                    """,
+                    (EN_CURSO, token, TRABAJO_LEASE_SEG, job_id, COMPLETADO),
+                )
+                tomado = cur.fetchone() is not None
+    finally:
+        conn.close()
+
+    return token if tomado else None
+
+
+def liberar_trabajo(job_id: int, token: str, estado: str) -> None:
+    """Deja el trabajo en `estado` y suelta el lease (si sigue siendo nuestro)."""
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE cuit_jobs
+                    SET estado = %s,
+                        lease_token = NULL,
+                        lease_hasta = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s AND lease_token = %s
+                    """,
+                    (estado, job_id, token),
+                )
+    finally:
+        conn.close()
+
+# ======================================================
+# CHECKPOINTS
+# ======================================================
+def pendientes(job_id: int) -> List[str]:
+    """CUIT del trabajo que todavía no tienen resultado, en orden."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT cuit
+                FROM cuit_job_items
+                WHERE job_id = %s AND fila IS NULL
+                ORDER BY orden
+                """,
+                (job_id,),
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    return [r["cuit"] for r in rows]
+
+
+def guardar_checkpoint(job_id: int, token: str, filas: List[dict]) -> Optional[int]:
+    """
+    Persiste un tramo de resultados, avanza el contador del trabajo,
+    renueva el lease y devuelve el cupo de los CUIT que terminaron con
+    error. Una sola transacción por tramo: o queda todo o nada.
+
+    Lo que se devuelve sale de las filas que este UPDATE efectivamente
+    escribió (las que ya tenían resultado no cuentan) y se acredita en la
+    misma transacción: un reintento o un segundo runner no devuelven dos
+    veces la misma falla.
+
+    Devuelve las unidades devueltas, o None (sin guardar nada) si el lease
+    ya no es nuestro: venció y otra sesión tomó el trabajo.
+    """
+    valores = [(job_id, f["CUIT"], Json(f)) for f in filas if f.get("CUIT")]
+
+    conn = get_connection()
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT user_id, period, cobrados, devueltos
+                    FROM cuit_jobs
+                    WHERE id = %s AND lease_token = %s
+                    FOR UPDATE
+                    """,
+                    (job_id, token),
+                )
+                trabajo = cur.fetchone()
+                if trabajo is None:
+                    return None
+
+                escritas = []
+                if valores:
+                    escritas = execute_values(
+                        cur,
+                        """
+                        UPDATE cuit_job_items AS i
+                        SET fila = v.fila::jsonb
+                        FROM (VALUES %s) AS v (job_id, cuit, fila)
+                        WHERE i.job_id = v.job_id
+                          AND i.cuit = v.cuit
+                          AND i.fila IS NULL
+                        RETURNING COALESCE(i.fila->>'Error', '') <> '' AS error
+                        """,
+                        valores,
+                        page_size=1000,
+                        fetch=True,
+                    )
+
+                # Nunca más de lo que queda reservado
+                fallidas = sum(1 for r in escritas if r["error"])
+                devueltos = max(0, min(fallidas, trabajo["cobrados"] - trabajo["devueltos"]))
+
+                cur.execute(
+                    """
+                    UPDATE cuit_jobs
+                    SET procesados = (
+                            SELECT COUNT(*) FROM cuit_job_items
+                            WHERE job_id = %s AND fila IS NOT NULL
+                        ),
+                        devueltos = devueltos + %s,
+                        lease_hasta = CURRENT_TIMESTAMP + %s * INTERVAL '1 second',
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = %s
+                    """,
+                    (job_id, devueltos, TRABAJO_LEASE_SEG, job_id),
+                )
+                release_quota_db(
+                    trabajo["user_id"], "cuit", devueltos, trabajo["period"], cur=cur
+                )
+    finally:
+        conn.close()
+
+    return devueltos
+
+
+def obtener_trabajo(job_id: int) -> Optional[dict]:
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT id, user_id, period, estado, total, procesados, cobrados, devueltos
+                FROM cuit_jobs
+                WHERE id = %s
+                """,
+                (job_id,),
+            )
+            row = cur.fetchone()
+    finally:
+        conn.close()
+
+    return dict(row) if row else None
+
+# ======================================================
+# EJECUCIÓN / REANUDACIÓN
+# ======================================================
+def ejecutar_trabajo(
+    job_id: int,
+    progreso: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Consulta los CUIT pendientes del trabajo en tramos de TRABAJO_CHECKPOINT,
+    guardando cada tramo en la base. Sirve tanto para la primera corrida
+    como para reanudar una que se cortó: solo consulta lo que falta.
+
+    Cupo: el trabajo nace con el cupo reservado. En cada checkpoint se
+    liquida: los CUIT que terminaron con error se devuelven en la misma
+    transacción que guarda el tramo (no uno por CUIT).
+
+    Si AFIP deja de responder (circuito abierto) el trabajo queda PAUSADO:
+    los CUIT que fallaron por eso siguen pendientes (y reservados)
+    para la próxima vez.
+
+    Antes de leer los pendientes se toma el lease del trabajo: si otra
+    pestaña o sesión lo está corriendo no se consulta nada (cada CUIT iría
+    dos veces a AFIP) y se devuelve "ocupado".
+
+    Devuelve {"estado", "devueltos", "ocupado"} (cupo devuelto en esta corrida).
+    """
+    token = reclamar_trabajo(job_id)
+    if token is None:
+        return {"estado": EN_CURSO, "devueltos": 0, "ocupado": True}
+
+    try:
+        return _ejecutar(job_id, token, progreso)
+    except BaseException:
+        # Corte inesperado (error o rerun de Streamlit): el lease se suelta
+        # y lo guardado hasta el último checkpoint queda para reanudar
+        liberar_trabajo(job_id, token, PAUSADO)
+        raise
+
+
+def _ejecutar(
+    job_id: int,
+    token: str,
+    progreso: Optional[Callable[[int, int], None]],
+) -> dict:
+    faltan = pendientes(job_id)
+    total = len(faltan)
+
+    if progreso:
+        progreso(0, total)
+
+    estado = COMPLETADO
+    devueltos = 0
+    hechos = 0
+    for i in range(0, total, TRABAJO_CHECKPOINT):
+        tramo = faltan[i:i + TRABAJO_CHECKPOINT]
+
+        filas = consultar_cuits(
+            tramo,
+            progreso=(lambda h, _t, base=hechos: progreso(base + h, total)) if progreso else None,
+        )
+
+        if not gobernador().disponible():
+            # Solo quedan pendientes las fallas de transporte: las respuestas
+            # de negocio (sin resultados, CUIT inválido) ya son definitivas
+            filas = [f for f in filas if not error_transitorio(f)]
+            estado = PAUSADO
+
+        # Checkpoint y devolución de las fallas en la misma transacción
+        devuelto = guardar_checkpoint(job_id, token, filas)
+        if devuelto is None:
+            # Perdimos el lease: el trabajo sigue en otra sesión
+            return {"estado": EN_CURSO, "devueltos": devueltos, "ocupado": True}
+        devueltos += devuelto
+
+        if estado == PAUSADO:
+            break
+
+        hechos += len(tramo)
+
+    liberar_trabajo(job_id, token, estado)
+    return {"estado": estado, "devueltos": devueltos, "ocupado": False}
+
+# ======================================================
+# CONSULTA DE TRABAJOS (UI)
+# ======================================================
+def listar_trabajos(user_id: int, limite: int = 20) -> List[dict]:
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT id, archivo, estado, total, procesados, created_at, updated_at,
+                       COALESCE(lease_hasta > CURRENT_TIMESTAMP, FALSE) AS en_ejecucion
+                FROM cuit_jobs
+                WHERE user_id = %s
+                ORDER BY created_at DESC
+                LIMIT %s
+                """,
+                (user_id, limite),
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    return [dict(r) for r in rows]
+
+
+def resultados(job_id: int, user_id: int) -> List[dict]:
+    """
+    Filas guardadas del trabajo, en el orden del archivo original.
+    Los CUIT todavía pendientes aparecen con un Error explicativo.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT i.cuit, i.fila
+                FROM cuit_job_items i
+                JOIN cuit_jobs j ON j.id = i.job_id
+                WHERE i.job_id = %s AND j.user_id = %s
+                ORDER BY i.orden
+                """,
+                (job_id, user_id),
+            )
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    return [
+        dict(r["fila"]) if r["fila"] is not None
+        else {"CUIT": r["cuit"], "Error": "Pendiente: reanudá la consulta"}
+        for r in rows
+    ]
@@ -1,4 +1,177 @@
-from typing import Optional
+import re
+import unicodedata
+from typing import Callable, Dict, List, Optional, Pattern, Tuple
+
+# ======================================================
+# REGISTRO DE FIRMAS POR BANCO
+# ======================================================
+# código de banco -> [(firma, peso)]
+# Las firmas se comparan sin mayúsculas ni acentos y como palabras completas.
+# Peso 1.0 = nombre del banco; menos = indicios (dominio web, siglas).
+# Las siglas sueltas quedan debajo de MIN_SCORE: una sola mención en un
+# movimiento ("TRANSF HSBC") no alcanza para detectar ese banco.
+BANK_SIGNATURES: Dict[str, List[Tuple[str, float]]] = {
+    "bcorrientes": [
+        ("banco de corrientes", 1.0),
+        ("banco de la pcia de corrientes", 1.0),
+        ("banco de la provincia de corrientes", 1.0),
+        ("bancodecorrientes.com.ar", 0.8),
+    ],
+    "bnacion": [
+        ("banco de la nacion argentina", 1.0),
+        ("banco nacion", 1.0),
+        ("bna.com.ar", 0.8),
+    ],
+    "bprovincia": [
+        ("banco de la provincia de buenos aires", 1.0),
+        ("banco provincia", 1.0),
+        ("bancoprovincia.com.ar", 0.8),
+    ],
+    "bciudad": [
+        ("banco de la ciudad de buenos aires", 1.0),
+        ("banco ciudad", 1.0),
+        ("bancociudad.com.ar", 0.8),
+    ],
+    "macro": [
+        ("banco macro", 1.0),
+        ("macro.com.ar", 0.8),
+    ],
+    "galicia": [
+        ("banco de galicia y buenos aires", 1.0),
+        ("banco galicia", 1.0),
+        ("bancogalicia.com", 0.8),
+    ],
+    "santander": [
+        ("banco santander", 1.0),
+        ("santander rio", 1.0),
+        ("santander.com.ar", 0.8),
+    ],
+    "bbva": [
+        ("banco bbva", 1.0),
+        ("bbva argentina", 1.0),
+        ("bbva frances", 1.0),
+        ("bbva.com.ar", 0.8),
+    ],
+    "credicoop": [
+        ("banco credicoop", 1.0),
+        ("bancocredicoop.coop", 0.8),
+    ],
+    "hsbc": [
+        ("hsbc bank argentina", 1.0),
+        ("hsbc", 0.4),
+    ],
+    "icbc": [
+        ("industrial and commercial bank of china", 1.0),
+        ("icbc", 0.4),
+    ],
+    "supervielle": [
+        ("banco supervielle", 1.0),
+        ("supervielle.com.ar", 0.8),
+    ],
+    "patagonia": [
+        ("banco patagonia", 1.0),
+        ("bancopatagonia.com.ar", 0.8),
+    ],
+    "hipotecario": [
+        ("banco hipotecario", 1.0),
+        ("hipotecario.com.ar", 0.8),
+    ],
+    "bchaco": [
+        ("nuevo banco del chaco", 1.0),
+        ("nbch.com.ar", 0.8),
+    ],
+}
+
+# Puntaje mínimo del mejor candidato para darlo por detectado
+MIN_SCORE = 0.5
+
+# Bonus por cada firma distinta adicional del mismo banco
+EXTRA_SIGNATURE_BONUS = 0.1
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _fold(text: str) -> str:
+    """Minúsculas y sin acentos (nación == nacion == NACIÓN)."""
+    text = text.lower()
+    if text.isascii():
+        return text
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def _trie_regex(words: List[str]) -> str:
+    """
+    Alternancia factorizada por prefijos ("banco (?:de (?:corrientes|...)|macro)"):
+    en cada posición del texto el motor decide por un carácter en lugar de
+    probar las firmas una por una.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(c) + build(child) for c, child in sorted(node.items()) if c]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class _SignatureIndex:
+    """
+    Todas las firmas compiladas en una sola alternancia: una pasada por
+    el texto encuentra todas las apariciones de todos los bancos.
+    """
+
+    def __init__(self, registry: Dict[str, List[Tuple[str, float]]]):
+        self.by_signature: Dict[str, Tuple[str, float]] = {}
+        for bank_code, signatures in registry.items():
+            for signature, weight in signatures:
+                self.by_signature[_fold(signature)] = (bank_code, weight)
+
+        # El trie es codicioso: "hsbc bank argentina" gana sobre "hsbc".
+        # El borde izquierdo de palabra se valida aparte: un lookbehind al
+        # inicio le impide a `re` saltar rápido a los posibles comienzos
+        self.pattern: Pattern = re.compile(rf"(?:{_trie_regex(list(self.by_signature))})(?!\w)")
+
+    def candidates(self, text: str) -> List[Dict[str, float]]:
+        found: Dict[str, Dict[str, float]] = {}  # banco -> {firma: peso}
+        first_pos: Dict[str, int] = {}
+
+        text = _fold(text)
+        for m in self.pattern.finditer(text):
+            if m.start() and _WORD_CHAR.match(text, m.start() - 1):
+                continue
+
+            bank_code, weight = self.by_signature[m.group(0)]
+            found.setdefault(bank_code, {})[m.group(0)] = weight
+            first_pos.setdefault(bank_code, m.start())
+
+        scored = []
+        for bank_code, signatures in found.items():
+            score = max(signatures.values()) + EXTRA_SIGNATURE_BONUS * (len(signatures) - 1)
+            scored.append((min(1.0, round(score, 2)), first_pos[bank_code], bank_code))
+
+        # Mayor puntaje primero; a igual puntaje, el que aparece antes.
+        # El encabezado pesa más que los movimientos: un resumen puede nombrar
+        # varias veces (y de varias formas) al banco de una transferencia
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        return [{bank_code: score} for score, _, bank_code in scored]
+
+
+_INDEX: Optional[_SignatureIndex] = None
+
+
+def _index() -> _SignatureIndex:
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = _SignatureIndex(BANK_SIGNATURES)
+    return _INDEX
 
 
 class BankDetector:
@@ -8,28 +181,55 @@ class BankDetector:
     """
 
     @staticmethod
-    def detect(profile, raw: dict | None = None) -> Optional[str]:
+    def register(bank_code: str, signatures: List[Tuple[str, float]]) -> None:
+        """Agrega (o reemplaza) las firmas de un banco y recompila el índice."""
+        global _INDEX
+        BANK_SIGNATURES[bank_code] = list(signatures)
+        _INDEX = None
+
+    @staticmethod
+    def candidates(text: str) -> List[Dict[str, float]]:
+        """[{codigo_banco: puntaje}, ...] ordenados del más al menos probable."""
+        return _index().candidates(text or "")
+
+    @staticmethod
+    def detect(
+        profile,
+        raw: dict | None = None,
+        supported: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[str]:
         """
         :param profile: resultado de diagnose_pdf
         :param raw: extracción preliminar si existiera (opcional)
+        :param supported: si se indica, entre los candidatos que superan
+            MIN_SCORE gana el primero para el que devuelve True (hay con qué
+            extraerlo); si ninguno, el más probable
         :return: codigo de banco (ej: 'bcorrientes') o None
+
+        El resultado queda en el perfil (bank_candidates / detected_bank):
+        llamadas siguientes con el mismo perfil no vuelven a buscar.
         """
+        if profile.detected_bank is not None:
+            return profile.detected_bank
+
+        if not profile.bank_candidates:
+            profile.bank_candidates = BankDetector.candidates(profile.sample_text)
 
-        text = (profile.sample_text or "").lower()
+        if not profile.bank_candidates:
+            return None
 
-        # ===============================
-        # BANCO DE CORRIENTES
-        # ===============================
-        if (
-            "banco de corrientes" in text
-            or "banco de la pcia de corrientes" in text
-        ):
-            return "bcorrientes"
+        viables = [
+            bank_code
+            for candidate in profile.bank_candidates
+            for bank_code, score in candidate.items()
+            if score >= MIN_SCORE
+        ]
+        if not viables:
+            return None
 
-        # ===============================
-        # FUTUROS BANCOS
-        # ===============================
-        # if "banco de la nacion argentina" in text:
-        #     return "bnacion"
+        bank_code = viables[0]
+        if supported is not None:
+            bank_code = next((b for b in viables if supported(b)), bank_code)
 
-        return None
+        profile.detected_bank = bank_code
+        return bank_code
@@ -1,34 +1,33 @@
 # core/diagnostics.py
 
-import hashlib
-import io
-from typing import Optional
-
-import pdfplumber
+from typing import Union
 
+from .document import ParsedDocument
 from .models import DocumentProfile
 
 
 
-def diagnose_pdf(pdf_bytes: bytes, file_name: str) -> DocumentProfile:
+def diagnose_pdf(pdf: Union[bytes, ParsedDocument], file_name: str = "") -> DocumentProfile:
     """
-    Analiza el PDF a partir de bytes y construye el perfil del documento.
+    Analiza el PDF y construye el perfil del documento.
     Compatible con Streamlit / APIs / tests.
+
+    Recibe el ParsedDocument compartido (o bytes, por compatibilidad):
+    el texto de las páginas de muestra queda memoizado para el parser.
     """
 
-    file_hash = hashlib.md5(pdf_bytes).hexdigest()
+    document = ParsedDocument.of(pdf, file_name)
+    file_name = file_name or document.file_name
 
-    # 👉 usamos BytesIO, NO paths
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        page_count = len(pdf.pages)
+    file_hash = document.file_hash
+    page_count = document.page_count
 
-        text_pages = []
-        for page in pdf.pages[:2]:  # sample primeras páginas
-            try:
-                t = page.extract_text() or ""
-                text_pages.append(t)
-            except Exception:
-                pass
+    text_pages = []
+    for idx in range(min(2, page_count)):  # sample primeras páginas
+        try:
+            text_pages.append(document.page_text(idx))
+        except Exception:
+            pass
 
     sample_text = "\n".join(text_pages)
 
@@ -42,6 +41,7 @@ def diagnose_pdf(pdf_bytes: bytes, file_name: str) -> DocumentProfile:
         is_text_pdf=is_text_pdf,
         is_scanned=is_scanned,
         sample_text=sample_text,
+        document=document,
     )
 
     # ==================================
@@ -0,0 +1,261 @@
+# core/document.py
+
+import hashlib
+import io
+import os
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .timings import StageTimer
+
+# pdfplumber (~0.1 s) y el pool de procesos se importan recién al abrir
+# un PDF / levantar el pool: importar el extractor tiene que ser barato
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+# ======================================================
+# EXTRACCIÓN EN PARALELO (DOCUMENTOS LARGOS)
+# ======================================================
+# Procesos para extraer texto; 1 = siempre en serie
+EXTRACT_WORKERS = int(os.environ.get("EXTRACTOR_WORKERS", os.cpu_count() or 1))
+
+# Por debajo de esta cantidad de páginas el costo de levantar
+# procesos no se recupera: se extrae en serie
+PARALLEL_MIN_PAGES = int(os.environ.get("EXTRACTOR_PARALLEL_MIN_PAGES", 24))
+
+# Cómo arrancan los procesos del pool. Nunca "fork": el servidor de
+# Streamlit tiene varios threads (y el refresco de tickets AFIP), y un
+# fork puede dejar al hijo trabado en un lock que tenía otro thread
+POOL_START_METHOD = os.environ.get("EXTRACTOR_POOL_START_METHOD", "forkserver")
+
+# PDF abierto en cada proceso del pool (lo carga el initializer una vez)
+_WORKER_PDF = None
+
+
+def pool_context():
+    """Contexto de multiprocessing para los pools del extractor."""
+    import multiprocessing
+
+    method = POOL_START_METHOD
+    if method not in multiprocessing.get_all_start_methods():
+        method = "spawn"  # forkserver no existe en Windows
+    return multiprocessing.get_context(method)
+
+
+def _init_worker(pdf_bytes: bytes) -> None:
+    import pdfplumber
+
+    global _WORKER_PDF
+    _WORKER_PDF = pdfplumber.open(io.BytesIO(pdf_bytes))
+
+
+def _extract_pages(indexes: Sequence[int]) -> Tuple[List[str], float]:
+    """
+    Corre en un proceso del pool: extrae las páginas pedidas (base 0)
+    del PDF que ese proceso ya tiene abierto, en orden.
+    Devuelve también la CPU que usó (el timer del padre no la ve).
+    """
+    cpu0 = time.thread_time()
+    texts = []
+    for i in indexes:
+        page = _WORKER_PDF.pages[i]
+        texts.append(page.extract_text() or "")
+        page.close()
+    return texts, time.thread_time() - cpu0
+
+
+def _shards(indexes: List[int], workers: int) -> List[List[int]]:
+    """Reparte las páginas en rangos contiguos de tamaño parejo."""
+    size = -(-len(indexes) // workers)
+    return [indexes[i:i + size] for i in range(0, len(indexes), size)]
+
+
+class ParsedDocument:
+    """
+    Dueño del PDF durante toda la extracción.
+
+    - Abre el PDF una sola vez (recién cuando alguien lo necesita).
+    - Memoiza el texto de cada página: diagnóstico, detección y parser
+      comparten la misma extracción en lugar de repetirla.
+    - iter_page_texts() recorre el documento sin retener el texto:
+      la memoria no depende de la cantidad de páginas.
+    - `timer` acumula los tiempos por etapa de toda la extracción
+      (la del texto la registra el propio documento, página a página).
+    """
+
+    def __init__(self, pdf_bytes: bytes, file_name: str = ""):
+        self.pdf_bytes = pdf_bytes
+        self.file_name = file_name
+
+        self._pdf = None
+        self._file_hash: Optional[str] = None
+        self._texts: Dict[int, str] = {}
+
+        self.timer = StageTimer()
+
+    @classmethod
+    def of(cls, source: Union[bytes, "ParsedDocument"], file_name: str = "") -> "ParsedDocument":
+        """Acepta bytes (API anterior) o un documento ya abierto."""
+        if isinstance(source, ParsedDocument):
+            return source
+        return cls(source, file_name)
+
+    # =========================
+    # PDF
+    # =========================
+    @property
+    def pdf(self):
+        if self._pdf is None:
+            import pdfplumber
+
+            self._pdf = pdfplumber.open(io.BytesIO(self.pdf_bytes))
+        return self._pdf
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    @property
+    def file_hash(self) -> str:
+        if self._file_hash is None:
+            self._file_hash = hashlib.md5(self.pdf_bytes).hexdigest()
+        return self._file_hash
+
+    # =========================
+    # TEXTO POR PÁGINA
+    # =========================
+    def _extract_page(self, index: int) -> str:
+        """Extrae una página y libera la cache de layout de pdfplumber."""
+        with self.timer.stage("extract", page=index):
+            page = self.pdf.pages[index]
+            text = page.extract_text() or ""
+            page.close()
+
+        self.timer.pages_extracted += 1
+        return text
+
+    def page_text(self, index: int) -> str:
+        """Texto de la página `index` (base 0). Se extrae una sola vez."""
+        if index not in self._texts:
+            self._texts[index] = self._extract_page(index)
+        return self._texts[index]
+
+    def page_texts(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        workers: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Texto de las páginas [start, stop), en orden (quedan memoizadas).
+
+        Si faltan extraer al menos PARALLEL_MIN_PAGES páginas, se reparten
+        en rangos entre `workers` procesos (por defecto EXTRACT_WORKERS).
+        Si el pool falla por cualquier motivo, se sigue en serie.
+        """
+        stop = self.page_count if stop is None else min(stop, self.page_count)
+        workers = EXTRACT_WORKERS if workers is None else workers
+
+        missing = [i for i in range(start, stop) if i not in self._texts]
+        if workers > 1 and len(missing) >= PARALLEL_MIN_PAGES:
+            pool = self._start_pool(workers)
+            if pool is not None:
+                with pool:
+                    self._texts.update(self._extract_parallel(pool, missing, workers))
+
+        return [self.page_text(i) for i in range(start, stop)]
+
+    def iter_page_texts(self, start: int = 0, workers: Optional[int] = None) -> Iterator[str]:
+        """
+        Recorre el texto de las páginas desde `start` sin memoizarlo
+        (salvo las que ya estaban, como las del diagnóstico).
+
+        En documentos largos extrae por ventanas de páginas en paralelo:
+        en memoria hay como mucho una ventana a la vez.
+        """
+        count = self.page_count
+        workers = EXTRACT_WORKERS if workers is None else workers
+
+        pool = None
+        if workers > 1 and count - start >= PARALLEL_MIN_PAGES:
+            pool = self._start_pool(workers)
+        window = workers * 4 if pool is not None else 1
+
+        try:
+            for window_start in range(start, count, window):
+                indexes = range(window_start, min(window_start + window, count))
+                missing = [i for i in indexes if i not in self._texts]
+
+                fresh: Dict[int, str] = {}
+                if pool is not None and len(missing) > 1:
+                    fresh = self._extract_parallel(pool, missing, workers)
+                    if not fresh:
+                        pool.shutdown(cancel_futures=True)
+                        pool = None
+
+                for i in indexes:
+                    if i in self._texts:
+                        yield self._texts[i]
+                    elif i in fresh:
+                        yield fresh.pop(i)
+                    else:
+                        yield self._extract_page(i)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    # =========================
+    # POOL DE PROCESOS
+    # =========================
+    def _start_pool(self, workers: int) -> Optional["ProcessPoolExecutor"]:
+        from concurrent.futures import ProcessPoolExecutor
+
+        try:
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=pool_context(),
+                initializer=_init_worker,
+                initargs=(self.pdf_bytes,),
+            )
+        except Exception:
+            return None
+
+    def _extract_parallel(
+        self,
+        pool: "ProcessPoolExecutor",
+        indexes: List[int],
+        workers: int,
+    ) -> Dict[int, str]:
+        """
+        Extrae `indexes` repartidas entre los procesos del pool.
+        Devuelve {} si el pool falla (sandbox, límites del host, etc.):
+        quien llama sigue en serie.
+        """
+        shards = _shards(indexes, workers)
+        texts: Dict[int, str] = {}
+        worker_cpu = 0.0
+        try:
+            with self.timer.stage("extract"):
+                for shard, (shard_texts, cpu) in zip(shards, pool.map(_extract_pages, shards)):
+                    texts.update(zip(shard, shard_texts))
+                    worker_cpu += cpu
+        except Exception:
+            return {}
+
+        self.timer.add_cpu("extract", worker_cpu)
+        self.timer.pages_extracted += len(texts)
+        return texts
+
+    # =========================
+    # CIERRE
+    # =========================
+    def close(self) -> None:
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+    def __enter__(self) -> "ParsedDocument":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -55,12 +55,17 @@ class DocumentProfile:
     has_cbu_keywords: bool = False
     has_period_keywords: bool = False
 
-    # detección de banco
+    # detección de banco ([{codigo: puntaje}], del más al menos probable)
     bank_candidates: List[Dict[str, float]] = field(default_factory=list)
+    detected_bank: Optional[str] = None
 
     sample_text: Optional[str] = None
     errors: List[str] = field(default_factory=list)
 
+    # PDF abierto compartido por diagnóstico, router y parser
+    # (solo vive durante la extracción; no se serializa ni se compara)
+    document: Optional[Any] = field(default=None, repr=False, compare=False)
+
 
 # =========================
 # TRANSACCIÓN NORMALIZADA
@@ -114,3 +119,6 @@ class ExtractionResult:
 
     parser_trace: List[str] = field(default_factory=list)
     debug: Optional[DebugBundle] = None
+
+    # True si se sirvió desde la cache de resultados (no se volvió a parsear)
+    cached: bool = False
@@ -0,0 +1,125 @@
+# core/result_cache.py
+
+import copy
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .models import ExtractionResult
+
+
+class ResultCache:
+    """
+    Cache de ExtractionResult direccionada por contenido.
+
+    - Clave: hash del PDF + versión de los parsers (si cambia un parser,
+      los resultados viejos dejan de servirse solos).
+    - Memoria: LRU acotada a `max_entries`.
+    - Disco (opcional): un pickle por clave en `disk_dir`, acotado a
+      `disk_max_entries` (se borran los más viejos).
+
+    Devuelve copias: quien recibe el resultado puede modificarlo sin
+    tocar lo que quedó cacheado.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        disk_dir: Optional[str] = None,
+        disk_max_entries: int = 500,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+
+        self._entries: "OrderedDict[str, ExtractionResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def key(file_hash: str, parser_version: str) -> str:
+        return f"{file_hash}-{parser_version}"
+
+    # =========================
+    # LECTURA
+    # =========================
+    def get(self, key: str) -> Optional[ExtractionResult]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+
+        if result is None:
+            result = self._read_disk(key)
+            if result is None:
+                return None
+            self._remember(key, result)
+
+        return copy.deepcopy(result)
+
+    # =========================
+    # ESCRITURA
+    # =========================
+    def put(self, key: str, result: ExtractionResult) -> None:
+        result = copy.deepcopy(result)
+        self._remember(key, result)
+        self._write_disk(key, result)
+
+    def _remember(self, key: str, result: ExtractionResult) -> None:
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # =========================
+    # DISCO
+    # =========================
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _read_disk(self, key: str) -> Optional[ExtractionResult]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            return None
+
+    def _write_disk(self, key: str, result: ExtractionResult) -> None:
+        if not self.disk_dir:
+            return
+        try:
+            tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+            self._prune_disk()
+        except Exception:
+            # La cache es una optimización: un disco lleno no frena la extracción
+            pass
+
+    def _prune_disk(self) -> None:
+        files = [
+            os.path.join(self.disk_dir, f)
+            for f in os.listdir(self.disk_dir)
+            if f.endswith(".pkl")
+        ]
+        if len(files) <= self.disk_max_entries:
+            return
+
+        files.sort(key=os.path.getmtime)
+        for path in files[: len(files) - self.disk_max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -1,6 +1,8 @@
-from typing import List
+from typing import Callable, List, Optional
 
-from .models import ExtractionResult, WarningItem
+from .document import ParsedDocument
+from .models import ExtractionResult, StatementMeta, Transaction, WarningItem
+from .timings import StageTimer
 from .validation import validate_balance_consistency
 
 from ..parsers.structural.base import BaseStructuralParser
@@ -12,14 +14,30 @@ class ParserRouter:
     def __init__(self, structural_parsers: List[BaseStructuralParser]):
         self.structural_parsers = structural_parsers
 
-    def route(self, pdf_bytes: bytes, profile) -> ExtractionResult:
+    def route(
+        self,
+        document: ParsedDocument,
+        profile,
+        progress: Optional[Callable[[int, int, List[Transaction]], None]] = None,
+    ) -> ExtractionResult:
+        """
+        :param document: PDF ya abierto por el diagnóstico (o bytes)
+        :param progress: callback opcional (página, total_páginas, movimientos)
+            cada vez que el parser termina una página
+        """
+        document = ParsedDocument.of(document, profile.file_name)
+        profile.document = document
+        timer = document.timer
+
         warnings = []
         trace = []
 
         # =====================================================
         # 1. DETECCIÓN DE BANCO
         # =====================================================
-        bank_code = BankDetector.detect(profile)
+        # Si el service ya detectó, el resultado está cacheado en el perfil
+        with timer.stage("detect"):
+            bank_code = BankDetector.detect(profile)
 
         if not bank_code:
             return ExtractionResult(
@@ -66,10 +84,11 @@ class ParserRouter:
         # =====================================================
         # 3. SCORING DE PARSERS
         # =====================================================
-        scored = [
-            (parser.detect(profile), parser)
-            for parser in eligible_parsers
-        ]
+        with timer.stage("detect"):
+            scored = [
+                (parser.detect(profile), parser)
+                for parser in eligible_parsers
+            ]
         scored.sort(key=lambda x: x[0], reverse=True)
 
         # =====================================================
@@ -82,20 +101,27 @@ class ParserRouter:
             trace.append(f"TRY:{parser.name}")
 
             try:
-                raw = parser.extract(pdf_bytes, profile)
-                transactions = parser.normalize(raw, profile)
-                meta = parser.extract_meta(raw, profile)
-                local_warnings = parser.validate(transactions, meta)
-
-                balance_warnings = []
-                balance_score = 100
-
-                # Validación genérica solo si NO es resumen
-                if profile.document_type != "RESUMEN":
-                    balance_warnings, balance_score = validate_balance_consistency(
-                        transactions
+                meta = StatementMeta()
+                with timer.stage("normalize"):
+                    transactions = self._consume(
+                        parser.iter_transactions(document, profile, meta),
+                        profile.page_count,
+                        progress,
+                        timer,
                     )
 
+                with timer.stage("validate"):
+                    local_warnings = parser.validate(transactions, meta)
+
+                    balance_warnings = []
+                    balance_score = 100
+
+                    # Validación genérica solo si NO es resumen
+                    if profile.document_type != "RESUMEN":
+                        balance_warnings, balance_score = validate_balance_consistency(
+                            transactions
+                        )
+
                 all_warnings = local_warnings + balance_warnings
                 confidence = int((score * 100 + balance_score) / 2)
 
@@ -130,3 +156,31 @@ class ParserRouter:
             parser_trace=trace,
         )
 
+    @staticmethod
+    def _consume(
+        stream,
+        page_count: int,
+        progress: Optional[Callable[[int, int, List[Transaction]], None]],
+        timer: StageTimer,
+    ) -> List[Transaction]:
+        """
+        Junta el stream del parser avisando el avance por página.
+        El tiempo del callback (UI) queda aparte, en la etapa "progress".
+        """
+        transactions: List[Transaction] = []
+        page = 0
+
+        for tx in stream:
+            if progress and tx.source_page and tx.source_page != page:
+                if page:
+                    with timer.stage("progress"):
+                        progress(page, page_count, transactions)
+                page = tx.source_page
+            transactions.append(tx)
+
+        if progress:
+            with timer.stage("progress"):
+                progress(page_count, page_count, transactions)
+
+        return transactions
+
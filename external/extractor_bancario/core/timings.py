@@ -0,0 +1,127 @@
+# core/timings.py
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from .models import DebugBundle
+
+# Etapas que mide el pipeline (en este orden se muestran)
+STAGES = [
+    "diagnose",
+    "detect",
+    "extract",
+    "normalize",
+    "extract_meta",
+    "validate",
+    "export",
+]
+
+
+def _add(timings: Dict[str, float], name: str, wall: float, cpu: float) -> None:
+    """Acumula segundos de una etapa en timings (claves `<etapa>.wall_ms/cpu_ms`)."""
+    for kind, seconds in (("wall", wall), ("cpu", cpu)):
+        key = f"{name}.{kind}_ms"
+        timings[key] = round(timings.get(key, 0.0) + seconds * 1000, 3)
+
+
+class StageTimer:
+    """
+    Tiempo de pared y de CPU por etapa de una extracción.
+
+    - Las etapas se pueden anidar: cada una registra su tiempo propio
+      (sin el de las sub-etapas). Así "diagnose" no incluye la extracción
+      de texto que dispara, ni "normalize" la de las páginas que consume.
+    - Nunca envolver un `yield` con stage(): el tiempo quedaría a nombre
+      de quien consume el generador.
+    - CPU es la del hilo que mide (time.thread_time), no la del proceso:
+      otras sesiones de Streamlit, el refresco de tickets o los ejecutores
+      no se cuelan en las etapas. Lo que corre en un pool de procesos
+      informa su propia CPU con add_cpu().
+    """
+
+    def __init__(self):
+        self._wall: Dict[str, float] = {}
+        self._cpu: Dict[str, float] = {}
+        self._stack: List[List[float]] = []
+        self._pages: Dict[int, float] = {}
+        self._worker_cpu = 0.0
+        self.pages_extracted = 0
+
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.thread_time()
+
+    @contextmanager
+    def stage(self, name: str, page: Optional[int] = None) -> Iterator[None]:
+        """
+        Mide el bloque como etapa `name`.
+        :param page: índice (base 0) si el bloque es la extracción de una página
+        """
+        self._stack.append([0.0, 0.0])
+        wall0 = time.perf_counter()
+        cpu0 = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall0
+            cpu = time.thread_time() - cpu0
+
+            child_wall, child_cpu = self._stack.pop()
+            self._wall[name] = self._wall.get(name, 0.0) + wall - child_wall
+            self._cpu[name] = self._cpu.get(name, 0.0) + cpu - child_cpu
+
+            if self._stack:
+                self._stack[-1][0] += wall
+                self._stack[-1][1] += cpu
+
+            if page is not None:
+                self._pages[page] = wall
+
+    def add_cpu(self, name: str, seconds: float) -> None:
+        """
+        Suma a la etapa `name` CPU medida en otro proceso (ej. un worker
+        del pool de páginas). No se descuenta de la etapa que la envuelve.
+        """
+        self._wall.setdefault(name, 0.0)
+        self._cpu[name] = self._cpu.get(name, 0.0) + seconds
+        self._worker_cpu += seconds
+
+    def to_debug(self, debug: Optional[DebugBundle] = None) -> DebugBundle:
+        """Vuelca lo medido en un DebugBundle (nuevo o el que ya traía el resultado)."""
+        debug = debug or DebugBundle()
+
+        for name in sorted(self._wall, key=lambda n: STAGES.index(n) if n in STAGES else len(STAGES)):
+            _add(debug.timings, name, self._wall[name], self._cpu[name])
+
+        _add(
+            debug.timings,
+            "total",
+            time.perf_counter() - self._start_wall,
+            time.thread_time() - self._start_cpu + self._worker_cpu,
+        )
+
+        if self._pages:
+            slowest = max(self._pages, key=self._pages.get)
+            debug.timings["extract.page_max_ms"] = round(self._pages[slowest] * 1000, 3)
+            debug.timings["extract.page_avg_ms"] = round(
+                sum(self._pages.values()) * 1000 / len(self._pages), 3
+            )
+            debug.artifacts["slowest_page"] = str(slowest + 1)
+
+        debug.artifacts["pages_extracted"] = str(self.pages_extracted)
+        return debug
+
+
+@contextmanager
+def record_stage(debug: Optional[DebugBundle], name: str) -> Iterator[None]:
+    """
+    Mide una etapa que ocurre después de la extracción (ej. export)
+    y la suma al DebugBundle del resultado. Sin bundle no mide nada.
+    """
+    wall0 = time.perf_counter()
+    cpu0 = time.thread_time()
+    try:
+        yield
+    finally:
+        if debug is not None:
+            _add(debug.timings, name, time.perf_counter() - wall0, time.thread_time() - cpu0)
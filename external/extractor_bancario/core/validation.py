@@ -1,6 +1,6 @@
 # core/validation.py
 
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 from .models import Transaction, WarningItem
 
 
@@ -43,12 +43,80 @@ def infer_amount_sign(
     return raw_amount
 
 
+# Tolerancia de redondeo al comparar saldos e importes
+BALANCE_TOLERANCE = 0.02
+
+
+def check_balance_columns(dates, amounts, balances) -> Dict[str, Any]:
+    """
+    Núcleo vectorizado de validate_balance_consistency, sobre columnas.
+
+    :param dates: fechas como enteros ordenables (ej. date.toordinal())
+    :param amounts: importes (NaN = sin dato)
+    :param balances: saldos (NaN = sin dato)
+    :return: dict con
+        - order: índices originales en orden cronológico (estable)
+        - rows / prev_rows: índices originales de cada par comparado
+        - corrected: importe con signo inferido de cada par
+        - expected: saldo esperado de cada par
+        - valid: máscara de pares con los dos saldos
+        - same_magnitude: máscara de pares donde el importe es la variación del saldo
+        - mismatch: máscara de pares que no cuadran
+        - ok / fail: cantidad de pares que cuadran / no cuadran
+    """
+    import numpy as np
+
+    dates = np.asarray(dates)
+    amounts = np.asarray(amounts, dtype=float)
+    balances = np.asarray(balances, dtype=float)
+
+    # Fecha + orden original (argsort estable). Cada movimiento se compara
+    # con el anterior: el primero (o el Saldo Inicial) solo aporta su saldo
+    order = np.argsort(dates, kind="stable")
+    prev_rows = order[:-1]
+    rows = order[1:]
+
+    prev_balance = balances[prev_rows]
+    curr_balance = balances[rows]
+    raw_amount = amounts[rows]
+
+    # Pares sin saldo de uno de los lados no se validan
+    valid = ~(np.isnan(prev_balance) | np.isnan(curr_balance))
+
+    # Signo inferido: si la magnitud coincide con la variación del saldo,
+    # el importe es esa variación (con su signo)
+    delta = curr_balance - prev_balance
+    same_magnitude = np.abs(np.abs(delta) - np.abs(raw_amount)) < BALANCE_TOLERANCE
+    corrected = np.where(same_magnitude, delta, raw_amount)
+
+    expected = prev_balance + corrected
+    mismatch = valid & ~(np.abs(expected - curr_balance) < BALANCE_TOLERANCE)
+
+    fail = int(mismatch.sum())
+    return {
+        "order": order,
+        "rows": rows,
+        "prev_rows": prev_rows,
+        "corrected": corrected,
+        "expected": expected,
+        "valid": valid,
+        "same_magnitude": same_magnitude,
+        "mismatch": mismatch,
+        "ok": int(valid.sum()) - fail,
+        "fail": fail,
+    }
+
+
 def validate_balance_consistency(
     transactions: List[Transaction],
 ) -> Tuple[List[WarningItem], int]:
     """
     Valida que el saldo cuadre movimiento a movimiento.
     Devuelve warnings + score de consistencia (0..100)
+
+    Vectorizado: las transacciones se pasan a columnas una vez y solo los
+    pares que no cuadran se convierten en WarningItem. Como antes, el
+    importe con signo inferido se escribe de vuelta en cada transacción.
     """
 
     warnings: List[WarningItem] = []
@@ -56,60 +124,55 @@ def validate_balance_consistency(
     if len(transactions) < 2:
         return warnings, 100
 
-    # ================================
-    # 🔑 CLAVE: ordenar cronológicamente
-    # ================================
-    ordered = sorted(
-        enumerate(transactions),
-        key=lambda x: (x[1].date, x[0])  # fecha + orden original
-    )
-
-    ordered_tx = [t for _, t in ordered]
-
-    ok = 0
-    fail = 0
+    import numpy as np
 
-    start_idx = detect_saldo_inicial(ordered_tx)
+    # Columnas (None -> NaN)
+    amounts = np.array([t.amount for t in transactions], dtype=float)
+    check = check_balance_columns(
+        np.fromiter((t.date.toordinal() for t in transactions), dtype=np.int64, count=len(transactions)),
+        amounts,
+        np.array([t.balance for t in transactions], dtype=float),
+    )
 
-    for i in range(start_idx + 1, len(ordered_tx)):
-        prev = ordered_tx[i - 1]
-        curr = ordered_tx[i]
+    rows = check["rows"]
+    corrected = check["corrected"]
 
-        if prev.balance is None or curr.balance is None:
-            continue
+    # ================================
+    # IMPORTES CORREGIDOS (solo los que cambian)
+    # ================================
+    changed = np.flatnonzero(
+        check["valid"] & check["same_magnitude"] & (corrected != amounts[rows])
+    )
+    for row, amount in zip(rows[changed].tolist(), corrected[changed].tolist()):
+        transactions[row].amount = amount
 
-        # inferimos signo real
-        corrected_amount = infer_amount_sign(
-            prev.balance, curr.balance, curr.amount
-        )
-        curr.amount = corrected_amount
-
-        expected = prev.balance + corrected_amount
-
-        if abs(expected - curr.balance) < 0.02:
-            ok += 1
-        else:
-            fail += 1
-            warnings.append(
-                WarningItem(
-                    code="BALANCE_MISMATCH",
-                    severity="HIGH",
-                    message=(
-                        f"Saldo inconsistente en {curr.date}: "
-                        f"esperado {expected:.2f}, obtenido {curr.balance:.2f}"
-                    ),
-                    pages=[curr.source_page],
-                    evidence={
-                        "prev_balance": prev.balance,
-                        "amount": corrected_amount,
-                        "expected": expected,
-                        "actual": curr.balance,
-                    },
-                )
+    # ================================
+    # WARNINGS (solo los que no cuadran)
+    # ================================
+    prev_rows = check["prev_rows"]
+    expected = check["expected"]
+    for k in np.flatnonzero(check["mismatch"]).tolist():
+        prev = transactions[prev_rows[k]]
+        curr = transactions[rows[k]]
+        warnings.append(
+            WarningItem(
+                code="BALANCE_MISMATCH",
+                severity="HIGH",
+                message=(
+                    f"Saldo inconsistente en {curr.date}: "
+                    f"esperado {expected[k]:.2f}, obtenido {curr.balance:.2f}"
+                ),
+                pages=[curr.source_page],
+                evidence={
+                    "prev_balance": prev.balance,
+                    "amount": float(corrected[k]),
+                    "expected": float(expected[k]),
+                    "actual": curr.balance,
+                },
             )
+        )
 
-    total = ok + fail
-    score = int((ok / total) * 100) if total > 0 else 100
+    total = check["ok"] + check["fail"]
+    score = int((check["ok"] / total) * 100) if total > 0 else 100
 
     return warnings, score
-
@@ -1,8 +1,11 @@
 import os
 from datetime import datetime
+from io import BytesIO
+from typing import Iterable, List, Union
+
 import pandas as pd
 
-from core.models import ExtractionResult
+from ..core.models import ExtractionResult
 
 
 class ExtractitoExcelExporter:
@@ -38,11 +41,21 @@ class ExtractitoExcelExporter:
 
         return "A clasificar"
 
+    COLUMNS = [
+        "fecha",
+        "descripcion",
+        "importe",
+        "saldo",
+        "tipo_movimiento",
+        "fuente",
+        "imputacion",
+    ]
+
     # =====================================================
-    # EXPORT PRINCIPAL
+    # FILAS DE UN EXTRACTO
     # =====================================================
     @classmethod
-    def export(cls, result: ExtractionResult, output_folder: str) -> str:
+    def _rows(cls, result: ExtractionResult) -> List[dict]:
         rows = []
 
         fuente = result.profile.file_name
@@ -75,18 +88,14 @@ class ExtractitoExcelExporter:
                 "imputacion": cls._map_imputacion(tx.description),
             })
 
-        df = pd.DataFrame(
-            rows,
-            columns=[
-                "fecha",
-                "descripcion",
-                "importe",
-                "saldo",
-                "tipo_movimiento",
-                "fuente",
-                "imputacion",
-            ],
-        )
+        return rows
+
+    # =====================================================
+    # EXPORT PRINCIPAL
+    # =====================================================
+    @classmethod
+    def export(cls, result: ExtractionResult, output_folder: str) -> str:
+        df = pd.DataFrame(cls._rows(result), columns=cls.COLUMNS)
 
         # =========================
         # NOMBRE ARCHIVO
@@ -103,11 +112,32 @@ class ExtractitoExcelExporter:
         )
 
         output_path = os.path.join(output_folder, filename)
+        cls._write(df, output_path)
 
-        # =========================
-        # ESCRITURA EXCEL (SIN FORMATO EXTRA)
-        # =========================
-        with pd.ExcelWriter(output_path, engine="xlsxwriter") as writer:
+        return output_path
+
+    # =====================================================
+    # EXPORT CONSOLIDADO (VARIOS EXTRACTOS, UNA HOJA)
+    # =====================================================
+    @classmethod
+    def export_consolidated(cls, results: Iterable[ExtractionResult]) -> bytes:
+        """
+        Un solo Excel con los movimientos de todos los extractos,
+        uno debajo del otro; la columna `fuente` indica el PDF de origen.
+        """
+        rows = [row for result in results for row in cls._rows(result)]
+        df = pd.DataFrame(rows, columns=cls.COLUMNS)
+
+        bio = BytesIO()
+        cls._write(df, bio)
+        return bio.getvalue()
+
+    # =========================
+    # ESCRITURA EXCEL (SIN FORMATO EXTRA)
+    # =========================
+    @staticmethod
+    def _write(df: pd.DataFrame, target: Union[str, BytesIO]) -> None:
+        with pd.ExcelWriter(target, engine="xlsxwriter") as writer:
             df.to_excel(writer, index=False, sheet_name="extracto")
 
             workbook = writer.book
@@ -121,5 +151,3 @@ class ExtractitoExcelExporter:
             worksheet.set_column("G:G", 30)  # imputacion
 
             worksheet.freeze_panes("A2")
-
-        return output_path
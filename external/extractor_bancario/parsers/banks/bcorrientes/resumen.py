@@ -1,11 +1,10 @@
 import re
-import io
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 
-import pdfplumber
-
 from ...structural.base import BaseStructuralParser
+from ...structural.layout import LayoutSpec
+from ....core.document import ParsedDocument
 from ....core.models import Transaction, StatementMeta, WarningItem
 
 
@@ -13,6 +12,29 @@ class ResumenBancoCorrientesParser(BaseStructuralParser):
 
     name = "RESUMEN_BANCO_CORRIENTES"
     bank_code = "bcorrientes"
+    version = "2"
+
+    # =====================================================
+    # LAYOUT DE LA TABLA DE MOVIMIENTOS
+    # =====================================================
+    LAYOUT = LayoutSpec(
+        # Regla: la línea debe empezar con fecha
+        date_pattern=r"\d{2}/\d{2}/\d{2}",
+        date_format="%d/%m/%y",
+        # Regex estricto para montos con decimales
+        amount_pattern=r"\d{1,3}(?:[.,]\d{3})*[.,]\d{2}",
+        # En la tabla principal siempre hay al menos 2 (Mov + Saldo)
+        amount_columns=("importe", "saldo"),
+        # CORTAMOS la página si llegamos a secciones de totales o transferencias MEP
+        # Esto evita duplicados de tablas informativas al final del PDF
+        stop_sections=("TRANSFERENCIAS MEP", "DEBITOS AUTOMATICOS"),
+        ignore_rules=("saldo final", "saldo inicial"),
+    )
+    _layout = LAYOUT.compile()
+
+    _PERIOD_RE = re.compile(r"Periodo\s*:\s*(\d{2}/\d{2}/\d{2})\s*al\s*(\d{2}/\d{2}/\d{2})", re.I)
+    _OPENING_RE = re.compile(r"SALDO INICIAL\s*([\d.,]+)", re.I)
+    _CLOSING_RE = re.compile(r"SALDO FINAL\s*([\d.,]+)", re.I)
 
     # =====================================================
     # DETECCIÓN
@@ -28,12 +50,9 @@ class ResumenBancoCorrientesParser(BaseStructuralParser):
     # =====================================================
     # EXTRACCIÓN RAW
     # =====================================================
-    def extract(self, pdf_bytes: bytes, profile) -> Dict[str, Any]:
-        text_pages: List[str] = []
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page in pdf.pages:
-                text_pages.append(page.extract_text() or "")
-        
+    def extract(self, document: ParsedDocument, profile) -> Dict[str, Any]:
+        text_pages: List[str] = document.page_texts()
+
         return {
             "full_text": "\n".join(text_pages),
             "pages": text_pages
@@ -42,25 +61,35 @@ class ResumenBancoCorrientesParser(BaseStructuralParser):
     # =====================================================
     # METADATA
     # =====================================================
-    def extract_meta(self, raw: Dict[str, Any], profile) -> StatementMeta:
-        text = raw.get("full_text", "")
-        meta = StatementMeta(
-            bank_name="Banco de Corrientes",
-            account_type="Caja de Ahorro",
-            currency="ARS",
-        )
-
-        m_per = re.search(r"Periodo\s*:\s*(\d{2}/\d{2}/\d{2})\s*al\s*(\d{2}/\d{2}/\d{2})", text, re.I)
-        if m_per:
-            meta.period_start = datetime.strptime(m_per.group(1), "%d/%m/%y").date()
-            meta.period_end = datetime.strptime(m_per.group(2), "%d/%m/%y").date()
-
-        m_ini = re.search(r"SALDO INICIAL\s*([\d.,]+)", text, re.I)
-        if m_ini: meta.opening_balance = self._parse_amount(m_ini.group(1))
+    def _new_meta(self, meta: Optional[StatementMeta] = None) -> StatementMeta:
+        meta = meta if meta is not None else StatementMeta()
+        meta.bank_name = "Banco de Corrientes"
+        meta.account_type = "Caja de Ahorro"
+        meta.currency = "ARS"
+        return meta
 
-        m_fin = re.search(r"SALDO FINAL\s*([\d.,]+)", text, re.I)
-        if m_fin: meta.closing_balance = self._parse_amount(m_fin.group(1))
+    def _collect_meta(self, meta: StatementMeta, text: str) -> None:
+        """
+        Completa la metadata con lo que aparezca en `text`.
+        Gana la primera aparición: se puede llamar página por página.
+        """
+        if meta.period_start is None:
+            m_per = self._PERIOD_RE.search(text)
+            if m_per:
+                meta.period_start = datetime.strptime(m_per.group(1), "%d/%m/%y").date()
+                meta.period_end = datetime.strptime(m_per.group(2), "%d/%m/%y").date()
+
+        if meta.opening_balance is None:
+            m_ini = self._OPENING_RE.search(text)
+            if m_ini: meta.opening_balance = self._parse_amount(m_ini.group(1))
+
+        if meta.closing_balance is None:
+            m_fin = self._CLOSING_RE.search(text)
+            if m_fin: meta.closing_balance = self._parse_amount(m_fin.group(1))
 
+    def extract_meta(self, raw: Dict[str, Any], profile) -> StatementMeta:
+        meta = self._new_meta()
+        self._collect_meta(meta, raw.get("full_text", ""))
         return meta
 
     # =====================================================
@@ -69,72 +98,80 @@ class ResumenBancoCorrientesParser(BaseStructuralParser):
     def normalize(self, raw: Dict[str, Any], profile) -> List[Transaction]:
         transactions: List[Transaction] = []
         meta = self.extract_meta(raw, profile)
-        running_balance = meta.opening_balance
-        
-        # Regex estricto para montos con decimales
-        money_pattern = re.compile(r"(\d{1,3}(?:[.,]\d{3})*[.,]\d{2})")
+        state = {"running_balance": meta.opening_balance}
 
         for p_idx, page_text in enumerate(raw.get("pages", []), 1):
-            # CORTAMOS la página si llegamos a secciones de totales o transferencias MEP
-            # Esto evita duplicados de tablas informativas al final del PDF
-            useful_text = re.split(r"TRANSFERENCIAS MEP|DEBITOS AUTOMATICOS", page_text, flags=re.I)[0]
-            
-            lines = useful_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                
-                # Regla: Debe empezar con fecha
-                if not re.match(r"^\d{2}/\d{2}/\d{2}", line):
-                    continue
-                
-                if "saldo final" in line.lower() or "saldo inicial" in line.lower():
-                    continue
-
-                date_str = line[:8]
-                content = line[8:].strip()
-                
-                # Buscamos montos. En la tabla principal siempre hay al menos 2 (Mov + Saldo)
-                money_found = money_pattern.findall(content)
-                
-                if len(money_found) >= 1:
-                    try:
-                        tx_date = datetime.strptime(date_str, "%d/%m/%y").date()
-                        row_balance = self._parse_amount(money_found[-1])
-                        
-                        # Cálculo contable por diferencia
-                        if running_balance is not None:
-                            amount = round(row_balance - running_balance, 2)
-                        else:
-                            # Si es la primera, el movimiento es el penúltimo o el saldo mismo
-                            amount = self._parse_amount(money_found[-2]) if len(money_found) > 1 else 0.0
-
-                        # Evitamos ruidos de líneas que no cambian el saldo (metadata interna)
-                        if amount == 0 and len(money_found) < 2:
-                            continue
-
-                        # Limpieza de descripción
-                        desc = content
-                        for m in money_found:
-                            desc = desc.replace(m, "")
-                        desc = re.sub(r"\s+", " ", desc).strip()
-
-                        transactions.append(Transaction(
-                            date=tx_date,
-                            description=desc,
-                            amount=amount,
-                            balance=row_balance,
-                            currency="ARS",
-                            type_hint="CREDIT" if amount > 0 else "DEBIT",
-                            source_page=p_idx,
-                            source_raw=line
-                        ))
-                        
-                        running_balance = row_balance
-                    except:
-                        continue
+            transactions.extend(self._iter_page(page_text, p_idx, state))
 
         return transactions
 
+    # =====================================================
+    # STREAMING (Página a página)
+    # =====================================================
+    def iter_transactions(
+        self,
+        document: ParsedDocument,
+        profile,
+        meta: Optional[StatementMeta] = None,
+    ) -> Iterator[Transaction]:
+        """
+        Igual que extract + normalize, pero sin juntar el texto completo:
+        cada página se lee, se procesa y se descarta.
+        La metadata se va completando en `meta` a medida que aparece;
+        el saldo inicial se toma al llegar al primer movimiento.
+        """
+        meta = self._new_meta(meta)
+        state = {"running_balance": None, "started": False}
+
+        for p_idx, page_text in enumerate(document.iter_page_texts(), 1):
+            with document.timer.stage("extract_meta"):
+                self._collect_meta(meta, page_text)
+
+            if not state["started"]:
+                state["running_balance"] = meta.opening_balance
+
+            yield from self._iter_page(page_text, p_idx, state)
+
+    def _iter_page(self, page_text: str, p_idx: int, state: Dict[str, Any]) -> Iterator[Transaction]:
+        """
+        Movimientos de una página. `state["running_balance"]` arrastra el
+        saldo entre páginas (el monto se calcula por diferencia de saldos).
+        Las líneas ya vienen clasificadas por el LAYOUT (una pasada por página).
+        """
+        for row in self._layout.scan(page_text):
+            try:
+                row_balance = self._parse_amount(row.columns["saldo"])
+                running_balance = state["running_balance"]
+
+                # Cálculo contable por diferencia
+                if running_balance is not None:
+                    amount = round(row_balance - running_balance, 2)
+                else:
+                    # Si es la primera, el movimiento es el penúltimo o el saldo mismo
+                    amount = self._parse_amount(row.columns["importe"]) if "importe" in row.columns else 0.0
+
+                # Evitamos ruidos de líneas que no cambian el saldo (metadata interna)
+                if amount == 0 and len(row.amounts) < 2:
+                    continue
+
+                tx = Transaction(
+                    date=row.date,
+                    description=row.description,
+                    amount=amount,
+                    balance=row_balance,
+                    currency="ARS",
+                    type_hint="CREDIT" if amount > 0 else "DEBIT",
+                    source_page=p_idx,
+                    source_raw=row.line
+                )
+
+                state["running_balance"] = row_balance
+                state["started"] = True
+            except:
+                continue
+
+            yield tx
+
     def _parse_amount(self, raw: str) -> float:
         if not raw: return 0.0
         s = raw.strip().replace("$", "").replace(" ", "")
@@ -0,0 +1,145 @@
+# parsers/registry.py
+
+import ast
+import hashlib
+import importlib
+import importlib.util
+from typing import Dict, List, Optional, Tuple
+
+from .structural.base import BaseStructuralParser
+
+# Grupo de entry points para parsers de otros paquetes:
+#   [project.entry-points."extractor_bancario.parsers"]
+#   bnacion = "mi_paquete.nacion:ResumenBancoNacionParser"
+ENTRY_POINT_GROUP = "extractor_bancario.parsers"
+
+
+def _declared_version(source: bytes, class_name: str) -> str:
+    """
+    `version` declarado en el cuerpo de la clase, leído del código fuente
+    (sin importar el módulo). Si la clase no lo redefine, el de la base.
+    """
+    for node in ast.parse(source).body:
+        if isinstance(node, ast.ClassDef) and node.name == class_name:
+            for stmt in node.body:
+                targets = (
+                    stmt.targets if isinstance(stmt, ast.Assign)
+                    else [stmt.target] if isinstance(stmt, ast.AnnAssign)
+                    else []
+                )
+                if (
+                    any(isinstance(t, ast.Name) and t.id == "version" for t in targets)
+                    and isinstance(stmt.value, ast.Constant)
+                ):
+                    return str(stmt.value.value)
+    return BaseStructuralParser.version
+
+
+def _source_info(spec: str) -> Tuple[str, str]:
+    """(versión declarada, hash del código) del parser, sin importarlo."""
+    module_name, _, class_name = spec.partition(":")
+    try:
+        module_spec = importlib.util.find_spec(module_name)
+        with open(module_spec.origin, "rb") as f:
+            source = f.read()
+    except Exception:
+        return "?", "?"
+
+    try:
+        version = _declared_version(source, class_name)
+    except SyntaxError:
+        version = "?"
+    return version, hashlib.md5(source).hexdigest()[:8]
+
+
+class ParserRegistry:
+    """
+    Parsers por banco, registrados como "modulo:Clase".
+
+    - Registrar no importa nada: el módulo de un parser se carga (una vez)
+      la primera vez que se detecta un documento de ese banco.
+    - Otros paquetes pueden sumar parsers con entry points del grupo
+      ENTRY_POINT_GROUP (nombre = código de banco, valor = "modulo:Clase").
+    """
+
+    def __init__(self, specs: Optional[Dict[str, List[str]]] = None):
+        self._specs: Dict[str, List[str]] = {}
+        self._loaded: Dict[str, List[BaseStructuralParser]] = {}
+        self._fingerprint: Optional[str] = None
+        self._entry_points_loaded = False
+
+        for bank_code, bank_specs in (specs or {}).items():
+            for spec in bank_specs:
+                self.register(bank_code, spec)
+
+    # =========================
+    # REGISTRO
+    # =========================
+    def register(self, bank_code: str, spec: str) -> None:
+        specs = self._specs.setdefault(bank_code, [])
+        if spec not in specs:
+            specs.append(spec)
+            self._loaded.pop(bank_code, None)
+            self._fingerprint = None
+
+    def _load_entry_points(self) -> None:
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+
+        from importlib.metadata import entry_points
+
+        try:
+            found = entry_points(group=ENTRY_POINT_GROUP)
+        except Exception:
+            return
+
+        for ep in found:
+            self.register(ep.name, ep.value)
+
+    # =========================
+    # RESOLUCIÓN (DESPUÉS DE DETECTAR)
+    # =========================
+    def has(self, bank_code: str) -> bool:
+        """Si hay parsers registrados para el banco (sin importarlos)."""
+        self._load_entry_points()
+        return bool(self._specs.get(bank_code))
+
+    def get(self, bank_code: str) -> List[BaseStructuralParser]:
+        """Instancias de los parsers del banco ([] si no hay ninguno)."""
+        self._load_entry_points()
+
+        if bank_code not in self._loaded:
+            self._loaded[bank_code] = [
+                self._instantiate(spec) for spec in self._specs.get(bank_code, [])
+            ]
+        return self._loaded[bank_code]
+
+    @staticmethod
+    def _instantiate(spec: str) -> BaseStructuralParser:
+        module_name, _, class_name = spec.partition(":")
+        parser_class = getattr(importlib.import_module(module_name), class_name)
+        return parser_class()
+
+    # =========================
+    # FIRMA (CACHE DE RESULTADOS)
+    # =========================
+    def fingerprint(self) -> str:
+        """
+        Huella de todos los parsers registrados, sin importarlos:
+        cambia si se registra otro parser, si sube el `version` de alguno
+        o si cambia el código de su módulo (y con ella todas las claves
+        de la cache de resultados). El código compartido entre parsers lo
+        cubre el servicio (ver service._cache_version).
+        """
+        self._load_entry_points()
+
+        if self._fingerprint is None:
+            firmas = []
+            for bank_code in sorted(self._specs):
+                for spec in self._specs[bank_code]:
+                    version, source_hash = _source_info(spec)
+                    firmas.append(f"{bank_code}={spec}@{version}#{source_hash}")
+            firma = ",".join(firmas)
+            self._fingerprint = hashlib.md5(firma.encode("utf-8")).hexdigest()[:12]
+        return self._fingerprint
@@ -1,7 +1,8 @@
 # parsers/structural/base.py
 
 from abc import ABC, abstractmethod
-from typing import Any, List
+from typing import Any, Iterator, List, Optional
+from ...core.document import ParsedDocument
 from ...core.models import (
     DocumentProfile,
     Transaction,
@@ -20,6 +21,10 @@ class BaseStructuralParser(ABC):
 
     name: str = "BASE"
 
+    # Versión de la lógica del parser (la cache de resultados además se
+    # invalida sola cuando cambia el código del módulo del parser)
+    version: str = "1"
+
     @abstractmethod
     def detect(self, profile: DocumentProfile) -> float:
         """
@@ -29,13 +34,43 @@ class BaseStructuralParser(ABC):
         pass
 
     @abstractmethod
-    def extract(self, pdf_bytes: bytes, profile: DocumentProfile) -> Any:
+    def extract(self, document: ParsedDocument, profile: DocumentProfile) -> Any:
         """
         Extrae información cruda del PDF.
         Puede devolver listas, dicts, tablas intermedias, etc.
+
+        `document` ya está abierto: usar document.page_text(i) para no
+        repetir la extracción de las páginas que leyó el diagnóstico.
         """
         pass
 
+    def iter_transactions(
+        self,
+        document: ParsedDocument,
+        profile: DocumentProfile,
+        meta: Optional[StatementMeta] = None,
+    ) -> Iterator[Transaction]:
+        """
+        Contrato de streaming: va entregando transacciones página a página,
+        arrastrando el saldo, y completa `meta` a medida que la encuentra.
+
+        Por defecto no hay streaming real (extract + normalize de una vez);
+        los parsers que puedan lo redefinen para no retener el documento.
+        """
+        timer = document.timer
+
+        with timer.stage("extract"):
+            raw = self.extract(document, profile)
+
+        if meta is not None:
+            with timer.stage("extract_meta"):
+                meta.__dict__.update(self.extract_meta(raw, profile).__dict__)
+
+        with timer.stage("normalize"):
+            transactions = self.normalize(raw, profile)
+
+        yield from transactions
+
     @abstractmethod
     def normalize(self, raw_data: Any, profile: DocumentProfile) -> List[Transaction]:
         """
@@ -0,0 +1,132 @@
+# parsers/structural/layout.py
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
+
+
+@dataclass(frozen=True)
+class LayoutSpec:
+    """
+    Layout declarativo de las líneas de movimientos de un banco.
+
+    - date_pattern / date_format: fecha al inicio de la línea (regex + strptime)
+    - amount_pattern: regex de un monto (sin grupos de captura)
+    - amount_columns: nombre de los últimos montos de la línea, de izquierda
+      a derecha (ej. ("importe", "saldo")); si hay menos, faltan los primeros
+    - stop_sections: títulos desde los cuales se ignora el resto de la página
+    - ignore_rules: textos que descartan la línea entera si aparecen en ella
+    - min_amounts: montos mínimos para considerar la línea un movimiento
+
+    Títulos y textos son literales y no distinguen mayúsculas.
+    """
+
+    date_pattern: str
+    date_format: str
+    amount_pattern: str
+    amount_columns: Tuple[str, ...] = ()
+    stop_sections: Tuple[str, ...] = ()
+    ignore_rules: Tuple[str, ...] = ()
+    min_amounts: int = 1
+
+    def compile(self) -> "CompiledLayout":
+        return CompiledLayout(self)
+
+
+@dataclass
+class LayoutRow:
+    """Una línea de movimiento ya clasificada por el scanner."""
+
+    date: date
+    description: str          # la línea sin la fecha ni los montos
+    amounts: List[str]        # montos en el orden en que aparecen
+    columns: Dict[str, str] = field(default_factory=dict)
+    line: str = ""            # línea original (source_raw)
+
+
+class CompiledLayout:
+    """
+    El LayoutSpec compilado en una regex maestra. Un único finditer por
+    página clasifica el texto en líneas de movimiento (fecha + resto de la
+    línea, en un solo match) o cortes de sección; las demás líneas se
+    saltean sin pasar por Python.
+
+    De cada línea de movimiento, un split con los montos da a la vez los
+    montos y los tramos de la descripción.
+    """
+
+    def __init__(self, spec: LayoutSpec):
+        self.spec = spec
+
+        branches = []
+        if spec.stop_sections:
+            branches.append("(?P<stop>%s)" % "|".join(re.escape(s) for s in spec.stop_sections))
+        branches.append(r"^[^\S\n]*(?P<line>(?P<date>%s)[^\n]*)" % spec.date_pattern)
+        self.pattern: Pattern = re.compile("|".join(branches), re.MULTILINE | re.IGNORECASE)
+
+        self._amounts: Pattern = re.compile("(%s)" % spec.amount_pattern)
+        self._stops = [s.lower() for s in spec.stop_sections]
+        self._ignores = [s.lower() for s in spec.ignore_rules]
+
+        # Los resúmenes repiten mucho las fechas: strptime una vez por fecha
+        self._dates: Dict[str, Optional[date]] = {}
+
+    def _parse_date(self, raw: str) -> Optional[date]:
+        if raw not in self._dates:
+            try:
+                self._dates[raw] = datetime.strptime(raw, self.spec.date_format).date()
+            except ValueError:
+                self._dates[raw] = None
+        return self._dates[raw]
+
+    def _row(self, line: str, raw_date: str) -> Optional[LayoutRow]:
+        # Contenido sin la fecha: [texto, monto, texto, monto, ..., texto]
+        parts = self._amounts.split(line[len(raw_date):])
+        amounts = parts[1::2]
+
+        if len(amounts) < self.spec.min_amounts:
+            return None
+
+        tx_date = self._parse_date(raw_date)
+        if tx_date is None:
+            return None
+
+        columns = self.spec.amount_columns
+        return LayoutRow(
+            date=tx_date,
+            description=" ".join("".join(parts[0::2]).split()),
+            amounts=amounts,
+            columns=dict(zip(columns[::-1], amounts[::-1])),
+            line=line.strip(),
+        )
+
+    def scan(self, page: str) -> Iterator[LayoutRow]:
+        """Filas de movimientos de una página, en orden."""
+        for m in self.pattern.finditer(page):
+            line = m.group("line")
+            if line is None:
+                return  # título de sección: se corta la página
+
+            # Un título también puede aparecer dentro de la línea:
+            # la línea se toma hasta ahí y la página termina
+            lowered = line.lower()
+            cut = -1
+            for stop in self._stops:
+                i = lowered.find(stop)
+                if i >= 0 and (cut < 0 or i < cut):
+                    cut = i
+            if cut >= 0:
+                line = line[:cut]
+                lowered = lowered[:cut]
+
+            for rule in self._ignores:
+                if rule in lowered:
+                    break
+            else:
+                row = self._row(line, m.group("date"))
+                if row is not None:
+                    yield row
+
+            if cut >= 0:
+                return
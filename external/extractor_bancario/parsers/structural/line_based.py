@@ -1,18 +1,17 @@
 # parsers/structural/line_based.py
 
-import io
 import re
-import pdfplumber
 from datetime import datetime
 from typing import Any, List
 
-from core.models import (
+from ...core.document import ParsedDocument
+from ...core.models import (
     DocumentProfile,
     Transaction,
     StatementMeta,
     WarningItem,
 )
-from parsers.structural.base import BaseStructuralParser
+from .base import BaseStructuralParser
 
 
 DATE_REGEX = re.compile(r"\b(\d{2}/\d{2}/\d{2,4})\b")
@@ -51,24 +50,22 @@ class LineBasedParser(BaseStructuralParser):
         date_hits = len(DATE_REGEX.findall(profile.sample_text))
         return min(date_hits / 3, 1.0)
 
-    def extract(self, pdf_bytes: bytes, profile: DocumentProfile) -> Any:
+    def extract(self, document: ParsedDocument, profile: DocumentProfile) -> Any:
         lines = []
 
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page_idx, page in enumerate(pdf.pages):
-                text = page.extract_text()
-                if not text:
-                    continue
-
-                for raw_line in text.split("\n"):
-                    clean = raw_line.strip()
-                    if clean:
-                        lines.append(
-                            {
-                                "text": clean,
-                                "page": page_idx + 1,
-                            }
-                        )
+        for page_idx, text in enumerate(document.page_texts()):
+            if not text:
+                continue
+
+            for raw_line in text.split("\n"):
+                clean = raw_line.strip()
+                if clean:
+                    lines.append(
+                        {
+                            "text": clean,
+                            "page": page_idx + 1,
+                        }
+                    )
 
         return lines
 
@@ -9,7 +9,11 @@ Se encarga de:
 - Devolver el resultado normalizado
 """
 
-from typing import Optional
+import hashlib
+import json
+import logging
+import os
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
 # ======================================================
 # IMPORTS INTERNOS (ABSOLUTOS, SIN AMBIGÜEDAD)
@@ -18,39 +22,189 @@ from typing import Optional
 from external.extractor_bancario.bank_detection.detector import BankDetector
 
 from external.extractor_bancario.core.diagnostics import diagnose_pdf
+from external.extractor_bancario.core.document import EXTRACT_WORKERS, ParsedDocument, pool_context
 from external.extractor_bancario.core.router import ParserRouter
-from external.extractor_bancario.core.models import ExtractionResult
-
-from external.extractor_bancario.parsers.banks.bcorrientes.resumen import (
-    ResumenBancoCorrientesParser,
+from external.extractor_bancario.core.models import (
+    DocumentProfile,
+    ExtractionResult,
+    Transaction,
+    WarningItem,
 )
+from external.extractor_bancario.core.result_cache import ResultCache
+
+from external.extractor_bancario.parsers.registry import ParserRegistry
+
+# Una línea JSON por extracción con los tiempos de cada etapa (nivel INFO)
+logger = logging.getLogger(__name__)
+
+# Nivel del logger del paquete cuando lo configura configure_logging()
+LOG_LEVEL = os.environ.get("EXTRACTOR_LOG_LEVEL", "INFO")
+
+
+def configure_logging(level: Union[str, int, None] = None) -> None:
+    """
+    Handler a stderr para el logger del paquete (una vez por proceso).
+    Sin esto los INFO se pierden: Python solo muestra WARNING o más si
+    nadie configuró logging. Lo llama la app al arrancar y cada proceso
+    de un lote.
+    """
+    package_logger = logging.getLogger("external.extractor_bancario")
+    package_logger.setLevel(level or LOG_LEVEL)
+
+    if not package_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        package_logger.addHandler(handler)
+        package_logger.propagate = False
 
 # ======================================================
 # REGISTRO DE PARSERS POR BANCO
 # ======================================================
 
-BANK_PARSERS = {
+# "modulo:Clase" por banco: cada módulo se importa recién cuando se
+# detecta un documento de ese banco (ver parsers/registry.py)
+BANK_PARSERS = ParserRegistry({
     "bcorrientes": [
-        ResumenBancoCorrientesParser(),
+        "external.extractor_bancario.parsers.banks.bcorrientes.resumen:ResumenBancoCorrientesParser",
     ],
     # futuros bancos:
-    # "bnacion": [ResumenBancoNacionParser()],
-}
+    # "bnacion": ["external.extractor_bancario.parsers.banks.bnacion.resumen:ResumenBancoNacionParser"],
+})
+
+# ======================================================
+# CACHE DE RESULTADOS (MISMO PDF → MISMO RESULTADO)
+# ======================================================
+
+RESULT_CACHE = ResultCache(
+    max_entries=int(os.environ.get("EXTRACTOR_CACHE_MAX", 32)),
+    disk_dir=os.environ.get("EXTRACTOR_CACHE_DIR") or None,
+)
+
+
+# Versión del extractor: subirla invalida toda la cache de resultados
+# (ej. un cambio de comportamiento que no pasa por el código del paquete)
+EXTRACTOR_VERSION = "1"
+
+# Código compartido por todos los parsers: diagnóstico, detección, router,
+# validación, layouts. Si cambia, cambia el resultado de cualquier banco
+_SHARED_CODE_DIRS = ("core", "bank_detection", os.path.join("parsers", "structural"))
+
+_CACHE_VERSION: Optional[str] = None
+
+
+def _shared_code_hash() -> str:
+    """Hash del código fuente compartido (y de este módulo), sin importarlo."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    paths = [os.path.abspath(__file__), os.path.join(root, "parsers", "registry.py")]
+    for folder in _SHARED_CODE_DIRS:
+        base = os.path.join(root, folder)
+        paths += [os.path.join(base, f) for f in sorted(os.listdir(base)) if f.endswith(".py")]
+
+    digest = hashlib.md5()
+    for path in paths:
+        digest.update(os.path.relpath(path, root).encode("utf-8"))
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def _pdfplumber_version() -> str:
+    """El texto de cada página sale de pdfplumber: su versión también cuenta."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("pdfplumber")
+    except PackageNotFoundError:
+        return "?"
+
+
+def _cache_version() -> str:
+    """
+    Huella de todo lo que decide el resultado de una extracción: versión
+    del extractor, código compartido, pdfplumber y cada parser registrado
+    (su `version` y su código). Si algo cambia, cambian todas las claves y
+    la cache vieja (también la de disco) deja de usarse.
+    Se calcula una vez por proceso y sin importar los parsers.
+    """
+    global _CACHE_VERSION
+    if _CACHE_VERSION is None:
+        firma = "|".join([
+            EXTRACTOR_VERSION,
+            _shared_code_hash(),
+            _pdfplumber_version(),
+        ])
+        _CACHE_VERSION = hashlib.md5(firma.encode("utf-8")).hexdigest()[:12]
+
+    # Los parsers aparte: se pueden registrar más después del primer uso
+    return f"{_CACHE_VERSION}-{BANK_PARSERS.fingerprint()}"
+
+
+def _cache_key(pdf_bytes: bytes, scope: Optional[str] = None) -> str:
+    file_hash = hashlib.md5(pdf_bytes).hexdigest()
+    if scope is not None:
+        # Cada usuario ve solo su cache: un hit no revela que otro subió el mismo PDF
+        file_hash += "-" + hashlib.md5(str(scope).encode("utf-8")).hexdigest()[:8]
+    return ResultCache.key(file_hash, _cache_version())
+
+
+def cached_bank_statement(
+    pdf_bytes: bytes,
+    filename: str,
+    cache_scope: Optional[str] = None,
+) -> Optional[ExtractionResult]:
+    """
+    Resultado ya extraído para este mismo PDF, sin abrirlo. None si no hay.
+
+    :param cache_scope: dueño de la cache (ej. id de usuario); None = cache
+        compartida por todo el proceso
+    """
+    result = RESULT_CACHE.get(_cache_key(pdf_bytes, cache_scope))
+    if result is None:
+        return None
+
+    result.cached = True
+    result.profile.file_name = filename
+    result.parser_trace = result.parser_trace + ["CACHE_HIT"]
+    return result
+
+def _log_timings(result: ExtractionResult) -> None:
+    logger.info(json.dumps(
+        {
+            "event": "bank_statement_extracted",
+            "file": result.profile.file_name,
+            "file_hash": result.profile.file_hash,
+            "bank": result.profile.detected_bank,
+            "document_type": result.profile.document_type,
+            "transactions": len(result.transactions),
+            "warnings": [w.code for w in result.warnings],
+            "timings": result.debug.timings,
+            "artifacts": result.debug.artifacts,
+        },
+        ensure_ascii=False,
+    ))
 
 # ======================================================
 # FACTORY DE ROUTER
 # ======================================================
 
+# Lo que ve el usuario si no hay con qué extraer el documento: banco no
+# detectado, o detectado (hay firmas) pero sin parser registrado todavía
+_UNSUPPORTED_MESSAGE = (
+    "No se pudo detectar el banco del resumen. "
+    "El documento no está soportado."
+)
+
+
 def _build_router_for_bank(bank_code: str) -> ParserRouter:
     """
     Construye el router con los parsers correspondientes al banco detectado.
+    Los módulos de esos parsers se importan acá, la primera vez.
     """
     parsers = BANK_PARSERS.get(bank_code)
 
     if not parsers:
-        raise ValueError(
-            f"No hay parsers registrados para el banco '{bank_code}'"
-        )
+        logger.info("banco %s detectado sin parsers registrados", bank_code)
+        raise ValueError(_UNSUPPORTED_MESSAGE)
 
     return ParserRouter(structural_parsers=parsers)
 
@@ -61,35 +215,187 @@ def _build_router_for_bank(bank_code: str) -> ParserRouter:
 def extract_bank_statement(
     pdf_bytes: bytes,
     filename: str,
+    use_cache: bool = True,
+    progress: Optional[Callable[[int, int, List[Transaction]], None]] = None,
+    cache_scope: Optional[str] = None,
 ) -> ExtractionResult:
     """
     Punto de entrada único para el Panel Fiscal.
 
     :param pdf_bytes: contenido binario del PDF
     :param filename: nombre del archivo (para diagnóstico)
+    :param use_cache: si el mismo PDF ya se procesó, devuelve ese resultado
+        (result.cached = True) sin volver a parsear
+    :param progress: callback (página, total_páginas, movimientos) a medida
+        que el parser avanza; sirve para mostrar filas antes de terminar
+    :param cache_scope: dueño de la cache (ver cached_bank_statement)
     :return: ExtractionResult
     """
 
-    # 1️⃣ Diagnóstico del PDF
-    profile = diagnose_pdf(pdf_bytes, filename)
+    if use_cache:
+        cached = cached_bank_statement(pdf_bytes, filename, cache_scope)
+        if cached is not None:
+            return cached
+
+    # El PDF se abre una sola vez y se comparte entre todas las etapas
+    with ParsedDocument(pdf_bytes, filename) as document:
+        timer = document.timer
+
+        # 1️⃣ Diagnóstico del PDF
+        with timer.stage("diagnose"):
+            profile = diagnose_pdf(document, filename)
+
+        # 2️⃣ Detección de banco
+        with timer.stage("detect"):
+            bank_code: Optional[str] = BankDetector.detect(profile, supported=BANK_PARSERS.has)
+
+        if not bank_code:
+            raise ValueError(_UNSUPPORTED_MESSAGE)
 
-    # 2️⃣ Detección de banco
-    bank_code: Optional[str] = BankDetector.detect(profile)
+        # 3️⃣ Construcción del router según banco
+        router = _build_router_for_bank(bank_code)
 
-    if not bank_code:
-        raise ValueError(
-            "No se pudo detectar el banco del resumen. "
-            "El documento no está soportado."
-        )
+        # 4️⃣ Ejecución del extractor
+        result: ExtractionResult = router.route(document, profile, progress=progress)
 
-    # 3️⃣ Construcción del router según banco
-    router = _build_router_for_bank(bank_code)
+    # El documento (bytes + PDF abierto) no sobrevive a la extracción
+    result.profile.document = None
 
-    # 4️⃣ Ejecución del extractor
-    result: ExtractionResult = router.route(pdf_bytes, profile)
+    # 5️⃣ Tiempos por etapa (detalle técnico + log)
+    result.debug = timer.to_debug(result.debug)
+    result.debug.artifacts["bytes"] = str(len(pdf_bytes))
+    result.debug.artifacts["pages"] = str(result.profile.page_count)
+    _log_timings(result)
 
-    # 5️⃣ Metadata adicional (útil para el panel)
-    result.profile.detected_bank = bank_code
+    if use_cache:
+        RESULT_CACHE.put(_cache_key(pdf_bytes, cache_scope), result)
 
     return result
 
+# ======================================================
+# LOTES (CIERRE DE MES: DECENAS DE EXTRACTOS)
+# ======================================================
+
+# Código del warning de un documento del lote que no se pudo extraer
+EXTRACTION_FAILED = "EXTRACTION_FAILED"
+
+
+def _init_batch_worker(log_level: int) -> None:
+    # Cada proceso ya extrae un documento entero: sin pools anidados por página
+    from external.extractor_bancario.core import document
+
+    document.EXTRACT_WORKERS = 1
+
+    # forkserver / spawn no heredan los handlers: mismo nivel que el padre
+    # (0 = el padre no configuró logging)
+    if log_level:
+        configure_logging(log_level)
+
+
+def _failed_result(pdf_bytes: bytes, filename: str, error: Exception) -> ExtractionResult:
+    return ExtractionResult(
+        profile=DocumentProfile(
+            file_name=filename,
+            file_hash=hashlib.md5(pdf_bytes).hexdigest(),
+            page_count=0,
+            is_text_pdf=False,
+            is_scanned=False,
+        ),
+        transactions=[],
+        meta=None,
+        warnings=[
+            WarningItem(
+                code=EXTRACTION_FAILED,
+                severity="CRITICAL",
+                message=str(error),
+            )
+        ],
+        confidence_score=0,
+        parser_trace=[EXTRACTION_FAILED],
+    )
+
+
+def _extract_one(pdf_bytes: bytes, filename: str) -> ExtractionResult:
+    """
+    Extrae un documento del lote (en un proceso del pool o en serie).
+    Un PDF roto o no soportado vuelve como resultado fallido: no corta el lote.
+    """
+    try:
+        return extract_bank_statement(pdf_bytes, filename, use_cache=False)
+    except Exception as e:
+        return _failed_result(pdf_bytes, filename, e)
+
+
+def extract_bank_statements(
+    files: Iterable[Tuple[bytes, str]],
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+    cache_scope: Optional[str] = None,
+) -> Iterator[ExtractionResult]:
+    """
+    Extrae varios extractos repartiendo los documentos entre procesos.
+
+    :param files: pares (pdf_bytes, filename)
+    :param workers: procesos a usar (por defecto EXTRACTOR_WORKERS);
+        1 = en serie, en este mismo proceso
+    :param use_cache: los PDF ya procesados se devuelven al instante
+        (result.cached = True) y no ocupan un proceso
+    :param cache_scope: dueño de la cache (ver cached_bank_statement)
+    :return: un ExtractionResult por archivo, en el orden recibido.
+        Los que no se pudieron extraer traen un warning EXTRACTION_FAILED.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    files = list(files)
+    workers = EXTRACT_WORKERS if workers is None else workers
+
+    ready = {}
+    if use_cache:
+        for i, (pdf_bytes, filename) in enumerate(files):
+            cached = cached_bank_statement(pdf_bytes, filename, cache_scope)
+            if cached is not None:
+                ready[i] = cached
+
+    missing = [i for i in range(len(files)) if i not in ready]
+
+    pool = None
+    if workers > 1 and len(missing) > 1:
+        try:
+            # forkserver / spawn: fork desde el servidor con threads puede trabar al hijo
+            pool = ProcessPoolExecutor(
+                max_workers=min(workers, len(missing)),
+                mp_context=pool_context(),
+                initializer=_init_batch_worker,
+                initargs=(logging.getLogger("external.extractor_bancario").level,),
+            )
+        except Exception:
+            pool = None
+
+    futures = {}
+    if pool is not None:
+        futures = {i: pool.submit(_extract_one, *files[i]) for i in missing}
+
+    try:
+        for i, (pdf_bytes, filename) in enumerate(files):
+            if i in ready:
+                yield ready.pop(i)
+                continue
+
+            result = None
+            if i in futures:
+                try:
+                    result = futures.pop(i).result()
+                except Exception:
+                    # Pool caído (sandbox, límites del host): sigue en serie
+                    result = None
+
+            if result is None:
+                result = _extract_one(pdf_bytes, filename)
+
+            if use_cache and EXTRACTION_FAILED not in result.parser_trace:
+                RESULT_CACHE.put(_cache_key(pdf_bytes, cache_scope), result)
+
+            yield result
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+
+from streamlit import config
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+# ======================================================
+# SECRETS DE PRUEBA
+# ======================================================
+# core.* lee st.secrets al importarse: los tests usan un secrets.toml propio
+# para no depender del de la máquina (ni tocar su cache de WSDL).
+_DIR = tempfile.mkdtemp(prefix="tests_secrets_")
+_SECRETS = os.path.join(_DIR, "secrets.toml")
+
+with open(_SECRETS, "w", encoding="utf-8") as f:
+    f.write(
+        'AFIP_CUIT = "20111111112"\n'
+        f'AFIP_WSDL_CACHE_PATH = "{os.path.join(_DIR, "wsdl_cache.db")}"\n'
+    )
+
+config.set_option("secrets.files", [_SECRETS])
@@ -0,0 +1,55 @@
+"""Detección del banco emisor a partir del texto de muestra del PDF."""
+
+from external.extractor_bancario.bank_detection.detector import BankDetector
+from external.extractor_bancario.core.models import DocumentProfile
+from external.extractor_bancario.service import BANK_PARSERS
+
+RESUMEN_CORRIENTES_CON_TRANSFERENCIAS = """
+BANCO DE CORRIENTES S.A.
+RESUMEN DE CUENTA CORRIENTE EN PESOS
+FECHA       CONCEPTO                                   IMPORTE        SALDO
+02/05/2024  TRANSF A BANCO NACION CBU 0110599520000001  -150.000,00  1.250.000,00
+03/05/2024  TRANSF RECIBIDA BANCO DE LA NACION ARGENTINA  80.000,00  1.330.000,00
+06/05/2024  DEBITO AUTOMATICO SEGURO                     -12.500,00  1.317.500,00
+"""
+
+
+def _perfil(texto: str) -> DocumentProfile:
+    return DocumentProfile(
+        file_name="resumen.pdf",
+        file_hash="0" * 32,
+        page_count=1,
+        is_text_pdf=True,
+        is_scanned=False,
+        sample_text=texto,
+    )
+
+
+def test_transferencias_a_otro_banco_no_le_ganan_al_emisor():
+    candidatos = BankDetector.candidates(RESUMEN_CORRIENTES_CON_TRANSFERENCIAS)
+
+    assert list(candidatos[0]) == ["bcorrientes"]
+    assert BankDetector.detect(_perfil(RESUMEN_CORRIENTES_CON_TRANSFERENCIAS)) == "bcorrientes"
+
+
+def test_prefiere_un_candidato_con_parser():
+    # Nación aparece antes, pero no tiene parser registrado
+    texto = "BANCO DE LA NACION ARGENTINA\nPago a Banco de Corrientes S.A."
+    perfil = _perfil(texto)
+
+    assert list(BankDetector.candidates(texto)[0]) == ["bnacion"]
+    assert BankDetector.detect(perfil, supported=BANK_PARSERS.has) == "bcorrientes"
+    assert perfil.detected_bank == "bcorrientes"
+
+
+def test_sin_candidato_con_parser_devuelve_el_mas_probable():
+    perfil = _perfil("BANCO MACRO S.A.\nTRANSF A BANCO GALICIA")
+
+    assert BankDetector.detect(perfil, supported=BANK_PARSERS.has) == "macro"
+
+
+def test_siglas_sueltas_no_alcanzan():
+    for texto in ("TRANSF A HSBC 123456", "PAGO ICBC TARJETA"):
+        assert BankDetector.detect(_perfil(texto)) is None
+
+    assert BankDetector.detect(_perfil("HSBC Bank Argentina S.A.")) == "hsbc"
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from core.cuits import normalizar_cuits
+
+
+def _motivos(valores: list) -> list:
+    return normalizar_cuits(pd.Series(valores))["detalle"]["motivo"].tolist()
+
+
+def test_motivos_de_invalidez():
+    resultado = normalizar_cuits(pd.Series([
+        "20-12345678-6",
+        "20123456786",
+        "20123456780",
+        "2012345",
+    ]))
+
+    assert resultado["validos"] == ["20123456786"]
+    assert resultado["detalle"]["motivo"].tolist() == [
+        "",
+        "Repetido en el archivo",
+        "Dígito verificador incorrecto",
+        "No tiene 11 dígitos",
+    ]
+
+
+def test_vacio_solo_si_la_celda_esta_vacia():
+    assert _motivos(["", "   ", None]) == ["Vacío"] * 3
+
+
+def test_celda_sin_digitos_no_es_vacia():
+    # "abc" y dígitos arábigo-índicos no dejan ningún dígito 0-9
+    assert _motivos(["abc", "٢٠١٢٣٤٥٦٧٨٦"]) == ["No tiene 11 dígitos"] * 2
@@ -0,0 +1,35 @@
+"""
+Presupuesto de import del extractor bancario (ver bench/importtime_extractor.py).
+
+Importar el servicio tiene que ser barato: pdfplumber, los parsers de cada
+banco y el pool de procesos se cargan recién al extraer.
+"""
+
+import os
+import statistics
+
+import pytest
+
+from bench.importtime_extractor import LAZY_PREFIXES, MODULE, medir
+
+# Holgado respecto de lo medido (~50 ms) para no fallar por ruido del runner
+BUDGET_MS = float(os.environ.get("EXTRACTOR_IMPORT_BUDGET_MS", 120))
+RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def corridas():
+    return [medir() for _ in range(RUNS)]
+
+
+@pytest.mark.parametrize("prefijo", LAZY_PREFIXES)
+def test_modulos_pesados_son_lazy(corridas, prefijo):
+    cargados = sorted({
+        nombre for c in corridas for nombre in c["modulos"] if nombre.startswith(prefijo)
+    })
+    assert cargados == [], f"importar {MODULE} cargó {cargados}"
+
+
+def test_presupuesto_de_import(corridas):
+    total = statistics.median(c["total_ms"] for c in corridas)
+    assert 0 < total <= BUDGET_MS, f"import de {total:.1f} ms > presupuesto de {BUDGET_MS:.0f} ms"
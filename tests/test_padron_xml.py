@@ -0,0 +1,136 @@
+"""
+Fidelidad del parser de XML crudo del padrón A5 (core.padron_xml) contra zeep.
+
+Cada sobre SOAP se mapea por los dos caminos con
+consultor_cuit.verificar_fidelidad_xml: cualquier diferencia en las filas
+resultantes hace fallar el test.
+"""
+
+import pytest
+
+from bench import afip_mock
+from bench.benchmark_padron import generar_cuits
+from core import consultor_cuit, padron_xml
+
+CUIT_FISICA = "20123456786"
+CUIT_JURIDICA = "30712345671"
+
+
+@pytest.fixture(scope="module")
+def wsdl(tmp_path_factory):
+    ruta = tmp_path_factory.mktemp("wsdl") / "padron.wsdl"
+    ruta.write_text(
+        afip_mock.WSDL_PADRON.format(ns=afip_mock.NS_A5, url="http://127.0.0.1/padron"),
+        encoding="utf-8",
+    )
+    return str(ruta)
+
+
+def _sobre(personas: str) -> bytes:
+    return afip_mock._SOBRE.format(
+        f'<ns2:getPersonaList_v2Response xmlns:ns2="{afip_mock.NS_A5}">'
+        f"<personaListReturn>{personas}</personaListReturn>"
+        "</ns2:getPersonaList_v2Response>"
+    ).encode("utf-8")
+
+
+def _generales(cuit: str, domicilio: bool = True) -> str:
+    return (
+        "<datosGenerales><apellido>APELLIDO</apellido>"
+        + (
+            "<domicilioFiscal><codPostal>3400</codPostal>"
+            "<descripcionProvincia>CORRIENTES</descripcionProvincia>"
+            "<direccion>CALLE 1</direccion><idProvincia>7</idProvincia>"
+            "<localidad>LOCALIDAD</localidad></domicilioFiscal>"
+            if domicilio else ""
+        )
+        + f"<estadoClave>ACTIVO</estadoClave><idPersona>{cuit}</idPersona>"
+        "<nombre>NOMBRE</nombre><tipoPersona>FISICA</tipoPersona></datosGenerales>"
+    )
+
+
+def _verificar(contenido: bytes, lote: list, wsdl: str):
+    diferencias = consultor_cuit.verificar_fidelidad_xml(contenido, lote, wsdl=wsdl)
+    assert diferencias == []
+
+
+# ======================================================
+# RESPUESTAS DEL MOCK DE BENCH
+# ======================================================
+@pytest.mark.parametrize("actividades", [0, 1, 3])
+def test_respuestas_del_mock(wsdl, actividades):
+    lote = generar_cuits(consultor_cuit.LOTE_PADRON, seed=actividades + 1)
+    contenido = afip_mock._respuesta_padron(lote, actividades, tasa_sin_datos=0.2)
+
+    # El lote tiene que ejercitar todos los tipos de persona
+    for tag in (b"<datosMonotributo>", b"<datosRegimenGeneral>", b"<errorConstancia>"):
+        assert tag in contenido
+
+    _verificar(contenido, lote, wsdl)
+
+
+def test_cuits_sin_respuesta(wsdl):
+    lote = generar_cuits(5, seed=7)
+    contenido = afip_mock._respuesta_padron(lote[:3], 2, tasa_sin_datos=0)
+
+    _verificar(contenido, lote, wsdl)
+
+
+# ======================================================
+# CASOS BORDE
+# ======================================================
+def test_sin_domicilio_fiscal(wsdl):
+    contenido = _sobre(
+        f"<persona>{_generales(CUIT_FISICA, domicilio=False)}"
+        "<datosRegimenGeneral/></persona>"
+    )
+
+    _verificar(contenido, [CUIT_FISICA], wsdl)
+
+
+def test_actividad_vacia(wsdl):
+    contenido = _sobre(
+        f"<persona>{_generales(CUIT_FISICA)}<datosMonotributo/></persona>"
+        f"<persona>{_generales(CUIT_JURIDICA)}<datosRegimenGeneral/></persona>"
+    )
+
+    _verificar(contenido, [CUIT_FISICA, CUIT_JURIDICA], wsdl)
+
+
+def test_sin_regimen(wsdl):
+    contenido = _sobre(f"<persona>{_generales(CUIT_FISICA)}</persona>")
+
+    _verificar(contenido, [CUIT_FISICA], wsdl)
+
+
+def test_error_constancia(wsdl):
+    contenido = _sobre(
+        "<persona><errorConstancia>"
+        "<error>La clave se encuentra inactiva</error>"
+        "<error>No registra actividades</error>"
+        f"<idPersona>{CUIT_JURIDICA}</idPersona>"
+        "</errorConstancia></persona>"
+    )
+
+    _verificar(contenido, [CUIT_JURIDICA], wsdl)
+
+
+def test_lote_de_un_cuit_sin_id_persona(wsdl):
+    contenido = _sobre(
+        "<persona><errorConstancia>"
+        "<error>No existe persona con ese Id</error>"
+        "</errorConstancia></persona>"
+    )
+
+    _verificar(contenido, [CUIT_FISICA], wsdl)
+
+
+def test_respuesta_vacia(wsdl):
+    _verificar(_sobre(""), [CUIT_FISICA, CUIT_JURIDICA], wsdl)
+
+
+def test_fault():
+    contenido = afip_mock._fault("soap:Server", "Servicio no disponible")
+
+    with pytest.raises(RuntimeError, match="Servicio no disponible"):
+        padron_xml.parsear_personas(contenido)
@@ -0,0 +1,13 @@
+import pytest
+
+from core.secretos import como_bool
+
+
+@pytest.mark.parametrize("valor", [True, "true", "True", " 1 ", 1, "yes", "sí"])
+def test_verdaderos(valor):
+    assert como_bool(valor) is True
+
+
+@pytest.mark.parametrize("valor", [False, "false", "False", "0", 0, "no", "", "off"])
+def test_falsos(valor):
+    assert como_bool(valor) is False